@@ -0,0 +1,247 @@
+"""Measure how long Photon is unavailable during updates and after a crash, using the fake Photon server.
+
+Runs the real ``PhotonManager`` code paths against ``benchmarks.fake_photon`` (started through a ``java`` shim on
+``PATH``) in a scratch data directory, while a probe queries ``/api`` every 50ms. The updater is replaced by a stub
+that sleeps for ``--update-seconds`` and installs a new index, so only the manager's own stop, swap and restart
+behaviour is measured. Scenarios:
+
+    parallel    update while Photon serves, then restart on the new index
+    sequential  stop Photon, update, start again
+    crash       Photon is killed and the monitor loop restarts it
+
+Run from the repository root:
+
+    uv run python -m benchmarks.downtime --max-parallel-seconds 15 --max-sequential-seconds 20 --max-crash-seconds 20
+
+Exits non-zero when a scenario exceeds its limit or Photon does not come back, so it can guard against regressions.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection, HTTPException
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE_INTERVAL = 0.05
+RECOVERY_TIMEOUT = 120
+
+
+class Probe:
+    """Query Photon continuously and record every window in which it did not answer."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.outages: list[tuple[float, float]] = []
+        self.served: list[str] = []
+        self._down_since: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def query(self) -> str | None:
+        connection = HTTPConnection("localhost", self.port, timeout=1)
+        try:
+            connection.request("GET", "/api?q=berlin")
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 200:
+                return None
+            return json.loads(body)["features"][0]["properties"]["name"]
+        except (OSError, HTTPException, ValueError, LookupError):
+            return None
+        finally:
+            connection.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            marker = self.query()
+            if marker is None:
+                if self._down_since is None:
+                    self._down_since = now
+            else:
+                if self._down_since is not None:
+                    self.outages.append((self._down_since, now))
+                    self._down_since = None
+                if not self.served or self.served[-1] != marker:
+                    self.served.append(marker)
+            self._stop.wait(PROBE_INTERVAL)
+
+    def wait_until_up(self, timeout: float = RECOVERY_TIMEOUT) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.query() is not None:
+                return True
+            time.sleep(PROBE_INTERVAL)
+        return False
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self._stop.set()
+        self._thread.join()
+        if self._down_since is not None:
+            self.outages.append((self._down_since, time.monotonic()))
+
+    @property
+    def downtime(self) -> float:
+        return sum(end - start for start, end in self.outages)
+
+
+def prepare_environment(workdir: str, port: int, startup_delay: float):
+    """Point the manager at a scratch data dir and put a ``java`` that starts the fake Photon first on PATH."""
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir)
+    shim = os.path.join(bin_dir, "java")
+    with open(shim, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" -m benchmarks.fake_photon "$@"\n')
+    os.chmod(shim, 0o755)  # noqa: S103
+
+    os.environ.update(
+        {
+            "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            "PYTHONPATH": REPO_ROOT,
+            "PHOTON_INSTANCE_DATA_DIR": os.path.join(workdir, "data"),
+            "PHOTON_PORT": str(port),
+            "PHOTON_LISTEN_IP": "127.0.0.1",
+            "CDS_ARCHIVE": "False",
+            "FAKE_PHOTON_STARTUP_DELAY": str(startup_delay),
+        }
+    )
+
+
+def make_index(path: str, marker: str) -> str:
+    os.makedirs(os.path.join(path, "node_1"))
+    with open(os.path.join(path, "marker"), "w") as f:
+        f.write(marker)
+    return path
+
+
+def stub_updater(update_seconds: float):
+    """Replace the updater subprocess with a stub that takes ``update_seconds`` and installs a new index."""
+    from src import check_remote, process_manager
+    from src.filesystem import move_index_atomic
+    from src.utils import config
+
+    versions = iter(range(1, 1000))
+
+    def run_module(_module: str, env: dict[str, str], *_args: str) -> int:
+        time.sleep(update_seconds)
+        data_dir = env["PHOTON_INSTANCE_DATA_DIR"]
+        staged = make_index(os.path.join(config.TEMP_DIR, "photon_data"), f"v{next(versions)}")
+        move_index_atomic(staged, os.path.join(data_dir, "photon_data"))
+        return 0
+
+    # patched for the rest of the run, the benchmark process ends with it
+    mock.patch.object(process_manager, "run_module", run_module).start()
+    mock.patch.object(check_remote, "update_available", lambda *_args, **_kwargs: True).start()
+
+
+def run_update(manager, probe: Probe, strategy: str) -> dict:
+    from src.utils import config
+
+    config.UPDATE_STRATEGY = strategy
+    before = probe.served[-1:]
+    manager.update_instance(manager.instances[0])
+    recovered = probe.wait_until_up()
+    time.sleep(PROBE_INTERVAL * 4)
+    return {"recovered": recovered and probe.served[-1:] != before}
+
+
+def run_crash(manager, port: int) -> dict:
+    instance = manager.instances[0]
+    crashed = instance.process
+
+    with Probe(port) as probe:
+        monitor = threading.Thread(target=manager.monitor_photon, daemon=True)
+        monitor.start()
+        os.kill(crashed.pid, signal.SIGKILL)
+        deadline = time.monotonic() + RECOVERY_TIMEOUT
+        while instance.process is crashed and time.monotonic() < deadline:
+            time.sleep(PROBE_INTERVAL)
+        recovered = probe.wait_until_up()
+        manager.should_exit = True
+        monitor.join()
+    return {"recovered": recovered, "downtime": probe.downtime, "outages": len(probe.outages)}
+
+
+def run(args) -> dict[str, dict]:
+    workdir = tempfile.mkdtemp(prefix="photon-downtime-")
+    prepare_environment(workdir, args.port, args.startup_delay)
+
+    from src import process_manager
+    from src.utils import config
+    from src.utils.logger import setup_logging
+
+    setup_logging()
+    mock.patch.object(config, "PHOTON_DIR", workdir).start()
+    make_index(os.path.join(config.DATA_DIR, "photon_data"), "v0")
+    stub_updater(args.update_seconds)
+
+    manager = process_manager.PhotonManager()
+    if not manager.start_photon():
+        sys.exit("fake Photon did not start")
+
+    results = {}
+    try:
+        for strategy in ("PARALLEL", "SEQUENTIAL"):
+            with Probe(args.port) as probe:
+                probe.wait_until_up()
+                time.sleep(PROBE_INTERVAL * 4)
+                outcome = run_update(manager, probe, strategy)
+            results[strategy.lower()] = {**outcome, "downtime": probe.downtime, "outages": len(probe.outages)}
+
+        results["crash"] = run_crash(manager, args.port)
+    finally:
+        manager.should_exit = True
+        manager.stop_photon()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=23220)
+    parser.add_argument("--startup-delay", type=float, default=1.0, help="seconds the fake Photon takes to start")
+    parser.add_argument("--update-seconds", type=float, default=2.0, help="duration of the stubbed download+extract")
+    parser.add_argument("--max-parallel-seconds", type=float, help="fail if a PARALLEL update is down longer")
+    parser.add_argument("--max-sequential-seconds", type=float, help="fail if a SEQUENTIAL update is down longer")
+    parser.add_argument("--max-crash-seconds", type=float, help="fail if crash recovery takes longer")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    for scenario, result in results.items():
+        print(  # noqa: T201
+            f"{scenario}: unavailable for {result['downtime']:.1f}s in {result['outages']} outage(s)"
+            f"{'' if result['recovered'] else ', did not recover'}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    limits = {
+        "parallel": args.max_parallel_seconds,
+        "sequential": args.max_sequential_seconds,
+        "crash": args.max_crash_seconds,
+    }
+    failures = [f"{scenario} did not recover" for scenario, result in results.items() if not result["recovered"]]
+    for scenario, limit in limits.items():
+        if limit is not None and results[scenario]["downtime"] > limit:
+            failures.append(f"{scenario} was down for {results[scenario]['downtime']:.1f}s, limit is {limit}s")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")  # noqa: T201
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
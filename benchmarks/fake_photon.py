@@ -0,0 +1,100 @@
+"""Stand-in for ``java -jar photon.jar serve`` that needs neither a JVM nor an index.
+
+Accepts the command line the manager builds (JVM options are ignored), refuses to start without
+``<data dir>/photon_data/node_1`` like Photon does, and answers ``/status`` and ``/api`` once the startup delay has
+passed. ``/api`` returns the content of ``photon_data/marker``, so callers can tell which index is being served.
+Behaviour is controlled through the environment:
+
+    FAKE_PHOTON_STARTUP_DELAY  seconds before the port opens (default 1)
+    FAKE_PHOTON_CRASH_AFTER    exit with code 137 this many seconds after becoming ready
+    FAKE_PHOTON_FAIL_STARTS    let this many starts per data dir exit during startup, to exercise retries
+
+Used by ``benchmarks.downtime`` through a ``java`` shim on ``PATH``.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def parse_args(argv: list[str]) -> dict[str, str]:
+    if "serve" not in argv:
+        sys.exit("fake photon only supports the serve command")
+    options = argv[argv.index("serve") + 1 :]
+    return dict(zip(options[::2], options[1::2], strict=False))
+
+
+def read_marker(data_dir: str) -> str:
+    try:
+        with open(os.path.join(data_dir, "photon_data", "marker")) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def failed_start(data_dir: str) -> bool:
+    """Count starts in the data dir and report whether this one should fail, per ``FAKE_PHOTON_FAIL_STARTS``."""
+    counter = os.path.join(data_dir, ".fake-photon-starts")
+    try:
+        with open(counter) as f:
+            starts = int(f.read() or 0)
+    except (OSError, ValueError):
+        starts = 0
+    with open(counter, "w") as f:
+        f.write(str(starts + 1))
+    return starts < int(os.getenv("FAKE_PHOTON_FAIL_STARTS", "0"))
+
+
+def make_handler(data_dir: str):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if self.path == "/status":
+                self.reply({"status": "Ok", "import_date": read_marker(data_dir)})
+            elif self.path.startswith(("/api", "/reverse")):
+                feature = {"type": "Feature", "properties": {"name": read_marker(data_dir)}}
+                self.reply({"type": "FeatureCollection", "features": [feature]})
+            else:
+                self.send_error(404)
+
+        def reply(self, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    options = parse_args(sys.argv[1:])
+    data_dir = options.get("-data-dir", "/photon/data")
+    host = options.get("-listen-ip", "0.0.0.0")  # noqa: S104
+    port = int(options.get("-listen-port", "2322"))
+
+    time.sleep(float(os.getenv("FAKE_PHOTON_STARTUP_DELAY", "1")))
+    if not os.path.isdir(os.path.join(data_dir, "photon_data", "node_1")):
+        sys.exit(f"fake photon: no index in {data_dir}")
+    if failed_start(data_dir):
+        sys.exit("fake photon: injected startup failure")
+
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer((host, port), make_handler(data_dir))
+    crash_after = os.getenv("FAKE_PHOTON_CRASH_AFTER")
+    if crash_after:
+        threading.Timer(float(crash_after), os._exit, args=(137,)).start()
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare archive read throughput with and without download preallocation.
+
+Simulates a download that is appended in small chunks while other files grow on the same
+filesystem, then drops the file from the page cache and reads it back the way the extraction
+pipeline does. Run from the repository root on the volume you want to measure:
+
+    uv run python -m benchmarks.preallocation --dir /photon/data --size-mb 2048
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+from src.filesystem import EXTRACT_CHUNK_SIZE, preallocate
+
+
+def count_extents(path: str) -> int | None:
+    if not shutil.which("filefrag"):
+        return None
+    result = subprocess.run(["filefrag", path], capture_output=True, text=True, check=False)  # noqa S603 S607
+    match = re.search(r"(\d+) extents? found", result.stdout)
+    return int(match.group(1)) if match else None
+
+
+def drop_cache(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def write_interleaved(directory: str, size: int, chunk_size: int, writers: int, use_preallocation: bool) -> str:
+    paths = [os.path.join(directory, f"writer-{i}.bin") for i in range(writers)]
+    files = [open(path, "wb") for path in paths]  # noqa: SIM115
+    try:
+        if use_preallocation:
+            preallocate(files[0].fileno(), 0, size)
+
+        chunk = os.urandom(chunk_size)
+        written = 0
+        while written < size:
+            for f in files:
+                f.write(chunk)
+                f.flush()
+            written += chunk_size
+
+        for f in files:
+            os.fsync(f.fileno())
+    finally:
+        for f in files:
+            f.close()
+
+    for path in paths[1:]:
+        os.remove(path)
+    return paths[0]
+
+
+def read_throughput(path: str) -> float:
+    drop_cache(path)
+    start = time.perf_counter()
+    total = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(EXTRACT_CHUNK_SIZE):
+            total += len(chunk)
+    return total / (time.perf_counter() - start)
+
+
+def run(directory: str, size: int, chunk_size: int, writers: int, runs: int) -> dict:
+    results = {}
+    for mode, use_preallocation in (("plain", False), ("preallocated", True)):
+        samples = []
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory(dir=directory) as workdir:
+                path = write_interleaved(workdir, size, chunk_size, writers, use_preallocation)
+                samples.append({"extents": count_extents(path), "read_bytes_per_second": read_throughput(path)})
+        results[mode] = samples
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="directory on the filesystem to test")
+    parser.add_argument("--size-mb", type=int, default=1024, help="size of the simulated archive")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="size of each appended chunk")
+    parser.add_argument("--writers", type=int, default=3, help="files growing concurrently, including the archive")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", help="write raw results to this file")
+    args = parser.parse_args()
+
+    results = run(args.dir, args.size_mb * 1024 * 1024, args.chunk_kb * 1024, args.writers, args.runs)
+
+    for mode, samples in results.items():
+        rates = [s["read_bytes_per_second"] / (1024**2) for s in samples]
+        extents = [s["extents"] for s in samples]
+        print(f"{mode:>13}: read {min(rates):.1f}-{max(rates):.1f} MB/s, extents {extents}")  # noqa: T201
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Measure how long importing the manager takes and how much memory it holds afterwards.
+
+Every run starts a fresh interpreter, imports the module and reports the import time, the peak RSS and which of
+the heavyweight dependencies got loaded on the way. An interpreter that only imports nothing is measured as the
+baseline. Run from the repository root:
+
+    uv run python -m benchmarks.startup --runs 10 --max-import-ms 150 --max-rss-mb 10
+
+Exits non-zero when a threshold is exceeded or a heavy module is loaded, so it can guard against regressions.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["apprise", "requests", "urllib3", "psutil", "schedule", "dateutil", "tqdm"]
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+if sys.argv[1]:
+    __import__(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": sorted(name for name in sys.modules if name.split(".")[0] in sys.argv[2].split(",")),
+}))
+"""
+
+
+def probe(module: str) -> dict:
+    result = subprocess.run(  # noqa S603
+        [sys.executable, "-c", PROBE, module, ",".join(HEAVY_MODULES)], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def run(module: str, runs: int) -> dict:
+    baseline = [probe("") for _ in range(runs)]
+    samples = [probe(module) for _ in range(runs)]
+    return {
+        "module": module,
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "rss_mb": statistics.median(s["rss_kb"] for s in samples) / 1024,
+        "baseline_rss_mb": statistics.median(s["rss_kb"] for s in baseline) / 1024,
+        "heavy_modules": sorted({name.split(".")[0] for s in samples for name in s["modules"]}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.process_manager", help="module to import")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, help="fail if the median import time is above this")
+    parser.add_argument("--max-rss-mb", type=float, help="fail if the RSS added by the import is above this")
+    parser.add_argument("--allow-heavy", action="store_true", help="do not fail when heavy modules are imported")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.module, args.runs)
+    added_rss = results["rss_mb"] - results["baseline_rss_mb"]
+    print(  # noqa: T201
+        f"{results['module']}: import {results['import_ms']:.1f}ms, RSS {results['rss_mb']:.1f}MB "
+        f"(+{added_rss:.1f}MB over a bare interpreter), heavy modules: {', '.join(results['heavy_modules']) or 'none'}"
+    )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    if args.max_import_ms is not None and results["import_ms"] > args.max_import_ms:
+        failures.append(f"import took {results['import_ms']:.1f}ms, limit is {args.max_import_ms}ms")
+    if args.max_rss_mb is not None and added_rss > args.max_rss_mb:
+        failures.append(f"import added {added_rss:.1f}MB RSS, limit is {args.max_rss_mb}MB")
+    if results["heavy_modules"] and not args.allow_heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(results['heavy_modules'])}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")  # noqa: T201
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 #!/bin/sh
 
+PHOTON_CONTAINER_START=$(date +%s.%N)
+export PHOTON_CONTAINER_START
+
 PUID=${PUID:-9011}
 PGID=${PGID:-9011}
 
@@ -9,15 +12,11 @@ CURRENT_GID=$(id -g photon 2>/dev/null || echo "0")
 if [ "$CURRENT_GID" != "$PGID" ]; then
     echo "Updating photon group GID from $CURRENT_GID to $PGID"
     groupmod -o -g "$PGID" photon
-    echo "Updating ownership of files from GID $CURRENT_GID to $PGID"
-    find / -group "$CURRENT_GID" -exec chgrp -h "$PGID" {} \; 2>/dev/null
 fi
 
 if [ "$CURRENT_UID" != "$PUID" ]; then
     echo "Updating photon user UID from $CURRENT_UID to $PUID"
     usermod -o -u "$PUID" photon
-    echo "Updating ownership of files from UID $CURRENT_UID to $PUID"
-    find / -user "$CURRENT_UID" -exec chown -h "$PUID" {} \; 2>/dev/null
 fi
 
 if [ -d "/photon/data/photon_data/node_1" ]; then
@@ -33,5 +32,13 @@ elif [ -d "/photon/data/node_1" ]; then
     echo "Migration complete: moved node_1 to /photon/data/photon_data/"
 fi
 
-chown -R photon:photon /photon
+PHOTON_OWNERSHIP_START=$(date +%s.%N)
+export PHOTON_OWNERSHIP_START
+if ! uv run --no-sync -m src.ownership; then
+    echo "Ownership check failed, falling back to chown -R"
+    chown -R photon:photon /photon
+fi
+PHOTON_OWNERSHIP_DONE=$(date +%s.%N)
+export PHOTON_OWNERSHIP_DONE
+
 exec gosu photon "$@"
@@ -1,3 +1,10 @@
-from src.downloader import InsufficientSpaceError
-
 __all__ = ["InsufficientSpaceError"]
+
+
+def __getattr__(name: str):
+    # resolved on first use so importing any src module does not pull in the download stack
+    if name == "InsufficientSpaceError":
+        from src.disk_space import InsufficientSpaceError
+
+        return InsufficientSpaceError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+
+import requests
+from requests.exceptions import RequestException
+
+from src.trash import move_to_trash
+from src.utils import config
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+META_FILE = "meta.json"
+
+
+@dataclass
+class CacheEntry:
+    md5: str
+    path: str
+    archive: str
+    size: int
+    last_used: float
+    url: str | None = None
+    etag: str | None = None
+
+
+def enabled() -> bool:
+    return config.ARCHIVE_CACHE_MAX_GB > 0
+
+
+def max_size() -> int:
+    return int(config.ARCHIVE_CACHE_MAX_GB * 1024**3)
+
+
+def _read_entry(path: str) -> CacheEntry | None:
+    meta_file = os.path.join(path, META_FILE)
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+        archive = os.path.join(path, meta["archive"])
+        return CacheEntry(
+            md5=meta["md5"],
+            path=path,
+            archive=archive,
+            size=os.path.getsize(archive),
+            last_used=os.path.getmtime(meta_file),
+            url=meta.get("url"),
+            etag=meta.get("etag"),
+        )
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def entries() -> list[CacheEntry]:
+    """Cached archives, least recently used first."""
+    try:
+        names = os.listdir(config.ARCHIVE_CACHE_DIR)
+    except OSError:
+        return []
+    found = [_read_entry(os.path.join(config.ARCHIVE_CACHE_DIR, name)) for name in names if not name.startswith(".")]
+    return sorted((entry for entry in found if entry), key=lambda entry: entry.last_used)
+
+
+def get_etag(url: str) -> str | None:
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=10)
+        response.raise_for_status()
+        return response.headers.get("ETag")
+    except RequestException as e:
+        logging.debug(f"Could not fetch ETag for {url}: {e}")
+        return None
+
+
+def lookup(url: str, md5: str | None = None) -> CacheEntry | None:
+    """Find a cached archive by its published checksum, or by the origin's ETag when no checksum is available."""
+    if md5:
+        return _read_entry(os.path.join(config.ARCHIVE_CACHE_DIR, md5))
+
+    etag = get_etag(url)
+    if not etag:
+        return None
+    return next((entry for entry in entries() if entry.url == url and entry.etag == etag), None)
+
+
+def touch(entry: CacheEntry):
+    os.utime(os.path.join(entry.path, META_FILE))
+
+
+def _link_or_copy(source: str, destination: str):
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def restore(entry: CacheEntry, destination: str):
+    """Place a cached archive at ``destination``; a hard link when possible, so no data is copied."""
+    if os.path.exists(destination):
+        os.remove(destination)
+    _link_or_copy(entry.archive, destination)
+    touch(entry)
+    logging.info(f"Using cached archive {entry.md5} ({entry.size / (1024**3):.2f}GB), skipping download")
+
+
+def store(archive: str, md5: str, url: str) -> CacheEntry | None:
+    size = os.path.getsize(archive)
+    if size > max_size():
+        logging.info(f"Archive ({size / (1024**3):.2f}GB) is larger than ARCHIVE_CACHE_MAX_GB, not caching it")
+        return None
+
+    existing = _read_entry(os.path.join(config.ARCHIVE_CACHE_DIR, md5))
+    if existing:
+        touch(existing)
+        return existing
+
+    target = os.path.join(config.ARCHIVE_CACHE_DIR, md5)
+    staging = os.path.join(config.ARCHIVE_CACHE_DIR, f".{md5}.partial")
+    if os.path.exists(staging):
+        move_to_trash(staging)
+    os.makedirs(staging)
+
+    name = os.path.basename(archive)
+    etag = get_etag(url)
+    _link_or_copy(archive, os.path.join(staging, name))
+    with open(os.path.join(staging, META_FILE), "w") as f:
+        json.dump({"md5": md5, "archive": name, "url": url, "etag": etag, "stored": time.time()}, f)
+    os.rename(staging, target)
+    logging.info(f"Cached archive {md5} ({size / (1024**3):.2f}GB)")
+
+    evict(max_size())
+    return _read_entry(target)
+
+
+def evict(limit: int) -> int:
+    """Remove least recently used archives until the cache fits into ``limit`` bytes. Returns the bytes freed."""
+    cached = entries()
+    total = sum(entry.size for entry in cached)
+    freed = 0
+    for entry in cached:
+        if total - freed <= limit:
+            break
+        move_to_trash(entry.path)
+        freed += entry.size
+        logging.info(f"Evicted cached archive {entry.md5} ({entry.size / (1024**3):.2f}GB)")
+    return freed
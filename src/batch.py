@@ -0,0 +1,187 @@
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import cast
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.exceptions import RequestException
+
+from src.utils import config
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+BATCH_PATHS = {"/api": "/api", "/api/": "/api", "/reverse": "/reverse"}
+
+
+class BatchError(Exception):
+    pass
+
+
+def normalize_query(item) -> str:
+    """Turn one batch entry into a canonical request path, so identical queries share one backend request.
+
+    An entry is either a path (``"/api?q=berlin"``) or an object naming the path and its parameters
+    (``{"path": "/reverse", "lat": 52.5, "lon": 13.4}``).
+    """
+    if isinstance(item, str):
+        url = urlsplit(item)
+        path, params = url.path, parse_qsl(url.query, keep_blank_values=True)
+    elif isinstance(item, dict) and isinstance(item.get("path"), str):
+        path = item["path"]
+        params = []
+        for name, value in item.items():
+            if name == "path":
+                continue
+            values = value if isinstance(value, list) else [value]
+            params.extend((name, str(v).lower() if isinstance(v, bool) else str(v)) for v in values)
+    else:
+        raise BatchError("expected a path or an object with a 'path'")
+
+    if path not in BATCH_PATHS:
+        raise BatchError(f"unsupported path '{path}', use /api or /reverse")
+    query = urlencode(sorted(params))
+    return f"{BATCH_PATHS[path]}?{query}" if query else BATCH_PATHS[path]
+
+
+def parse_batch(body: bytes, content_type: str = "") -> list:
+    """Read a JSON array or NDJSON (one query per line) request body."""
+    text = body.decode("utf-8").strip()
+    if not text:
+        raise BatchError("empty batch")
+    try:
+        if "ndjson" not in content_type and text.startswith("["):
+            items = json.loads(text)
+        else:
+            items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    except ValueError as e:
+        raise BatchError(f"invalid JSON: {e}") from e
+    if not isinstance(items, list):
+        raise BatchError("expected a JSON array or NDJSON")
+    if len(items) > config.BATCH_MAX_QUERIES:
+        raise BatchError(f"batch of {len(items)} queries exceeds the limit of {config.BATCH_MAX_QUERIES}")
+    return items
+
+
+def backend_url() -> str:
+    host = config.PHOTON_LISTEN_IP
+    if host in ("0.0.0.0", "::", ""):  # noqa: S104
+        host = "localhost"
+    return f"http://{host}:{config.PHOTON_PORT}"
+
+
+class BatchServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, backend: str):
+        super().__init__(address, BatchHandler)
+        self.backend = backend
+        # shared by all batches, so the limit holds for Photon no matter how many clients send batches at once
+        self.pool = ThreadPoolExecutor(max_workers=config.BATCH_CONCURRENCY, thread_name_prefix="batch")
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def fetch(self, path: str) -> tuple[int, object]:
+        try:
+            response = self.session.get(self.backend + path, timeout=config.BATCH_BACKEND_TIMEOUT)
+        except RequestException as e:
+            return 503, {"message": f"Photon is unavailable: {e}"}
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, {"message": response.text}
+
+    def dispatch(self, items: list) -> list[Future | tuple[int, object]]:
+        """Start one backend request per distinct query; invalid entries get their error right away."""
+        futures: dict[str, Future] = {}
+        results = []
+        for item in items:
+            try:
+                path = normalize_query(item)
+            except BatchError as e:
+                results.append((400, {"message": str(e)}))
+                continue
+            if path not in futures:
+                futures[path] = self.pool.submit(self.fetch, path)
+            results.append(futures[path])
+        logging.debug(f"Batch: {len(items)} queries, {len(futures)} distinct")
+        return results
+
+
+class BatchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logging.debug(f"Batch: {self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/batch":
+            self._send_json(404, {"message": "POST a batch of queries to /batch"})
+            return
+
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._send_json(411, {"message": "Content-Length required"})
+            return
+        try:
+            items = parse_batch(self.rfile.read(int(length)), self.headers.get("Content-Type", ""))
+        except (BatchError, ValueError) as e:
+            self._send_json(400, {"message": str(e)})
+            return
+
+        results = cast(BatchServer, self.server).dispatch(items)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        # answers go out in request order, each as soon as it and everything before it is done;
+        # whatever is already finished behind the one we waited for is sent in the same chunk
+        index = 0
+        while index < len(results):
+            lines = []
+            while index < len(results) and (not lines or self.done(results[index])):
+                lines.append(self.line(index, results[index]))
+                index += 1
+            self._write_chunk(b"".join(lines))
+        self._write_chunk(b"")
+
+    @staticmethod
+    def done(result) -> bool:
+        return not isinstance(result, Future) or result.done()
+
+    @staticmethod
+    def line(index: int, result) -> bytes:
+        status, body = result.result() if isinstance(result, Future) else result
+        line = {"index": index, "status": status}
+        line["result" if status == 200 else "error"] = body
+        return json.dumps(line).encode() + b"\n"
+
+
+def start_batch_server() -> BatchServer:
+    server = BatchServer((config.PHOTON_LISTEN_IP, config.BATCH_PORT), backend_url())
+    thread = threading.Thread(target=server.serve_forever, name="batch-server", daemon=True)
+    thread.start()
+    logging.info(
+        f"Serving batch geocoding on {config.PHOTON_LISTEN_IP}:{config.BATCH_PORT}/batch "
+        f"with up to {config.BATCH_CONCURRENCY} concurrent Photon requests"
+    )
+    return server
@@ -0,0 +1,312 @@
+"""Replay geocoding queries against a running Photon and report throughput and latency percentiles.
+
+    python -m src.bench --duration 60 --concurrency 32
+    python -m src.bench --rate 200 --corpus queries.txt --label "Xmx8g" --output results.json
+
+The corpus holds one request path per line (``/api?q=...`` or ``/reverse?lon=...&lat=...``, ``#`` starts a comment)
+and is replayed in a loop. With ``--concurrency`` a fixed number of workers send requests back to back; with
+``--rate`` requests start on a fixed schedule regardless of how fast Photon answers, and their latency is measured
+from the scheduled start, so queueing behind a slow Photon is counted instead of hidden.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from http.client import HTTPConnection, HTTPException
+from urllib.parse import urlsplit
+
+from src.utils import config
+
+DEFAULT_CORPUS = [
+    "/api?q=berlin&limit=1",
+    "/api?q=hauptbahnhof%20hamburg",
+    "/api?q=rue%20de%20rivoli%20paris",
+    "/api?q=via%20roma&limit=5",
+    "/api?q=1600%20pennsylvania%20avenue&lang=en",
+    "/api?q=tokyo%20station",
+    "/api?q=harare",
+    "/api?q=sydney%20opera%20house",
+    "/reverse?lon=13.3889&lat=52.5170",
+    "/reverse?lon=2.3522&lat=48.8566",
+    "/reverse?lon=-73.9857&lat=40.7484",
+    "/reverse?lon=151.2153&lat=-33.8568",
+]
+PERCENTILES = (50, 95, 99)
+
+
+class RequestError(Exception):
+    pass
+
+
+def load_corpus(path: str | None) -> list[str]:
+    if not path:
+        return list(DEFAULT_CORPUS)
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    corpus = [line for line in lines if line and not line.startswith("#")]
+    if not corpus:
+        raise ValueError(f"No queries in {path}")
+    return corpus
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+@dataclass
+class Window:
+    start: float
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    by_endpoint: dict[str, int] = field(default_factory=dict)
+
+    def summary(self, seconds: float) -> dict:
+        latencies = sorted(self.latencies)
+        result = {
+            "t": round(self.start, 1),
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput": round(len(latencies) / seconds, 1) if seconds > 0 else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+        for p in PERCENTILES:
+            result[f"p{p}_ms"] = round(percentile(latencies, p) * 1000, 2)
+        return result
+
+
+class Connection:
+    """A keep-alive HTTP/1.1 connection that understands just enough of the protocol for Photon's responses."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def request(self, path: str) -> int:
+        if self.reader is None or self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        reader, writer = self.reader, self.writer
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept: application/json\r\n\r\n".encode())
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise RequestError("connection closed")
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if headers.get("transfer-encoding") == "chunked":
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                await reader.readexactly(size + 2)
+            await reader.readline()
+        elif "content-length" in headers:
+            await reader.readexactly(int(headers["content-length"]))
+        else:
+            await reader.read()
+            headers["connection"] = "close"
+
+        if headers.get("connection") == "close" or status_line.startswith(b"HTTP/1.0"):
+            await self.close()
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+
+class LoadGenerator:
+    def __init__(self, url: str, corpus: list[str], connections: int, timeout: float, interval: float):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 80
+        self.queries = itertools.cycle(corpus)
+        self.timeout = timeout
+        self.interval = interval
+        self.pool: asyncio.Queue[Connection] = asyncio.Queue()
+        for _ in range(connections):
+            self.pool.put_nowait(Connection(self.host, self.port))
+        self.started = 0.0
+        self.deadline = 0.0
+        self.windows: list[Window] = []
+        self.in_flight: set[asyncio.Task] = set()
+
+    def window(self, now: float) -> Window:
+        # requests still in flight at the deadline count towards the last interval
+        index = int((min(now, self.deadline) - self.started) // self.interval)
+        if now >= self.deadline and self.windows:
+            index = min(index, len(self.windows) - 1)
+        while len(self.windows) <= index:
+            window = Window(len(self.windows) * self.interval)
+            self.windows.append(window)
+            if len(self.windows) > 1:
+                report(self.windows[-2].summary(self.interval))
+        return self.windows[index]
+
+    async def send(self, scheduled: float):
+        path = next(self.queries)
+        connection = await self.pool.get()
+        try:
+            status = await asyncio.wait_for(connection.request(path), self.timeout)
+            ok = status == 200
+        except (TimeoutError, OSError, asyncio.IncompleteReadError, RequestError, ValueError, IndexError):
+            await connection.close()
+            ok = False
+        finally:
+            self.pool.put_nowait(connection)
+
+        now = time.monotonic()
+        window = self.window(now)
+        if ok:
+            window.latencies.append(now - scheduled)
+        else:
+            window.errors += 1
+        endpoint = path.split("?", 1)[0]
+        window.by_endpoint[endpoint] = window.by_endpoint.get(endpoint, 0) + 1
+
+    async def run_concurrency(self, workers: int, deadline: float):
+        async def worker():
+            while time.monotonic() < deadline:
+                await self.send(time.monotonic())
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+    async def run_rate(self, rate: float, deadline: float):
+        period = 1 / rate
+        scheduled = time.monotonic()
+        while scheduled < deadline:
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self.send(scheduled))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+            scheduled += period
+        await asyncio.gather(*self.in_flight)
+
+    async def run(self, duration: float, rate: float | None, concurrency: int) -> dict:
+        self.started = time.monotonic()
+        self.deadline = self.started + duration
+        if rate:
+            await self.run_rate(rate, self.deadline)
+        else:
+            await self.run_concurrency(concurrency, self.deadline)
+        while not self.pool.empty():
+            await self.pool.get_nowait().close()
+
+        elapsed = time.monotonic() - self.started
+        if self.windows:
+            last = self.windows[-1]
+            report(last.summary(elapsed - last.start))
+        total = Window(0.0)
+        for window in self.windows:
+            total.latencies.extend(window.latencies)
+            total.errors += window.errors
+            for endpoint, count in window.by_endpoint.items():
+                total.by_endpoint[endpoint] = total.by_endpoint.get(endpoint, 0) + count
+        summary = total.summary(elapsed)
+        summary["by_endpoint"] = total.by_endpoint
+        return {
+            "intervals": [window.summary(min(self.interval, elapsed - window.start)) for window in self.windows],
+            "summary": summary,
+        }
+
+
+def report(result: dict):
+    percentiles = " ".join(f"p{p} {result[f'p{p}_ms']:.1f}ms" for p in PERCENTILES)
+    print(  # noqa: T201
+        f"{result['t']:>6.0f}s  {result['throughput']:>8.1f} req/s  {percentiles}  max {result['max_ms']:.1f}ms  "
+        f"errors {result['errors']}",
+        flush=True,
+    )
+
+
+def photon_status(url: str) -> dict | None:
+    parts = urlsplit(url)
+    connection = HTTPConnection(parts.hostname or "localhost", parts.port or 80, timeout=10)
+    try:
+        connection.request("GET", "/status")
+        response = connection.getresponse()
+        return json.loads(response.read()) if response.status == 200 else None
+    except (OSError, HTTPException, ValueError):
+        return None
+    finally:
+        connection.close()
+
+
+@dataclass
+class BenchSettings:
+    url: str
+    duration: float
+    rate: float | None
+    concurrency: int
+    connections: int
+    corpus: str | None
+    label: str | None
+    java_params: str | None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=f"http://localhost:{config.PHOTON_PORT}", help="Photon base URL")
+    parser.add_argument("--corpus", help="file with one request path per line, a built-in sample by default")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rate", type=float, help="requests per second, started on a fixed schedule")
+    mode.add_argument("--concurrency", type=int, default=16, help="requests kept in flight")
+    parser.add_argument("--connections", type=int, help="size of the connection pool, defaults to the concurrency")
+    parser.add_argument("--timeout", type=float, default=10, help="seconds before a request counts as an error")
+    parser.add_argument("--interval", type=float, default=5, help="seconds per reported interval")
+    parser.add_argument("--label", help="name of this run in the results, e.g. the JVM settings under test")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    status = photon_status(args.url)
+    if status is None:
+        print(f"Photon is not answering at {args.url}", file=sys.stderr)  # noqa: T201
+        return 1
+
+    settings = BenchSettings(
+        url=args.url,
+        duration=args.duration,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        connections=args.connections or (args.concurrency if not args.rate else 64),
+        corpus=args.corpus,
+        label=args.label,
+        java_params=config.JAVA_PARAMS,
+    )
+    generator = LoadGenerator(args.url, load_corpus(args.corpus), settings.connections, args.timeout, args.interval)
+    results = asyncio.run(generator.run(args.duration, args.rate, args.concurrency))
+
+    summary = results["summary"]
+    print(  # noqa: T201
+        f"Total: {summary['requests']} requests, {summary['errors']} errors, {summary['throughput']:.1f} req/s, "
+        + ", ".join(f"p{p} {summary[f'p{p}_ms']:.1f}ms" for p in PERCENTILES)
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": asdict(settings), "photon": status, **results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+
+from src.utils import config, metrics
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+ARCHIVE_PREFIX = "photon-"
+ARCHIVE_SUFFIX = ".jsa"
+STARTUP_STATS_FILE = "startup.json"
+
+_digests: dict[tuple[str, int, int], str] = {}
+
+
+def jar_digest(jar: str) -> str:
+    """Short SHA-256 of the jar, cached per size and mtime so restarts do not hash it again."""
+    stat = os.stat(jar)
+    key = (jar, stat.st_size, stat.st_mtime_ns)
+    if key not in _digests:
+        sha256 = hashlib.sha256()
+        with open(jar, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                sha256.update(chunk)
+        _digests[key] = sha256.hexdigest()[:16]
+    return _digests[key]
+
+
+def archive_path(jar: str | None = None) -> str:
+    jar = jar or config.PHOTON_JAR
+    return os.path.join(config.CDS_DIR, f"{ARCHIVE_PREFIX}{jar_digest(jar)}{ARCHIVE_SUFFIX}")
+
+
+def remove_stale_archives(current: str):
+    for name in os.listdir(config.CDS_DIR):
+        path = os.path.join(config.CDS_DIR, name)
+        if name.startswith(ARCHIVE_PREFIX) and name.endswith(ARCHIVE_SUFFIX) and path != current:
+            logging.info(f"Removing class data archive of a previous photon.jar: {name}")
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.warning(f"Could not remove {path}: {e}")
+
+
+def class_data_options(java_params: str, maintain: bool) -> tuple[list[str], bool]:
+    """JVM options for the AppCDS archive of the installed photon.jar, and whether that archive exists already.
+
+    The archive is named after the jar's hash, so a new Photon version starts without one. The ``maintain``ing
+    instance runs with ``-XX:+AutoCreateSharedArchive``: the JVM dumps the loaded classes when it exits and
+    recreates the archive by itself if it no longer matches the JVM. Other instances only map an existing archive.
+    """
+    if not config.CDS_ARCHIVE or "SharedArchiveFile" in java_params:
+        return [], False
+    try:
+        os.makedirs(config.CDS_DIR, exist_ok=True)
+        path = archive_path()
+    except OSError as e:
+        logging.warning(f"Class data archive disabled: {e}")
+        return [], False
+
+    exists = os.path.isfile(path)
+    if maintain:
+        remove_stale_archives(path)
+        if not exists:
+            logging.info("No class data archive for this photon.jar yet, Photon will create it when it stops")
+        return ["-XX:+AutoCreateSharedArchive", f"-XX:SharedArchiveFile={path}"], exists
+    return ([f"-XX:SharedArchiveFile={path}"], True) if exists else ([], False)
+
+
+def record_startup(seconds: float, with_archive: bool):
+    """Log how long Photon took to become ready, next to the last start in the other mode for comparison."""
+    mode, other = ("with", "without") if with_archive else ("without", "with")
+    stats_file = os.path.join(config.CDS_DIR, STARTUP_STATS_FILE)
+    try:
+        with open(stats_file) as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        stats = {}
+
+    comparison = f", {stats[other]:.1f}s {other} it last time" if other in stats else ""
+    logging.info(f"Photon ready in {seconds:.1f}s {mode} class data archive{comparison}")
+
+    stats[mode] = seconds
+    try:
+        with open(stats_file, "w") as f:
+            json.dump(stats, f)
+    except OSError as e:
+        logging.debug(f"Could not write {stats_file}: {e}")
+    metrics.set_gauge("photon_jvm_ready_seconds", seconds, "Seconds from JVM launch until Photon was ready", cds=mode)
@@ -5,9 +5,12 @@ import requests
 from dateutil.parser import parse as parsedate
 from requests.exceptions import RequestException
 
+from src.generations import Generation, list_generations
+from src.manifest import IndexManifest, describe_change, read_manifest
 from src.utils import config
 from src.utils.logger import get_logger
 from src.utils.regions import get_index_url_path
+from src.utils.sanitize import sanitize_url
 
 logging = get_logger()
 
@@ -54,8 +57,35 @@ def get_remote_time(remote_url: str):
     return None
 
 
-def get_local_time(local_path: str):
-    marker_file = os.path.join(config.DATA_DIR, ".photon-index-updated")
+def get_remote_identity(url: str, md5_url: str | None = None) -> IndexManifest | None:
+    """Describe the archive currently published at ``url`` without downloading it."""
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=10)
+        response.raise_for_status()
+    except RequestException as e:
+        logging.warning(f"Could not fetch remote index metadata: {e}")
+        return None
+
+    content_length = response.headers.get("content-length")
+    identity = IndexManifest(
+        url=sanitize_url(url),
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+        size=int(content_length) if content_length and content_length.isdigit() else None,
+    )
+
+    if md5_url:
+        try:
+            response = requests.get(md5_url, timeout=10)
+            response.raise_for_status()
+            identity.md5 = response.text.split()[0].strip().lower()
+        except (RequestException, IndexError) as e:
+            logging.debug(f"Could not fetch published MD5 from {sanitize_url(md5_url)}: {e}")
+    return identity
+
+
+def get_local_time(local_path: str, data_dir: str | None = None):
+    marker_file = os.path.join(data_dir or config.DATA_DIR, ".photon-index-updated")
     if os.path.exists(marker_file):
         return os.path.getmtime(marker_file)
 
@@ -64,25 +94,62 @@ def get_local_time(local_path: str):
     return os.path.getmtime(local_path)
 
 
-def compare_mtime() -> bool:
+def update_available(region: str | None = None, data_dir: str | None = None, index_dir: str | None = None) -> bool:
+    """Whether the remote serves a different index than the one in ``index_dir`` (the live index by default)."""
+    region = region or config.REGION
+    data_dir = data_dir or config.DATA_DIR
     try:
-        index_path = get_index_url_path(config.REGION, config.INDEX_DB_VERSION, config.INDEX_FILE_EXTENSION)
+        index_path = get_index_url_path(region, config.INDEX_DB_VERSION, config.INDEX_FILE_EXTENSION)
     except ValueError as e:
         logging.error(str(e))
         return False
 
     remote_url = config.BASE_URL + index_path
 
+    local = read_manifest(index_dir or os.path.join(data_dir, "photon_data"))
+    if local is None:
+        logging.debug("Installed index has no manifest, falling back to timestamps")
+        return compare_mtime(remote_url, data_dir)
+
+    remote = get_remote_identity(remote_url, None if config.SKIP_MD5_CHECK else remote_url + ".md5")
+    if remote is None:
+        logging.warning("Could not determine remote index. Assuming no update is needed.")
+        return False
+
+    change = describe_change(local, remote)
+    if change:
+        rolled_back = _rolled_back_generation(os.path.join(data_dir, "photon_data"), remote)
+        if rolled_back:
+            logging.warning(
+                f"Remote index is generation {rolled_back.name}, which was rolled back; "
+                "waiting for the next published index instead of reinstalling it"
+            )
+            return False
+        logging.info(f"Remote index changed: {change}")
+        return True
+    logging.debug(f"Installed index matches the remote ({remote.etag or remote.last_modified})")
+    return False
+
+
+def _rolled_back_generation(index_dir: str, remote: IndexManifest) -> Generation | None:
+    """An inactive generation that is identical to the remote index was installed before and then rolled back."""
+    for generation in list_generations(index_dir):
+        if not generation.active and generation.manifest and describe_change(generation.manifest, remote) is None:
+            return generation
+    return None
+
+
+def compare_mtime(remote_url: str, data_dir: str) -> bool:
     remote_dt = get_remote_time(remote_url)
 
     if remote_dt is None:
         logging.warning("Could not determine remote time. Assuming no update is needed.")
         return False
 
-    marker_file = os.path.join(config.DATA_DIR, ".photon-index-updated")
+    marker_file = os.path.join(data_dir, ".photon-index-updated")
     using_marker_file = os.path.exists(marker_file)
 
-    local_timestamp = get_local_time(config.OS_NODE_DIR)
+    local_timestamp = get_local_time(os.path.join(data_dir, "photon_data", "node_1"), data_dir)
     local_dt = datetime.datetime.fromtimestamp(local_timestamp, tz=datetime.UTC)
 
     logging.debug(f"Remote index time: {remote_dt}")
@@ -107,12 +174,15 @@ def check_index_age() -> bool:
         logging.warning(f"Invalid MIN_INDEX_DATE format: {config.MIN_INDEX_DATE}. Expected DD.MM.YY")
         return True
 
-    local_timestamp = get_local_time(config.OS_NODE_DIR)
-    if local_timestamp == 0.0:
-        logging.info("No local index found, update required")
-        return True
-
-    local_dt = datetime.datetime.fromtimestamp(local_timestamp, tz=datetime.UTC)
+    manifest = read_manifest(config.PHOTON_DATA_DIR)
+    if manifest and manifest.last_modified:
+        local_dt = parsedate(manifest.last_modified)
+    else:
+        local_timestamp = get_local_time(config.OS_NODE_DIR)
+        if local_timestamp == 0.0:
+            logging.info("No local index found, update required")
+            return True
+        local_dt = datetime.datetime.fromtimestamp(local_timestamp, tz=datetime.UTC)
 
     logging.debug(f"Local index date: {local_dt.date()}")
     logging.debug(f"Minimum required date: {min_date.date()}")
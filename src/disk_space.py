@@ -0,0 +1,306 @@
+import bz2
+import os
+from dataclasses import dataclass, field
+
+import requests
+
+from src.generations import list_generations
+from src.trash import find_trash
+from src.utils import config
+from src.utils.logger import get_logger
+from src.utils.tarstream import TarStreamScanner
+
+logging = get_logger()
+
+FALLBACK_EXTRACTION_RATIO = 1.63
+# least downtime first; SEQUENTIAL needs as much space as PARALLEL, so it is never picked automatically
+AUTO_STRATEGIES = ("PARALLEL", "HYBRID")
+MIN_EXTRACTION_RATIO = 1.0
+MAX_EXTRACTION_RATIO = 5.0
+
+
+class InsufficientSpaceError(Exception):
+    pass
+
+
+@dataclass
+class SizeEstimate:
+    extracted_size: int
+    file_count: int
+    source: str
+
+
+@dataclass
+class ArchiveSample:
+    compressed_bytes: int
+    uncompressed_bytes: int
+    files: int
+
+    @property
+    def ratio(self) -> float:
+        return min(max(self.uncompressed_bytes / self.compressed_bytes, MIN_EXTRACTION_RATIO), MAX_EXTRACTION_RATIO)
+
+
+@dataclass
+class FilesystemRequirement:
+    path: str
+    available: int
+    parts: list[tuple[str, int]] = field(default_factory=list)
+    when: str = ""
+
+    @property
+    def needed(self) -> int:
+        return sum(size for _, size in self.parts)
+
+    @property
+    def sufficient(self) -> bool:
+        return self.available >= self.needed
+
+
+@dataclass
+class SpacePlan:
+    strategy: str
+    download_size: int
+    estimate: SizeEstimate
+    requirements: list[FilesystemRequirement]
+
+    @property
+    def sufficient(self) -> bool:
+        return all(req.sufficient for req in self.requirements)
+
+
+def get_available_space(path: str) -> int:
+    try:
+        statvfs = os.statvfs(path)
+        return statvfs.f_frsize * statvfs.f_bavail
+    except (OSError, AttributeError):
+        return 0
+
+
+def get_block_size(path: str) -> int:
+    try:
+        return os.statvfs(path).f_frsize
+    except (OSError, AttributeError):
+        return 4096
+
+
+def _existing_path(path: str) -> str:
+    while path and not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path or config.DATA_DIR
+
+
+def directory_size(path: str, unshared: bool = False) -> tuple[int, int]:
+    """Return the allocated size and file count of a directory tree.
+
+    With ``unshared`` only files without other hard links count, i.e. the space deleting the tree would free.
+    """
+    total = 0
+    files = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            stat = entry.stat(follow_symlinks=False)
+                            if unshared and stat.st_nlink > 1:
+                                continue
+                            total += stat.st_blocks * 512
+                            files += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total, files
+
+
+def sample_archive(url: str, sample_bytes: int | None = None) -> ArchiveSample | None:
+    """Decompress the head of the remote archive and scan its tar headers to measure the real expansion ratio."""
+    sample_bytes = sample_bytes or config.SPACE_SAMPLE_SIZE
+    decompressor = bz2.BZ2Decompressor()
+    scanner = TarStreamScanner()
+    consumed = 0
+    produced = 0
+
+    try:
+        with requests.get(url, headers={"Range": f"bytes=0-{sample_bytes - 1}"}, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                if decompressor.eof or consumed >= sample_bytes:
+                    break
+                chunk = chunk[: sample_bytes - consumed]
+                consumed += len(chunk)
+                data = decompressor.decompress(chunk)
+                produced += len(data)
+                scanner.feed(data)
+    except Exception as e:
+        logging.warning(f"Could not sample archive headers from {url}: {e}")
+        return None
+
+    if consumed == 0 or produced == 0:
+        return None
+
+    logging.debug(f"Archive sample: {consumed} compressed bytes -> {produced} bytes, {scanner.files} files")
+    return ArchiveSample(consumed, produced, scanner.files)
+
+
+def estimate_extracted_size(download_size: int, url: str | None = None) -> SizeEstimate:
+    if url:
+        sample = sample_archive(url)
+        if sample:
+            extracted = int(download_size * sample.ratio)
+            files = int(sample.files * extracted / sample.uncompressed_bytes)
+            return SizeEstimate(extracted, files, f"sampled tar headers (ratio {sample.ratio:.2f})")
+
+    if os.path.isdir(config.PHOTON_DATA_DIR):
+        size, files = directory_size(config.PHOTON_DATA_DIR)
+        if size:
+            return SizeEstimate(size, files, "size of the current index")
+
+    return SizeEstimate(int(download_size * FALLBACK_EXTRACTION_RATIO), 0, f"fixed ratio {FALLBACK_EXTRACTION_RATIO}")
+
+
+def reclaimable_index_size() -> int:
+    """Space freed by deleting every installed index generation; files hard-linked by replicas stay allocated."""
+    paths = [generation.path for generation in list_generations(config.PHOTON_DATA_DIR)]
+    if not paths and os.path.isdir(config.PHOTON_DATA_DIR):
+        paths = [config.PHOTON_DATA_DIR]
+    return sum(directory_size(path, unshared=True)[0] for path in paths)
+
+
+def downloaded_archive_size(download_size: int) -> int:
+    """Space an interrupted download already holds in TEMP_DIR, which a resumed download does not need again."""
+    # same path as downloader.archive_path(), which imports this module
+    archive = os.path.join(config.TEMP_DIR, f"photon-db-latest.{config.INDEX_FILE_EXTENSION}")
+    try:
+        # allocated rather than apparent size, a preallocated archive already holds its full size
+        return min(os.stat(archive).st_blocks * 512, download_size)
+    except OSError:
+        return 0
+
+
+def plan_update(
+    download_size: int, url: str | None = None, strategy: str = "PARALLEL", estimate: SizeEstimate | None = None
+) -> SpacePlan:
+    """Work out how much space each filesystem involved in an update needs.
+
+    The archive and the extracted tree live in TEMP_DIR until the swap; the swap is a rename when TEMP_DIR and
+    PHOTON_DATA_DIR share a filesystem and a full copy otherwise. For PARALLEL and SEQUENTIAL updates the active index
+    and older generations stay on disk until the new index has been verified, so they are never counted as free. A
+    HYBRID update only needs room for the archive while Photon serves and deletes the installed index before
+    extracting, so that space counts towards the extraction.
+    """
+    estimate = estimate or estimate_extracted_size(download_size, url)
+    margin = config.SPACE_SAFETY_MARGIN
+    reclaimable = reclaimable_index_size() if strategy == "HYBRID" else 0
+    downloaded = downloaded_archive_size(download_size)
+
+    temp_path = _existing_path(config.TEMP_DIR)
+    data_path = _existing_path(config.PHOTON_DATA_DIR)
+    block_overhead = estimate.file_count * get_block_size(temp_path) // 2
+
+    temp_req = FilesystemRequirement(temp_path, get_available_space(temp_path))
+    temp_req.parts.append(("compressed archive", download_size))
+    if downloaded:
+        temp_req.parts.append(("compressed archive, already downloaded", -downloaded))
+    temp_req.parts.append(("extracted index", estimate.extracted_size))
+    temp_req.parts.append(("filesystem block overhead", block_overhead))
+    temp_req.parts.append(("safety margin", int((download_size + estimate.extracted_size) * margin)))
+    requirements = [temp_req]
+
+    same_filesystem = os.stat(temp_path).st_dev == os.stat(data_path).st_dev
+    if not same_filesystem:
+        data_req = FilesystemRequirement(data_path, get_available_space(data_path))
+        data_req.parts.append(("extracted index (copied across filesystems)", estimate.extracted_size))
+        data_req.parts.append(("filesystem block overhead", estimate.file_count * get_block_size(data_path) // 2))
+        data_req.parts.append(("safety margin", int(estimate.extracted_size * margin)))
+        requirements.append(data_req)
+
+    if reclaimable:
+        (temp_req if same_filesystem else data_req).parts.append(("installed index, deleted first", -reclaimable))
+        for req in requirements:
+            req.when = "while extracting"
+        download_req = FilesystemRequirement(temp_path, temp_req.available, when="while Photon serves")
+        download_req.parts.append(("compressed archive", download_size))
+        if downloaded:
+            download_req.parts.append(("compressed archive, already downloaded", -downloaded))
+        download_req.parts.append(("safety margin", int(download_size * margin)))
+        requirements.insert(0, download_req)
+
+    return SpacePlan(strategy, download_size, estimate, requirements)
+
+
+def _gb(size: int) -> str:
+    return f"{size / (1024**3):.2f} GB"
+
+
+def log_plan(plan: SpacePlan):
+    logging.info(f"{plan.strategy.capitalize()} update space requirements:")
+    logging.info(f"  Download size: {_gb(plan.download_size)}")
+    logging.info(f"  Estimated extracted size: {_gb(plan.estimate.extracted_size)} (from {plan.estimate.source})")
+    if plan.estimate.file_count:
+        logging.info(f"  Estimated file count: {plan.estimate.file_count}")
+
+    generations = list_generations(config.PHOTON_DATA_DIR)
+    if generations:
+        logging.info(
+            f"  Installed index generations: {len(generations)} (older ones are removed if space is short, "
+            f"the active one is kept until the new index is verified)"
+        )
+    elif os.path.exists(config.PHOTON_DATA_DIR):
+        logging.info("  Existing photon_data is kept until the new index is verified")
+    trash = find_trash()
+    if trash:
+        logging.info(f"  Pending trash entries: {len(trash)} (reclaimed if space is short)")
+
+    for req in plan.requirements:
+        logging.info(f"  Filesystem of {req.path}{f' ({req.when})' if req.when else ''}:")
+        for label, size in req.parts:
+            logging.info(f"    {label}: {_gb(size)}")
+        logging.info(f"    Total needed: {_gb(req.needed)}, available: {_gb(req.available)}")
+
+
+def check_disk_space_requirements(download_size: int, strategy: str = "PARALLEL", url: str | None = None) -> str | None:
+    """Return the strategy the update can run with, or ``None`` if it does not fit.
+
+    ``AUTO`` measures the free space once and picks the first of ``AUTO_STRATEGIES`` that fits.
+    """
+    candidates = AUTO_STRATEGIES if strategy == "AUTO" else (strategy,)
+    estimate = estimate_extracted_size(download_size, url)
+
+    for candidate in candidates:
+        plan = plan_update(download_size, url, candidate, estimate)
+        if plan.sufficient:
+            log_plan(plan)
+            logging.info(f"Sufficient disk space available for {candidate.lower()} update")
+            return candidate
+        logging.debug(f"Not enough disk space for a {candidate.lower()} update")
+
+    log_plan(plan)
+    for req in plan.requirements:
+        if not req.sufficient:
+            logging.error(f"Insufficient space on {req.path}: need {_gb(req.needed)}, have {_gb(req.available)}")
+    return None
+
+
+def check_extraction_space(path: str, archive_bytes: int, archive_size: int, written_bytes: int):
+    """Abort an extraction early once the projected remaining output no longer fits on disk."""
+    available = get_available_space(path)
+    if available < config.SPACE_MIN_FREE:
+        raise InsufficientSpaceError(f"Only {_gb(available)} left on {path} during extraction")
+
+    if archive_bytes < archive_size * 0.01 or not written_bytes:
+        return
+
+    remaining = int(written_bytes / archive_bytes * (archive_size - archive_bytes))
+    if available < remaining:
+        raise InsufficientSpaceError(
+            f"Extraction would need about {_gb(remaining)} more on {path}, but only {_gb(available)} is available"
+        )
@@ -1,88 +1,47 @@
+import hashlib
 import json
 import os
-import shutil
 import sys
+import threading
 import time
 
 import requests
 from requests.exceptions import RequestException
 from tqdm import tqdm
 
-from src.check_remote import RemoteFileSizeError, get_local_time, get_remote_file_size
-from src.filesystem import clear_temp_dir, extract_index, move_index, verify_checksum
-from src.utils import config
+from src import archive_cache
+from src.check_remote import RemoteFileSizeError, get_local_time, get_remote_file_size, get_remote_identity
+from src.disk_space import InsufficientSpaceError, check_disk_space_requirements
+from src.filesystem import (
+    cleanup_staging_and_temp_backup,
+    clear_temp_dir,
+    extract_index,
+    get_extract_state_file,
+    load_extract_state,
+    move_index,
+    preallocate,
+    stage_pending_index,
+    verify_checksum,
+)
+from src.generations import discard_index, prune_generations
+from src.integrity import check_index
+from src.manifest import IndexManifest
+from src.peers import download_from_peers, publish_archive
+from src.trash import find_trash, move_to_trash, reap_all
+from src.utils import config, metrics
+from src.utils.dag import Step, run_dag
 from src.utils.logger import get_logger
 from src.utils.regions import get_index_url_path
 from src.utils.sanitize import sanitize_url
 
 
-class InsufficientSpaceError(Exception):
+class DownloadCancelledError(Exception):
     pass
 
 
 logging = get_logger()
 
 
-def get_available_space(path: str) -> int:
-    try:
-        statvfs = os.statvfs(path)
-        return statvfs.f_frsize * statvfs.f_bavail
-    except (OSError, AttributeError):
-        return 0
-
-
-def check_disk_space_requirements(download_size: int, is_parallel: bool = True) -> bool:
-    temp_available = get_available_space(config.TEMP_DIR if os.path.exists(config.TEMP_DIR) else config.DATA_DIR)
-    data_available = get_available_space(
-        config.PHOTON_DATA_DIR if os.path.exists(config.PHOTON_DATA_DIR) else config.DATA_DIR
-    )
-
-    compressed_size = download_size
-    extracted_size = int(download_size * 1.63)
-
-    if is_parallel:
-        temp_needed = compressed_size + extracted_size
-        data_needed = extracted_size
-        total_needed = int(download_size * 1.7)
-
-        logging.info("Parallel update space requirements:")
-        logging.info(f"  Download size: {compressed_size / (1024**3):.2f} GB")
-        logging.info(f"  Estimated extracted size: {extracted_size / (1024**3):.2f} GB")
-        logging.info(f"  Total space needed: {total_needed / (1024**3):.2f} GB")
-        logging.info(f"  Temp space available: {temp_available / (1024**3):.2f} GB")
-        logging.info(f"  Data space available: {data_available / (1024**3):.2f} GB")
-
-        if temp_available < temp_needed:
-            logging.error(
-                f"Insufficient temp space: need {temp_needed / (1024**3):.2f} GB, have {temp_available / (1024**3):.2f} GB"
-            )
-            return False
-
-        if data_available < data_needed:
-            logging.error(
-                f"Insufficient data space: need {data_needed / (1024**3):.2f} GB, have {data_available / (1024**3):.2f} GB"
-            )
-            return False
-
-    else:
-        temp_needed = compressed_size + extracted_size
-
-        logging.info("Sequential update space requirements:")
-        logging.info(f"  Download size: {compressed_size / (1024**3):.2f} GB")
-        logging.info(f"  Estimated extracted size: {extracted_size / (1024**3):.2f} GB")
-        logging.info(f"  Temp space needed: {temp_needed / (1024**3):.2f} GB")
-        logging.info(f"  Temp space available: {temp_available / (1024**3):.2f} GB")
-
-        if temp_available < temp_needed:
-            logging.error(
-                f"Insufficient temp space: need {temp_needed / (1024**3):.2f} GB, have {temp_available / (1024**3):.2f} GB"
-            )
-            return False
-
-    logging.info("Sufficient disk space available for update")
-    return True
-
-
 def get_download_state_file(destination: str) -> str:
     return destination + ".download_state"
 
@@ -162,58 +121,258 @@ def get_download_url() -> str:
     return download_url
 
 
-def parallel_update():
-    logging.info("Starting parallel update process...")
+def prepare_temp_dir():
+    resumable = [
+        os.path.basename(path)
+        for path in (get_download_state_file(archive_path()), get_extract_state_file(archive_path()))
+        if os.path.exists(path)
+    ]
+    if resumable:
+        logging.info(f"Keeping {config.TEMP_DIR} to resume the interrupted update ({', '.join(resumable)})")
+        return
+
+    if os.path.isdir(config.TEMP_DIR):
+        logging.debug(f"Temporary directory {config.TEMP_DIR} exists. Attempting to remove it.")
+        try:
+            move_to_trash(config.TEMP_DIR)
+            logging.debug(f"Successfully removed directory: {config.TEMP_DIR}")
+        except Exception as e:
+            logging.error(f"Failed to remove existing TEMP_DIR: {e}")
+            raise
+
+    logging.debug(f"Creating temporary directory: {config.TEMP_DIR}")
+    os.makedirs(config.TEMP_DIR, exist_ok=True)
+
+
+def ensure_disk_space(strategy: str) -> str:
+    """Make sure the update fits, reclaiming space if needed, and return the strategy it runs with.
+
+    ``AUTO`` resolves to the strategy with the least downtime that fits on disk.
+    """
+    download_url = get_download_url()
 
     try:
-        if os.path.isdir(config.TEMP_DIR):
-            logging.debug(f"Temporary directory {config.TEMP_DIR} exists. Attempting to remove it.")
-            try:
-                shutil.rmtree(config.TEMP_DIR)
-                logging.debug(f"Successfully removed directory: {config.TEMP_DIR}")
-            except Exception as e:
-                logging.error(f"Failed to remove existing TEMP_DIR: {e}")
-                raise
+        file_size = get_remote_file_size(download_url)
+        fits = check_disk_space_requirements(file_size, strategy=strategy, url=download_url)
+        if not fits and find_trash():
+            logging.info("Reclaiming space from pending trash before re-checking disk space")
+            reap_all()
+            fits = check_disk_space_requirements(file_size, strategy=strategy, url=download_url)
+        if not fits and prune_generations(config.PHOTON_DATA_DIR, keep=1):
+            logging.info("Removed older index generations before re-checking disk space")
+            reap_all()
+            fits = check_disk_space_requirements(file_size, strategy=strategy, url=download_url)
+        if not fits and archive_cache.entries():
+            logging.info("Evicting cached archives before re-checking disk space")
+            archive_cache.evict(0)
+            reap_all()
+            fits = check_disk_space_requirements(file_size, strategy=strategy, url=download_url)
+        if not fits:
+            logging.error(f"Insufficient disk space for {strategy.lower()} update")
+            raise InsufficientSpaceError(f"Insufficient disk space for {strategy.lower()} update")
+        return fits
+    except RemoteFileSizeError as e:
+        if config.SKIP_SPACE_CHECK:
+            logging.warning(f"{e}")
+            logging.warning("SKIP_SPACE_CHECK is enabled, proceeding without space check")
+            # without a size nothing is known to fit, so never delete the installed index up front
+            return "PARALLEL" if strategy == "AUTO" else strategy
+        else:
+            logging.error(f"{e}")
+            logging.error(
+                "Cannot proceed without verifying disk space. "
+                "Set SKIP_SPACE_CHECK=true to bypass this check (not recommended)."
+            )
+            raise
+
+
+def build_update_steps(
+    strategy: str, cancel_event: threading.Event, stage_only: bool = False, phase: str = "all"
+) -> list[Step]:
+    """Describe the update as a dependency graph so that independent phases can overlap.
+
+    The MD5 sidecar is fetched while the index downloads, stale staging/backup directories are removed
+    while the remote size is probed, and the checksum is computed from the same read stream that feeds
+    the extraction instead of re-reading the archive afterwards. With ``stage_only`` the verified index is
+    parked in ``PENDING_INDEX_DIR`` instead of replacing the live one.
+
+    HYBRID updates (and AUTO ones that resolve to HYBRID) delete the installed index right before extracting. The
+    ``download`` phase stops once the archive is downloaded and verified, so the manager can stop Photon before the
+    ``install`` phase picks the archive up from TEMP_DIR.
+    """
+    hasher = hashlib.md5()  # noqa S303
+    # the digest also keys the archive cache, so compute it even when the published MD5 is not checked
+    stream_hasher = hasher if not config.SKIP_MD5_CHECK or archive_cache.enabled() else None
+    frees_index = strategy in ("HYBRID", "AUTO") and not stage_only
+
+    def extract(results):
+        serving = stage_only or results["check_disk_space"] == "PARALLEL"
+        return extract_index(
+            results["download_index"], cancel_event=cancel_event, hasher=stream_hasher, serving=serving
+        )
+
+    def check(results):
+        logging.info("Checking extracted index...")
+        check_index(os.path.join(config.TEMP_DIR, "photon_data"), results["extract_index"], config.TEMP_DIR)
+
+    def verify(results):
+        logging.info("Verifying checksum...")
+        verify_checksum(results["download_md5"], results["download_index"], digest=hasher.hexdigest())
+        logging.debug("Checksum verification successful.")
+
+    def move(results):
+        logging.info("Moving new index into place...")
+        move_index(index_manifest(results, stream_hasher))
 
-        logging.debug(f"Creating temporary directory: {config.TEMP_DIR}")
-        os.makedirs(config.TEMP_DIR, exist_ok=True)
+    def stage(results):
+        stage_pending_index(index_manifest(results, stream_hasher))
 
-        download_url = get_download_url()
+    def retain(results):
+        # cached archives are served to peers as well, so they only need a separate copy without a cache
+        if archive_cache.enabled():
+            archive_cache.store(results["download_index"], hasher.hexdigest(), get_download_url())
+        else:
+            publish_archive(results["download_index"], hasher.hexdigest())
+
+    steps = _fetch_steps(strategy, cancel_event, phase)
+    extract_deps = ("download_index",)
+    if frees_index:
+        removal, extract_deps = _free_index_steps(phase)
+        steps.extend(removal)
+    if phase == "download":
+        return steps
+
+    steps.append(Step("remote_identity", lambda _results: get_remote_identity(get_download_url())))
+    steps.append(Step("extract_index", extract, depends_on=(*extract_deps, "check_disk_space")))
+    move_deps = ("extract_index",)
+
+    if not config.SKIP_MD5_CHECK:
+        steps.append(Step("verify_checksum", verify, depends_on=("extract_index", "download_md5")))
+        move_deps = ("extract_index", "verify_checksum")
+
+    steps.append(Step("check_index", check, depends_on=("extract_index",)))
+    move_deps = ("check_index", *move_deps)
+
+    move_step = "stage_index" if stage_only else "move_index"
+    steps.append(
+        Step(move_step, stage if stage_only else move, depends_on=(*move_deps, "archive_size", "remote_identity"))
+    )
+    clear_deps = (move_step,)
 
-        try:
-            file_size = get_remote_file_size(download_url)
-            if not check_disk_space_requirements(file_size, is_parallel=True):
-                logging.error("Insufficient disk space for parallel update")
-                raise InsufficientSpaceError("Insufficient disk space for parallel update")
-        except RemoteFileSizeError as e:
-            if config.SKIP_SPACE_CHECK:
-                logging.warning(f"{e}")
-                logging.warning("SKIP_SPACE_CHECK is enabled, proceeding without space check")
-            else:
-                logging.error(f"{e}")
-                logging.error(
-                    "Cannot proceed without verifying disk space. "
-                    "Set SKIP_SPACE_CHECK=true to bypass this check (not recommended)."
-                )
-                raise
-
-        logging.info("Downloading index")
-
-        index_file = download_index()
-
-        extract_index(index_file)
+    if archive_cache.enabled() or (config.PEER_SERVE and not config.SKIP_MD5_CHECK):
+        # retaining moves the archive out of TEMP_DIR, so it has to wait until nothing else reads it
+        steps.append(Step("retain_archive", retain, depends_on=(move_step,)))
+        clear_deps = (move_step, "retain_archive")
+
+    steps.append(Step("clear_temp_dir", lambda _results: clear_temp_dir(), depends_on=clear_deps))
+    return steps
 
+
+def _fetch_steps(strategy: str, cancel_event: threading.Event, phase: str) -> list[Step]:
+    """Steps that provide the archive and its checksum file, or find them in TEMP_DIR for the install phase."""
+    if phase == "install":
+        steps = [
+            Step("check_disk_space", lambda _results: strategy),
+            Step("download_index", lambda _results: archive_path()),
+        ]
         if not config.SKIP_MD5_CHECK:
-            md5_file = download_md5()
+            steps.append(Step("download_md5", lambda _results: archive_path() + ".md5"))
+        steps.append(_archive_size_step())
+        return steps
+
+    target_dir = config.PHOTON_DATA_DIR
+    steps = [
+        Step("prepare_temp_dir", lambda _results: prepare_temp_dir()),
+        Step(
+            "cleanup_stale_dirs",
+            lambda _results: cleanup_staging_and_temp_backup(target_dir + ".staging", target_dir + ".backup"),
+        ),
+        Step(
+            "check_disk_space",
+            lambda _results: ensure_disk_space(strategy),
+            depends_on=("prepare_temp_dir", "cleanup_stale_dirs"),
+        ),
+        Step(
+            "download_index",
+            lambda _results: download_index(cancel_event=cancel_event),
+            depends_on=("check_disk_space",),
+        ),
+    ]
+    if not config.SKIP_MD5_CHECK:
+        steps.append(
+            Step(
+                "download_md5",
+                lambda _results: download_md5(cancel_event=cancel_event),
+                depends_on=("prepare_temp_dir",),
+            )
+        )
+    steps.append(_archive_size_step())
+    return steps
+
+
+def _archive_size_step() -> Step:
+    # measured before any later step can move the archive out of TEMP_DIR
+    return Step(
+        "archive_size", lambda results: os.path.getsize(results["download_index"]), depends_on=("download_index",)
+    )
+
+
+def _free_index_steps(phase: str) -> tuple[list[Step], tuple[str, ...]]:
+    """Steps that delete the installed index once the space check picked HYBRID, and what extraction waits for."""
+    target_dir = config.PHOTON_DATA_DIR
+
+    def verify_archive(results):
+        # the installed index is about to go, so a corrupt archive has to be caught while it still exists
+        if results["check_disk_space"] == "HYBRID":
+            logging.info("Verifying archive before removing the installed index...")
+            verify_checksum(results["download_md5"], results["download_index"])
+
+    def free_index(results):
+        if results["check_disk_space"] == "HYBRID":
+            logging.info("Removing installed index to make room for the new one...")
+            discard_index(target_dir)
+            reap_all()
+
+    steps = []
+    extract_deps = ("download_index",)
+    if phase != "install" and not config.SKIP_MD5_CHECK:
+        steps.append(
+            Step("verify_archive", verify_archive, depends_on=("check_disk_space", "download_index", "download_md5"))
+        )
+        extract_deps = ("download_index", "verify_archive")
+    if phase != "download":
+        steps.append(Step("free_index", free_index, depends_on=(*extract_deps, "check_disk_space")))
+        extract_deps = ("download_index", "free_index")
+    return steps, extract_deps
+
+
+def index_manifest(results: dict, hasher) -> IndexManifest:
+    """Record what was installed, so later update checks can tell whether the remote still serves the same archive."""
+    manifest = results["remote_identity"] or IndexManifest(url=sanitize_url(get_download_url()))
+    archive_size = results["archive_size"]
+    if manifest.size is not None and manifest.size != archive_size:
+        # the remote changed while this archive was downloaded, so its current identity does not describe it
+        logging.warning("Remote index changed during the update, not recording its identity")
+        manifest = IndexManifest(url=manifest.url)
+    manifest.size = archive_size
+    manifest.md5 = hasher.hexdigest() if hasher else None
+    return manifest
+
+
+def run_update_pipeline(strategy: str, stage_only: bool = False, phase: str = "all") -> dict:
+    cancel_event = threading.Event()
+    label = "Update staging" if stage_only else f"{strategy.capitalize()} update"
+    if phase != "all":
+        label = f"{label} ({phase})"
+    steps = build_update_steps(strategy, cancel_event, stage_only, phase)
+    return run_dag(steps, cancel_event=cancel_event, label=label)
 
-            logging.info("Verifying checksum...")
-            verify_checksum(md5_file, index_file)
 
-            logging.debug("Checksum verification successful.")
+def parallel_update():
+    logging.info("Starting parallel update process...")
 
-        logging.info("Moving Index")
-        move_index()
-        clear_temp_dir()
+    try:
+        run_update_pipeline("PARALLEL")
 
         logging.info("Parallel update process completed successfully.")
 
@@ -223,57 +382,79 @@ def parallel_update():
         sys.exit(1)
 
 
-def sequential_update():
-    logging.info("Starting sequential download process...")
+def prepare_update():
+    """Download, verify and extract the new index while Photon keeps serving, leaving it ready for activation."""
+    logging.info("Starting update staging process...")
+
+    try:
+        run_update_pipeline("PARALLEL", stage_only=True)
+
+        logging.info("Update staging process completed successfully.")
+
+    except Exception as e:
+        logging.error(f"FATAL: Update staging failed with an error: {e}")
+        logging.error("Aborting script.")
+        sys.exit(1)
+
+
+def hybrid_update(strategy: str = "HYBRID"):
+    """Run a HYBRID or AUTO update in one go, for when Photon is not running anyway."""
+    logging.info(f"Starting {strategy.lower()} update process...")
 
     try:
-        if os.path.isdir(config.TEMP_DIR):
-            logging.debug(f"Temporary directory {config.TEMP_DIR} exists. Attempting to remove it.")
-            try:
-                shutil.rmtree(config.TEMP_DIR)
-                logging.debug(f"Successfully removed directory: {config.TEMP_DIR}")
-            except Exception as e:
-                logging.error(f"Failed to remove existing TEMP_DIR: {e}")
-                raise
+        run_update_pipeline(strategy)
 
-        logging.debug(f"Creating temporary directory: {config.TEMP_DIR}")
-        os.makedirs(config.TEMP_DIR, exist_ok=True)
+        logging.info(f"{strategy.capitalize()} update process completed successfully.")
 
-        download_url = get_download_url()
+    except Exception as e:
+        logging.critical(f"FATAL: Update process failed with an error: {e}")
+        logging.critical("Aborting script.")
+        sys.exit(1)
 
-        try:
-            file_size = get_remote_file_size(download_url)
-            if not check_disk_space_requirements(file_size, is_parallel=False):
-                logging.error("Insufficient disk space for sequential update")
-                raise InsufficientSpaceError("Insufficient disk space for sequential update")
-        except RemoteFileSizeError as e:
-            if config.SKIP_SPACE_CHECK:
-                logging.warning(f"{e}")
-                logging.warning("SKIP_SPACE_CHECK is enabled, proceeding without space check")
-            else:
-                logging.error(f"{e}")
-                logging.error(
-                    "Cannot proceed without verifying disk space. "
-                    "Set SKIP_SPACE_CHECK=true to bypass this check (not recommended)."
-                )
-                raise
-
-        logging.info("Downloading new index and MD5 checksum...")
-        index_file = download_index()
-        extract_index(index_file)
 
-        if not config.SKIP_MD5_CHECK:
-            md5_file = download_md5()
+def download_update(strategy: str) -> str:
+    """Download and verify the archive while Photon keeps serving, and return the strategy the space check picked.
+
+    If two indexes fit after all the update carries on as a PARALLEL one and installs the index right away,
+    otherwise ``install_update`` finishes it once Photon is stopped.
+    """
+    logging.info(f"Starting {strategy.lower()} update download...")
 
-            logging.info("Verifying checksum...")
-            verify_checksum(md5_file, index_file)
+    try:
+        selected = run_update_pipeline(strategy, phase="download")["check_disk_space"]
+        if selected == "PARALLEL":
+            run_update_pipeline("PARALLEL", phase="install")
+            logging.info("Parallel update process completed successfully.")
+        else:
+            logging.info("Update download completed successfully, Photon can be stopped for the extraction.")
+        return selected
 
-            logging.debug("Checksum verification successful.")
+    except Exception as e:
+        logging.error(f"FATAL: Update download failed with an error: {e}")
+        logging.error("Aborting script.")
+        sys.exit(1)
 
-        logging.info("Moving new index into place...")
-        move_index()
 
-        clear_temp_dir()
+def install_update():
+    """Delete the installed index and extract the archive left in TEMP_DIR by ``download_update``."""
+    logging.info("Starting hybrid update installation...")
+
+    try:
+        run_update_pipeline("HYBRID", phase="install")
+
+        logging.info("Hybrid update installation completed successfully.")
+
+    except Exception as e:
+        logging.critical(f"FATAL: Update installation failed with an error: {e}")
+        logging.critical("Aborting script.")
+        sys.exit(1)
+
+
+def sequential_update():
+    logging.info("Starting sequential download process...")
+
+    try:
+        run_update_pipeline("SEQUENTIAL")
 
         logging.info("Sequential download process completed successfully.")
 
@@ -283,13 +464,33 @@ def sequential_update():
         sys.exit(1)
 
 
-def download_index() -> str:
-    output_file = f"photon-db-latest.{config.INDEX_FILE_EXTENSION}"
+def archive_path() -> str:
+    return os.path.join(config.TEMP_DIR, f"photon-db-latest.{config.INDEX_FILE_EXTENSION}")
+
+
+def download_index(cancel_event: threading.Event | None = None) -> str:
+    logging.info("Downloading index")
     download_url = get_download_url()
+    output = archive_path()
 
-    output = os.path.join(config.TEMP_DIR, output_file)
+    if load_extract_state(output) and _matches_remote(output, download_url):
+        logging.info("Archive of the interrupted extraction is complete, not downloading it again")
+        return output
 
-    if not download_file(download_url, output):
+    md5 = None
+    if (config.PEERS or archive_cache.enabled()) and not config.SKIP_MD5_CHECK:
+        md5 = fetch_published_md5()
+
+    if archive_cache.enabled():
+        cached = archive_cache.lookup(download_url, md5)
+        if cached:
+            archive_cache.restore(cached, output)
+            return output
+
+    if config.PEERS and md5 and download_from_peers(md5, output, cancel_event=cancel_event):
+        return output
+
+    if not download_file(download_url, output, cancel_event=cancel_event):
         raise Exception(f"Failed to download index from {download_url}")
 
     local_timestamp = get_local_time(config.OS_NODE_DIR)
@@ -298,20 +499,41 @@ def download_index() -> str:
     return output
 
 
-def download_md5():
+def _matches_remote(path: str, url: str) -> bool:
+    try:
+        return os.path.getsize(path) == get_remote_file_size(url)
+    except RemoteFileSizeError:
+        return False
+
+
+def get_md5_url() -> str:
     if config.MD5_URL:
         # MD5 URL provided, use it directly.
         logging.info("Using custom MD5_URL for checksum: %s", sanitize_url(config.MD5_URL))
-        download_url = config.MD5_URL
-    else:
-        md5_path = get_index_url_path(config.REGION, config.INDEX_DB_VERSION, config.INDEX_FILE_EXTENSION) + ".md5"
-        download_url = config.BASE_URL + md5_path
-        logging.info("Using constructed URL for checksum: %s", download_url)
+        return config.MD5_URL
+
+    md5_path = get_index_url_path(config.REGION, config.INDEX_DB_VERSION, config.INDEX_FILE_EXTENSION) + ".md5"
+    download_url = config.BASE_URL + md5_path
+    logging.info("Using constructed URL for checksum: %s", download_url)
+    return download_url
+
+
+def fetch_published_md5() -> str | None:
+    """Read the published checksum, which identifies the archive when asking peers for it."""
+    try:
+        response = requests.get(get_md5_url(), timeout=30)
+        response.raise_for_status()
+        return response.text.split()[0].strip().lower()
+    except (RequestException, IndexError) as e:
+        logging.warning(f"Could not fetch published MD5, not asking peers: {e}")
+        return None
 
-    output_file = f"photon-db-latest.{config.INDEX_FILE_EXTENSION}.md5"
-    output = os.path.join(config.TEMP_DIR, output_file)
 
-    if not download_file(download_url, output):
+def download_md5(cancel_event: threading.Event | None = None):
+    download_url = get_md5_url()
+    output = archive_path() + ".md5"
+
+    if not download_file(download_url, output, cancel_event=cancel_event):
         raise Exception(f"Failed to download MD5 checksum from {sanitize_url(download_url)}")
 
     return output
@@ -375,21 +597,27 @@ def _create_progress_bar(total_size, resume_byte_pos, destination):
     return None
 
 
-def _download_content(response, destination, mode, url, total_size, resume_byte_pos, progress_bar):
+def _download_content(response, destination, mode, url, total_size, resume_byte_pos, progress_bar, cancel_event=None):
     downloaded = resume_byte_pos
-    chunk_size = 8192
+    chunk_size = 1024 * 1024
     save_interval = 1024 * 1024
     last_save = downloaded
     last_log = time.time()
-    log_interval = 10
+    log_interval = config.PROGRESS_LOG_INTERVAL
     last_log_bytes = downloaded
 
     try:
         with open(destination, mode) as f:
+            if config.DOWNLOAD_PREALLOCATE and total_size > downloaded:
+                preallocate(f.fileno(), downloaded, total_size - downloaded)
+
             for chunk in response.iter_content(chunk_size=chunk_size):
                 if not chunk:
                     continue
 
+                if cancel_event and cancel_event.is_set():
+                    raise DownloadCancelledError(f"Download of {os.path.basename(destination)} cancelled")
+
                 size = f.write(chunk)
                 downloaded += size
 
@@ -408,6 +636,15 @@ def _download_content(response, destination, mode, url, total_size, resume_byte_
                     logging.info(
                         f"Download progress: {percent:.1f}% ({downloaded / (1024**3):.2f}GB / {total_size / (1024**3):.2f}GB) - {speed_mbps:.1f} Mbps - ETA: {eta_str}"
                     )
+                    metrics.set_gauge("photon_download_bytes", downloaded, "Bytes downloaded so far")
+                    metrics.set_gauge("photon_download_bytes_total", total_size, "Total download size")
+                    metrics.set_gauge(
+                        "photon_download_rate_bytes_per_second",
+                        interval_bytes / interval_time if interval_time > 0 else 0,
+                        "Current download rate",
+                    )
+                    metrics.set_gauge("photon_download_eta_seconds", eta, "Estimated seconds until download completes")
+                    metrics.write_textfile()
                     last_log = current_time
                     last_log_bytes = downloaded
 
@@ -443,7 +680,7 @@ def _log_download_metrics(total_size, start_time, destination):
         logging.info(f"Downloaded {destination} successfully.")
 
 
-def _perform_download(url, destination, resume_byte_pos, mode, start_time):
+def _perform_download(url, destination, resume_byte_pos, mode, start_time, cancel_event=None):
     headers = _get_download_headers(resume_byte_pos, url)
 
     with requests.get(url, stream=True, headers=headers, timeout=(30, 60)) as response:
@@ -463,7 +700,9 @@ def _perform_download(url, destination, resume_byte_pos, mode, start_time):
         progress_bar = _create_progress_bar(total_size, resume_byte_pos, destination)
 
         try:
-            downloaded = _download_content(response, destination, mode, url, total_size, resume_byte_pos, progress_bar)
+            downloaded = _download_content(
+                response, destination, mode, url, total_size, resume_byte_pos, progress_bar, cancel_event
+            )
 
             if progress_bar:
                 progress_bar.close()
@@ -482,14 +721,14 @@ def _perform_download(url, destination, resume_byte_pos, mode, start_time):
                 progress_bar.close()
 
 
-def download_file(url, destination):
+def download_file(url, destination, cancel_event=None):
     start_time = time.time()
     max_retries = int(config.DOWNLOAD_MAX_RETRIES)
 
     for attempt in range(max_retries):
         resume_byte_pos, mode = _prepare_download(url, destination)
         try:
-            return _perform_download(url, destination, resume_byte_pos, mode, start_time)
+            return _perform_download(url, destination, resume_byte_pos, mode, start_time, cancel_event)
 
         except RequestException as e:
             logging.warning(f"Download attempt {attempt + 1} failed: {e}")
@@ -502,6 +741,10 @@ def download_file(url, destination):
             logging.exception(f"Download failed after {max_retries} attempts")
             return False
 
+        except DownloadCancelledError as e:
+            logging.warning(f"{e}")
+            return False
+
         except Exception:
             logging.exception("Download failed")
             return False
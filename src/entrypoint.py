@@ -2,7 +2,8 @@ import os
 import sys
 
 from src.check_remote import check_index_age
-from src.downloader import InsufficientSpaceError, parallel_update, sequential_update
+from src.disk_space import InsufficientSpaceError
+from src.downloader import hybrid_update, parallel_update, sequential_update
 from src.utils import config
 from src.utils.logger import get_logger, setup_logging
 from src.utils.notify import send_notification
@@ -12,6 +13,16 @@ from src.utils.validate_config import validate_config
 logger = get_logger()
 
 
+def forced_update():
+    if config.UPDATE_STRATEGY == "PARALLEL":
+        parallel_update()
+    elif config.UPDATE_STRATEGY in ("HYBRID", "AUTO"):
+        # Photon is not running yet, so the whole update can run in one go
+        hybrid_update(config.UPDATE_STRATEGY)
+    else:
+        sequential_update()
+
+
 def main():
     send_notification("Photon-Docker Initializing")
 
@@ -20,6 +31,8 @@ def main():
     logger.info(f"UPDATE_STRATEGY: {config.UPDATE_STRATEGY}")
     logger.info(f"UPDATE_INTERVAL: {config.UPDATE_INTERVAL}")
     logger.info(f"REGION: {config.REGION}")
+    if config.REGIONS:
+        logger.info(f"REGIONS: {', '.join(config.REGIONS)}")
     logger.info(f"FORCE_UPDATE: {config.FORCE_UPDATE}")
     logger.info(f"DOWNLOAD_MAX_RETRIES: {config.DOWNLOAD_MAX_RETRIES}")
     logger.info(f"FILE_URL (sanitized): {sanitize_url(config.FILE_URL)}")
@@ -51,10 +64,7 @@ def main():
     if config.FORCE_UPDATE:
         logger.info("Starting forced update")
         try:
-            if config.UPDATE_STRATEGY == "PARALLEL":
-                parallel_update()
-            else:
-                sequential_update()
+            forced_update()
         except InsufficientSpaceError as e:
             logger.error(f"Cannot proceed with force update: {e}")
             send_notification(f"Photon-Docker force update failed: {e}")
@@ -1,16 +1,71 @@
+import ctypes
+import errno
 import hashlib
+import json
 import os
-import shutil
 import subprocess
+import threading
+import time
+from collections import deque
+from logging import DEBUG
 from pathlib import Path
 
-from src.utils import config
+from src.disk_space import check_extraction_space
+from src.generations import activate_generation, add_generation, prune_generations
+from src.manifest import IndexManifest, write_manifest
+from src.throttle import ExtractionThrottle, extraction_threads, lower_priority
+from src.trash import move_to_trash
+from src.utils import config, metrics
 from src.utils.logger import get_logger
+from src.utils.tarstream import TarMember, TarStreamScanner
 
 logging = get_logger()
 
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+EXTRACT_STDERR_TAIL_LINES = 50
+FALLOC_FL_KEEP_SIZE = 0x01
 
-def extract_index(index_file: str):
+
+class ExtractionCancelledError(Exception):
+    pass
+
+
+def preallocate(fd: int, offset: int, length: int) -> bool:
+    """Reserve contiguous extents for ``length`` bytes at ``offset`` without changing the visible file size.
+
+    Keeping the size untouched matters because download resume derives its position from the file size.
+    Returns False on platforms or filesystems without fallocate support; running out of space is raised.
+    """
+    if length <= 0:
+        return False
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fallocate = libc.fallocate
+    except (OSError, AttributeError):
+        logging.debug("fallocate is not available on this platform, skipping preallocation")
+        return False
+
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+    if fallocate(fd, FALLOC_FL_KEEP_SIZE, offset, length) == 0:
+        logging.debug(f"Preallocated {length} bytes at offset {offset}")
+        return True
+
+    err = ctypes.get_errno()
+    if err in (errno.ENOSPC, errno.EDQUOT):
+        raise OSError(err, f"Not enough space to preallocate {length / (1024**3):.2f}GB", os.strerror(err))
+    logging.debug(f"Filesystem does not support preallocation: {os.strerror(err)}")
+    return False
+
+
+def extract_index(
+    index_file: str, cancel_event: threading.Event | None = None, hasher=None, serving: bool = False
+) -> dict[str, int] | None:
+    """Extract the archive into TEMP_DIR and return the size of every file member, if the tar stream could be followed.
+
+    With ``serving`` Photon keeps answering queries from this machine, so the extraction uses fewer threads, a lower
+    CPU/IO priority and backs off whenever Photon slows down.
+    """
     logging.info("Extracting Index")
     logging.debug(f"Index file: {index_file}")
     logging.debug(f"Index file exists: {os.path.exists(index_file)}")
@@ -22,54 +77,348 @@ def extract_index(index_file: str):
         logging.debug(f"Creating temp directory: {config.TEMP_DIR}")
         os.makedirs(config.TEMP_DIR, exist_ok=True)
 
-    install_command = f"lbzip2 -d -c {index_file} | tar x -o -C {config.TEMP_DIR}"
-    logging.debug(f"Extraction command: {install_command}")
+    decompress_cmd = ["lbzip2", "-d", "-c", "-n", str(extraction_threads(serving))]
+    tar_cmd = ["tar", "x", "-o", "-C", config.TEMP_DIR]
+    resumed = resume_extraction(index_file)
+    if resumed:
+        # bzip2 blocks are not byte aligned, so the archive is decompressed again but finished files are not rewritten
+        logging.info(f"Resuming interrupted extraction, keeping {resumed} verified files")
+        tar_cmd.insert(2, "--skip-old-files")
+    logging.debug(f"Extraction pipeline: {' '.join(decompress_cmd)} < {index_file} | {' '.join(tar_cmd)}")
+
+    throttle = ExtractionThrottle.for_extraction(serving)
+    priority = config.EXTRACT_PRIORITY if serving else "NORMAL"
 
     try:
         logging.debug("Starting extraction process...")
-        result = subprocess.run(install_command, shell=True, capture_output=True, text=True, check=True)  # noqa S602
+        progress = ExtractionProgress(os.path.getsize(index_file))
+        if throttle:
+            throttle.start()
+        _run_extraction_pipeline(
+            index_file, decompress_cmd, tar_cmd, progress, cancel_event, hasher, throttle=throttle, priority=priority
+        )
+        cleanup_extract_state(index_file)
         logging.debug("Extraction process completed successfully")
+        _log_extraction_metrics(progress)
+        if throttle:
+            throttle.report(time.time() - progress.start_time)
 
-        if result.stdout:
-            logging.debug(f"Extraction stdout: {result.stdout}")
-        if result.stderr:
-            logging.debug(f"Extraction stderr: {result.stderr}")
+        if logging.isEnabledFor(DEBUG):
+            logging.debug(f"Contents of {config.TEMP_DIR} after extraction:")
+            try:
+                for item in os.listdir(config.TEMP_DIR):
+                    item_path = os.path.join(config.TEMP_DIR, item)
+                    if os.path.isdir(item_path):
+                        logging.debug(f"  DIR: {item}")
+                        try:
+                            sub_items = os.listdir(item_path)
+                            logging.debug(f"    Contains {len(sub_items)} items")
+                            for sub_item in sub_items[:5]:
+                                logging.debug(f"      {sub_item}")
+                            if len(sub_items) > 5:
+                                logging.debug(f"      ... and {len(sub_items) - 5} more items")
+                        except Exception as e:
+                            logging.debug(f"    Could not list subdirectory contents: {e}")
+                    else:
+                        logging.debug(f"  FILE: {item} ({os.path.getsize(item_path)} bytes)")
+            except Exception as e:
+                logging.debug(f"Could not list contents of {config.TEMP_DIR}: {e}")
 
-        logging.debug(f"Contents of {config.TEMP_DIR} after extraction:")
-        try:
-            for item in os.listdir(config.TEMP_DIR):
-                item_path = os.path.join(config.TEMP_DIR, item)
-                if os.path.isdir(item_path):
-                    logging.debug(f"  DIR: {item}")
-                    try:
-                        sub_items = os.listdir(item_path)
-                        logging.debug(f"    Contains {len(sub_items)} items")
-                        for sub_item in sub_items[:5]:
-                            logging.debug(f"      {sub_item}")
-                        if len(sub_items) > 5:
-                            logging.debug(f"      ... and {len(sub_items) - 5} more items")
-                    except Exception as e:
-                        logging.debug(f"    Could not list subdirectory contents: {e}")
-                else:
-                    logging.debug(f"  FILE: {item} ({os.path.getsize(item_path)} bytes)")
-        except Exception as e:
-            logging.debug(f"Could not list contents of {config.TEMP_DIR}: {e}")
+        return progress.listing if progress.scanner.finished else None
 
     except subprocess.CalledProcessError as e:
         logging.error(f"Index extraction failed with return code {e.returncode}")
         logging.error(f"Command: {e.cmd}")
-        logging.error(f"Stdout: {e.stdout}")
         logging.error(f"Stderr: {e.stderr}")
+        # a corrupt archive would fail the same way again, so the next attempt downloads and extracts from scratch
+        cleanup_extract_state(index_file)
         raise
     except Exception:
         logging.exception("Index extraction failed")
         raise
+    finally:
+        if throttle:
+            throttle.stop()
+
+
+class ExtractionProgress:
+    def __init__(self, archive_size: int):
+        self.archive_size = archive_size
+        self.archive_bytes = 0
+        self.written_bytes = 0
+        self.scanner = TarStreamScanner(on_member=self._member_started)
+        # files whose data has been passed to tar completely
+        self.completed: list[tuple[str, int]] = []
+        self.listing: dict[str, int] = {}
+        self._previous: TarMember | None = None
+        self.start_time = time.time()
+        self.last_progress_time = self.start_time
+
+    def _member_started(self, member: TarMember):
+        if member.is_file:
+            self.listing[member.name] = member.size
+        if self._previous is not None and self._previous.is_file:
+            self.completed.append((self._previous.name, self._previous.size))
+        self._previous = member
+
+
+def get_extract_state_file(index_file: str) -> str:
+    return index_file + ".extract_state"
+
+
+def save_extract_state(index_file: str, progress: ExtractionProgress):
+    """Checkpoint which members an extraction has finished, so an interrupted one can pick up from there."""
+    stat = os.stat(index_file)
+    state = {
+        "archive_size": stat.st_size,
+        "archive_mtime_ns": stat.st_mtime_ns,
+        "archive_bytes": progress.archive_bytes,
+        "tar_offset": progress.scanner.offset,
+        "completed": list(progress.completed),
+    }
+    state_file = get_extract_state_file(index_file)
+    try:
+        with open(state_file + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(state_file + ".tmp", state_file)
+    except OSError as e:
+        logging.warning(f"Failed to save extraction checkpoint: {e}")
 
 
-def move_index():
+def load_extract_state(index_file: str) -> dict | None:
+    """The checkpoint of an interrupted extraction of exactly this archive, if there is one."""
+    try:
+        with open(get_extract_state_file(index_file)) as f:
+            state = json.load(f)
+        stat = os.stat(index_file)
+    except (OSError, ValueError):
+        return None
+    if (state.get("archive_size"), state.get("archive_mtime_ns")) != (stat.st_size, stat.st_mtime_ns):
+        logging.info("Extraction checkpoint belongs to a different archive, extracting from scratch")
+        return None
+    return state
+
+
+def cleanup_extract_state(index_file: str):
+    state_file = get_extract_state_file(index_file)
+    if os.path.exists(state_file):
+        os.remove(state_file)
+
+
+def resume_extraction(index_file: str) -> int:
+    """Keep the files an interrupted extraction of ``index_file`` finished and remove everything else it left.
+
+    A file only counts as finished if the checkpoint lists it and its size matches; the member tar was writing when
+    the extraction stopped is removed and extracted again. Returns the number of files kept.
+    """
+    extracted = os.path.join(config.TEMP_DIR, "photon_data")
+    state = load_extract_state(index_file)
+    if state is None:
+        cleanup_extract_state(index_file)
+        if os.path.exists(extracted):
+            move_to_trash(extracted)
+        return 0
+
+    expected = {os.path.normpath(os.path.join(config.TEMP_DIR, name)): size for name, size in state["completed"]}
+    kept = 0
+    for root, _dirs, files in os.walk(extracted):
+        for name in files:
+            path = os.path.join(root, name)
+            if expected.get(path) == os.path.getsize(path):
+                kept += 1
+            else:
+                os.remove(path)
+    return kept
+
+
+def _feed_archive(
+    index_file: str, sink, progress: ExtractionProgress, hasher=None, throttle: ExtractionThrottle | None = None
+):
+    try:
+        with open(index_file, "rb") as f:
+            while chunk := f.read(EXTRACT_CHUNK_SIZE):
+                sink.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+                progress.archive_bytes += len(chunk)
+                if throttle:
+                    throttle.pace(len(chunk))
+    finally:
+        sink.close()
+
+
+def _pump_stream(source, sink, progress: ExtractionProgress):
+    scanning = True
+    try:
+        while chunk := source.read1(EXTRACT_CHUNK_SIZE):
+            if scanning:
+                try:
+                    progress.scanner.feed(chunk)
+                except ValueError as e:
+                    logging.warning(f"Stopped tracking extracted files: {e}")
+                    scanning = False
+            sink.write(chunk)
+            progress.written_bytes += len(chunk)
+    finally:
+        sink.close()
+
+
+def _drain_stderr(stream, tail: deque):
+    for line in iter(stream.readline, b""):
+        tail.append(line.decode("utf-8", "replace").rstrip())
+    stream.close()
+
+
+def _kill_processes(processes: list[subprocess.Popen]):
+    for proc in processes:
+        if proc.poll() is None:
+            proc.kill()
+
+
+def _raise_pipeline_errors(commands: list[tuple[subprocess.Popen, list]], errors: list, stderr_tail: deque):
+    failed = [(proc, cmd) for proc, cmd in commands if proc.wait() != 0]
+    pipeline_errors = [e for e in errors if not isinstance(e, BrokenPipeError)]
+    if pipeline_errors:
+        raise pipeline_errors[0]
+    if failed:
+        proc, cmd = failed[0]
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr="\n".join(stderr_tail))
+    if errors:
+        raise errors[0]
+
+
+def _run_extraction_pipeline(
+    index_file: str,
+    decompress_cmd: list,
+    tar_cmd: list,
+    progress: ExtractionProgress,
+    cancel_event: threading.Event | None = None,
+    hasher=None,
+    throttle: ExtractionThrottle | None = None,
+    priority: str = "NORMAL",
+):
+    decompressor = subprocess.Popen(  # noqa S603
+        decompress_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    extractor = subprocess.Popen(  # noqa S603
+        tar_cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    processes = [decompressor, extractor]
+    for proc in processes:
+        lower_priority(proc.pid, priority)
+    stderr_tail = deque(maxlen=EXTRACT_STDERR_TAIL_LINES)
+    errors = []
+
+    def run_guarded(target, *args):
+        try:
+            target(*args)
+        except Exception as e:
+            errors.append(e)
+            _kill_processes(processes)
+
+    workers = [
+        threading.Thread(
+            target=run_guarded, args=(_feed_archive, index_file, decompressor.stdin, progress, hasher, throttle)
+        ),
+        threading.Thread(target=run_guarded, args=(_pump_stream, decompressor.stdout, extractor.stdin, progress)),
+        threading.Thread(target=_drain_stderr, args=(decompressor.stderr, stderr_tail)),
+        threading.Thread(target=_drain_stderr, args=(extractor.stderr, stderr_tail)),
+    ]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+
+    last_log = time.time()
+    last_archive_bytes = 0
+    last_written_bytes = 0
+    try:
+        while any(worker.is_alive() for worker in workers[:2]):
+            workers[1].join(timeout=1)
+            if cancel_event and cancel_event.is_set():
+                raise ExtractionCancelledError("Extraction cancelled")
+            now = time.time()
+            if now - last_log >= config.PROGRESS_LOG_INTERVAL:
+                _report_extraction_progress(progress, now - last_log, last_archive_bytes, last_written_bytes)
+                save_extract_state(index_file, progress)
+                check_extraction_space(
+                    config.TEMP_DIR, progress.archive_bytes, progress.archive_size, progress.written_bytes
+                )
+                last_log = now
+                last_archive_bytes = progress.archive_bytes
+                last_written_bytes = progress.written_bytes
+    except BaseException:
+        _kill_processes(processes)
+        for proc in processes:
+            proc.wait()
+        save_extract_state(index_file, progress)
+        raise
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+
+    _raise_pipeline_errors([(decompressor, decompress_cmd), (extractor, tar_cmd)], errors, stderr_tail)
+
+
+def _format_eta(eta: float) -> str:
+    return f"{int(eta // 3600)}h {int((eta % 3600) // 60)}m" if eta > 0 else "calculating..."
+
+
+def _report_extraction_progress(
+    progress: ExtractionProgress, interval: float, last_archive_bytes: int, last_written_bytes: int
+):
+    now = time.time()
+    read_rate = (progress.archive_bytes - last_archive_bytes) / interval
+    write_rate = (progress.written_bytes - last_written_bytes) / interval
+    remaining = progress.archive_size - progress.archive_bytes
+    eta = remaining / read_rate if read_rate > 0 else 0
+    percent = (progress.archive_bytes / progress.archive_size) * 100 if progress.archive_size else 0
+
+    if progress.archive_bytes > last_archive_bytes or progress.written_bytes > last_written_bytes:
+        progress.last_progress_time = now
+        logging.info(
+            f"Extraction progress: {percent:.1f}% ({progress.archive_bytes / (1024**3):.2f}GB / {progress.archive_size / (1024**3):.2f}GB read) - {read_rate / (1024**2):.1f} MB/s in, {write_rate / (1024**2):.1f} MB/s out - {progress.scanner.files} files ({progress.written_bytes / (1024**3):.2f}GB) written - ETA: {_format_eta(eta)}"
+        )
+    else:
+        current = progress.scanner.current.name if progress.scanner.current else "n/a"
+        logging.warning(
+            f"Extraction stalled: no data processed for {now - progress.last_progress_time:.0f}s (current member: {current})",
+            extra={"rate_key": "extraction-stalled"},
+        )
+
+    metrics.set_gauge("photon_extract_archive_bytes_read", progress.archive_bytes, "Compressed bytes consumed")
+    metrics.set_gauge("photon_extract_archive_bytes_total", progress.archive_size, "Compressed archive size")
+    metrics.set_gauge("photon_extract_bytes_written", progress.written_bytes, "Uncompressed bytes passed to tar")
+    metrics.set_gauge("photon_extract_files_written", progress.scanner.files, "Files passed to tar")
+    metrics.set_gauge("photon_extract_read_rate_bytes_per_second", read_rate, "Current archive read rate")
+    metrics.set_gauge("photon_extract_write_rate_bytes_per_second", write_rate, "Current extraction write rate")
+    metrics.set_gauge("photon_extract_eta_seconds", eta, "Estimated seconds until extraction completes")
+    metrics.set_gauge(
+        "photon_extract_last_progress_timestamp_seconds", progress.last_progress_time, "Unix time of last progress"
+    )
+    metrics.write_textfile()
+
+
+def _log_extraction_metrics(progress: ExtractionProgress):
+    duration = time.time() - progress.start_time
+    read_rate = progress.archive_bytes / duration if duration > 0 else 0
+    logging.info(
+        f"Extraction completed: {progress.scanner.files} files ({progress.written_bytes / (1024**3):.2f}GB) from {progress.archive_bytes / (1024**3):.2f}GB in {duration:.1f}s ({duration / 60:.1f}m) at {read_rate / (1024**2):.1f} MB/s"
+    )
+    metrics.set_gauge("photon_extract_archive_bytes_read", progress.archive_bytes, "Compressed bytes consumed")
+    metrics.set_gauge("photon_extract_bytes_written", progress.written_bytes, "Uncompressed bytes passed to tar")
+    metrics.set_gauge("photon_extract_files_written", progress.scanner.files, "Files passed to tar")
+    metrics.set_gauge("photon_extract_eta_seconds", 0, "Estimated seconds until extraction completes")
+    metrics.set_gauge("photon_extract_duration_seconds", duration, "Duration of the last extraction")
+    metrics.write_textfile()
+
+
+def move_index(manifest: IndexManifest | None = None):
     temp_photon_dir = os.path.join(config.TEMP_DIR, "photon_data")
     target_node_dir = os.path.join(config.PHOTON_DATA_DIR)
 
+    if manifest:
+        write_manifest(temp_photon_dir, manifest)
+
     logging.info(f"Moving index from {temp_photon_dir} to {target_node_dir}")
     result = move_index_atomic(temp_photon_dir, target_node_dir)
 
@@ -79,89 +428,80 @@ def move_index():
     return result
 
 
-def move_index_atomic(source_dir: str, target_dir: str) -> bool:
-    try:
-        logging.info("Starting atomic index move operation")
+def stage_pending_index(manifest: IndexManifest):
+    """Park a verified, extracted index next to the live one until it is activated."""
+    temp_photon_dir = os.path.join(config.TEMP_DIR, "photon_data")
+    write_manifest(temp_photon_dir, manifest)
 
-        os.makedirs(os.path.dirname(target_dir), exist_ok=True)
+    if os.path.exists(config.PENDING_INDEX_DIR):
+        move_to_trash(config.PENDING_INDEX_DIR)
+    os.makedirs(os.path.dirname(config.PENDING_INDEX_DIR), exist_ok=True)
+    os.rename(temp_photon_dir, config.PENDING_INDEX_DIR)
+    logging.info(f"New index staged at {config.PENDING_INDEX_DIR}, waiting for activation")
 
-        staging_dir = target_dir + ".staging"
-        backup_dir = target_dir + ".backup"
 
-        cleanup_staging_and_temp_backup(staging_dir, backup_dir)
+def activate_pending_index(pending_dir: str, target_dir: str) -> bool:
+    logging.info(f"Activating staged index {pending_dir}")
+    result = move_index_atomic(pending_dir, target_dir)
 
-        shutil.move(source_dir, staging_dir)
+    if result:
+        update_timestamp_marker(os.path.dirname(target_dir))
+
+    return result
 
-        if os.path.exists(target_dir):
-            os.rename(target_dir, backup_dir)
 
-        os.rename(staging_dir, target_dir)
-        logging.info("Atomic index move completed successfully")
+def move_index_atomic(source_dir: str, target_dir: str) -> bool:
+    """Install ``source_dir`` as a new generation and switch the ``target_dir`` symlink to it.
 
+    The previous index stays on disk as an older generation, so a bad index can be rolled back without a download.
+    """
+    try:
+        logging.info("Starting atomic index move operation")
+        generation = add_generation(source_dir, target_dir)
+        activate_generation(target_dir, generation)
+        logging.info("Atomic index move completed successfully")
         return True
 
     except Exception as e:
         logging.error(f"Atomic move failed: {e}")
-        rollback_atomic_move(source_dir, target_dir, staging_dir, backup_dir)
         raise
 
 
-def rollback_atomic_move(original_source: str, target_dir: str, staging_dir: str, backup_dir: str):
-    logging.error("Rolling back atomic move operation")
-
-    try:
-        if os.path.exists(target_dir) and not os.path.exists(backup_dir):
-            logging.debug("New index was successfully moved, keeping it")
-            return
-
-        if os.path.exists(target_dir):
-            shutil.rmtree(target_dir)
-
-        if os.path.exists(backup_dir):
-            logging.info("Restoring backup after failed atomic move")
-            os.rename(backup_dir, target_dir)
-
-        if os.path.exists(staging_dir):
-            shutil.move(staging_dir, original_source)
-
-        logging.info("Rollback completed successfully")
-
-    except Exception as rollback_error:
-        logging.critical(f"Rollback failed: {rollback_error}")
-
-
 def cleanup_staging_and_temp_backup(staging_dir: str, backup_dir: str):
     for dir_path in [staging_dir, backup_dir]:
         if os.path.exists(dir_path):
             try:
-                shutil.rmtree(dir_path)
+                move_to_trash(dir_path)
             except Exception as e:
                 logging.warning(f"Failed to cleanup {dir_path}: {e}")
 
 
-def cleanup_backup_after_verification(target_dir: str) -> bool:
-    backup_dir = target_dir + ".backup"
-    if os.path.exists(backup_dir):
-        try:
-            logging.info("Removing backup after successful verification")
-            shutil.rmtree(backup_dir)
-            return True
-        except Exception as e:
-            logging.warning(f"Failed to cleanup backup: {e}")
-            return False
-    return True
+def retire_old_generations(target_dir: str) -> bool:
+    """Once the active index is verified, keep only ``INDEX_GENERATIONS`` generations around for rollbacks."""
+    try:
+        prune_generations(target_dir, config.INDEX_GENERATIONS)
+        # left behind by versions that kept a single backup next to photon_data
+        cleanup_staging_and_temp_backup(target_dir + ".staging", target_dir + ".backup")
+        return True
+    except Exception as e:
+        logging.warning(f"Failed to remove old index generations: {e}")
+        return False
 
 
-def verify_checksum(md5_file, index_file):
-    hash_md5 = hashlib.md5()  # noqa S303
-    try:
-        with open(index_file, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        dl_sum = hash_md5.hexdigest()
-    except FileNotFoundError:
-        logging.error(f"Index file not found for checksum generation: {index_file}")
-        raise
+def verify_checksum(md5_file, index_file, digest: str | None = None):
+    if digest:
+        logging.debug("Using checksum computed during extraction")
+        dl_sum = digest
+    else:
+        hash_md5 = hashlib.md5()  # noqa S303
+        try:
+            with open(index_file, "rb") as f:
+                for chunk in iter(lambda: f.read(4096), b""):
+                    hash_md5.update(chunk)
+            dl_sum = hash_md5.hexdigest()
+        except FileNotFoundError:
+            logging.error(f"Index file not found for checksum generation: {index_file}")
+            raise
 
     try:
         with open(md5_file) as f:
@@ -182,7 +522,7 @@ def verify_checksum(md5_file, index_file):
 
 def clear_temp_dir():
     logging.info("Removing TEMP dir")
-    if os.path.exists(config.TEMP_DIR):
+    if logging.isEnabledFor(DEBUG) and os.path.exists(config.TEMP_DIR):
         logging.debug(f"Contents of TEMP directory {config.TEMP_DIR}:")
         try:
             for item in os.listdir(config.TEMP_DIR):
@@ -195,13 +535,13 @@ def clear_temp_dir():
             logging.debug(f"Could not list contents of {config.TEMP_DIR}: {e}")
 
     try:
-        shutil.rmtree(config.TEMP_DIR)
+        move_to_trash(config.TEMP_DIR)
     except Exception:
         logging.exception("Failed to Remove TEMP_DIR")
 
 
-def update_timestamp_marker():
-    marker_file = os.path.join(config.DATA_DIR, ".photon-index-updated")
+def update_timestamp_marker(data_dir: str | None = None):
+    marker_file = os.path.join(data_dir or config.DATA_DIR, ".photon-index-updated")
     try:
         Path(marker_file).touch()
         logging.info(f"Updated timestamp marker: {marker_file}")
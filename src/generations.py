@@ -0,0 +1,181 @@
+import argparse
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from logging import Formatter, StreamHandler
+
+from src.manifest import IndexManifest, read_manifest
+from src.trash import move_to_trash
+from src.utils import config
+from src.utils.logger import LOG_FORMAT, get_logger
+
+logging = get_logger()
+
+GENERATIONS_DIR = "generations"
+GENERATION_PREFIX = "gen-"
+
+
+@dataclass
+class Generation:
+    name: str
+    path: str
+    active: bool
+    manifest: IndexManifest | None
+
+
+def generations_dir(index_dir: str) -> str:
+    return os.path.join(os.path.dirname(index_dir), GENERATIONS_DIR)
+
+
+def active_generation(index_dir: str) -> str | None:
+    """Name of the generation ``index_dir`` points to, or ``None`` for a plain directory from before generations."""
+    if not os.path.islink(index_dir):
+        return None
+    return os.path.basename(os.readlink(index_dir))
+
+
+def list_generations(index_dir: str) -> list[Generation]:
+    """Installed generations, newest first."""
+    directory = generations_dir(index_dir)
+    try:
+        names = sorted(
+            (name for name in os.listdir(directory) if name.startswith(GENERATION_PREFIX)), key=_age, reverse=True
+        )
+    except OSError:
+        return []
+    active = active_generation(index_dir)
+    return [
+        Generation(name, os.path.join(directory, name), name == active, read_manifest(os.path.join(directory, name)))
+        for name in names
+    ]
+
+
+def _age(name: str) -> tuple[str, int]:
+    # gen-YYYYmmdd-HHMMSS, with a -n suffix for several generations within one second
+    date, _, rest = name.removeprefix(GENERATION_PREFIX).partition("-")
+    clock, _, n = rest.partition("-")
+    return date + clock, int(n) if n.isdigit() else 0
+
+
+def _new_generation_path(index_dir: str, timestamp: float) -> str:
+    base = os.path.join(
+        generations_dir(index_dir), GENERATION_PREFIX + time.strftime("%Y%m%d-%H%M%S", time.gmtime(timestamp))
+    )
+    path, n = base, 1
+    while os.path.lexists(path):
+        path, n = f"{base}-{n}", n + 1
+    return path
+
+
+def add_generation(source_dir: str, index_dir: str) -> str:
+    """Move an extracted index next to the installed ones; nothing changes for Photon until it is activated."""
+    os.makedirs(generations_dir(index_dir), exist_ok=True)
+    if os.path.isdir(index_dir) and not os.path.islink(index_dir):
+        _adopt_plain_index(index_dir)
+    path = _new_generation_path(index_dir, time.time())
+    shutil.move(source_dir, path)
+    return path
+
+
+def _adopt_plain_index(index_dir: str):
+    # indexes installed before generations are a real directory; it becomes the oldest generation
+    path = _new_generation_path(index_dir, os.path.getmtime(index_dir))
+    link = _prepare_link(index_dir, path)
+    os.rename(index_dir, path)
+    os.replace(link, index_dir)
+    logging.info(f"Moved existing index to generation {os.path.basename(path)}")
+
+
+def _prepare_link(index_dir: str, generation_path: str) -> str:
+    link = index_dir + ".link"
+    if os.path.lexists(link):
+        os.remove(link)
+    # relative, so the data volume can be mounted anywhere
+    os.symlink(os.path.relpath(generation_path, os.path.dirname(index_dir)), link)
+    return link
+
+
+def activate_generation(index_dir: str, generation_path: str):
+    """Point ``index_dir`` at ``generation_path`` by atomically replacing the symlink."""
+    os.makedirs(generations_dir(index_dir), exist_ok=True)
+    if os.path.isdir(index_dir) and not os.path.islink(index_dir):
+        _adopt_plain_index(index_dir)
+    os.replace(_prepare_link(index_dir, generation_path), index_dir)
+    logging.info(f"Activated index generation {os.path.basename(generation_path)}")
+
+
+def prune_generations(index_dir: str, keep: int) -> list[str]:
+    """Keep the active generation and the ``keep - 1`` newest others, trash the rest. Returns the trashed names."""
+    inactive = [generation for generation in list_generations(index_dir) if not generation.active]
+    pruned = []
+    for generation in inactive[max(keep - 1, 0) :]:
+        move_to_trash(generation.path)
+        pruned.append(generation.name)
+    if pruned:
+        logging.info(f"Removed old index generation(s): {', '.join(pruned)}")
+    return pruned
+
+
+def discard_index(index_dir: str) -> list[str]:
+    """Trash every generation and the ``index_dir`` link itself, leaving no index behind. Returns the trashed names."""
+    generations = list_generations(index_dir)
+    discarded = [generation.name for generation in generations]
+    for generation in generations:
+        move_to_trash(generation.path)
+    if os.path.islink(index_dir):
+        os.remove(index_dir)
+    elif os.path.isdir(index_dir):
+        discarded.append(os.path.basename(index_dir))
+        move_to_trash(index_dir)
+    if discarded:
+        logging.info(f"Removed installed index: {', '.join(discarded)}")
+    return discarded
+
+
+def rollback(index_dir: str, name: str | None = None) -> Generation:
+    """Reactivate ``name``, or the newest generation older than the active one."""
+    generations = list_generations(index_dir)
+    active = next((i for i, generation in enumerate(generations) if generation.active), None)
+    if name:
+        target = next((generation for generation in generations if generation.name == name), None)
+    else:
+        older = generations[active + 1 :] if active is not None else []
+        target = older[0] if older else None
+    if target is None or target.active:
+        raise ValueError(f"No generation to roll back to (requested: {name or 'previous'})")
+    activate_generation(index_dir, target.path)
+    return target
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="List installed index generations or roll back to one of them.")
+    parser.add_argument("command", choices=["list", "rollback"])
+    parser.add_argument("generation", nargs="?", help="generation to roll back to, defaults to the previous one")
+    parser.add_argument("--data-dir", default=config.DATA_DIR, help="data directory of the instance")
+    args = parser.parse_args()
+    index_dir = os.path.join(args.data_dir, "photon_data")
+
+    if args.command == "list":
+        for generation in list_generations(index_dir):
+            manifest = generation.manifest or IndexManifest()
+            marker = "*" if generation.active else " "
+            print(f"{marker} {generation.name}  {manifest.last_modified or '-'}  {manifest.md5 or '-'}")  # noqa: T201
+        return 0
+
+    try:
+        target = rollback(index_dir, args.generation)
+    except ValueError as e:
+        logging.error(str(e))
+        return 1
+    logging.info(f"Rolled back to {target.name}, the manager restarts Photon on it shortly")
+    return 0
+
+
+if __name__ == "__main__":
+    handler = StreamHandler(sys.stdout)
+    handler.setFormatter(Formatter(LOG_FORMAT))
+    logging.addHandler(handler)
+    logging.setLevel(config.LOG_LEVEL)
+    sys.exit(main())
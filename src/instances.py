@@ -0,0 +1,109 @@
+import os
+import subprocess
+from dataclasses import dataclass
+
+from src.utils import config
+from src.utils.regions import get_region_bboxes, normalize_region
+
+
+@dataclass
+class PhotonInstance:
+    name: str
+    region: str | None
+    data_dir: str
+    port: int
+    listen_ip: str
+    replica_of: "PhotonInstance | None" = None
+    process: subprocess.Popen | None = None
+    draining: bool = False
+    generation: str | None = None
+    # when the instance last failed to start, the monitor retries it until it is up again
+    failed_at: float | None = None
+
+    @property
+    def photon_data_dir(self) -> str:
+        return os.path.join(self.data_dir, "photon_data")
+
+    @property
+    def os_node_dir(self) -> str:
+        return os.path.join(self.photon_data_dir, "node_1")
+
+    @property
+    def pending_dir(self) -> str:
+        return os.path.join(self.data_dir, "pending", "photon_data")
+
+    @property
+    def peer_dir(self) -> str:
+        return os.path.join(self.data_dir, "peer")
+
+    @property
+    def cache_dir(self) -> str:
+        return os.path.join(self.data_dir, "cache")
+
+    @property
+    def base_url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    @property
+    def bboxes(self) -> list[tuple[float, float, float, float]]:
+        return get_region_bboxes(self.region)
+
+    @property
+    def java_params(self) -> str:
+        """Per-instance JVM options from ``JAVA_PARAMS_<NAME>``, falling back to the shared ``JAVA_PARAMS``."""
+        name = self.replica_of.name if self.replica_of else self.name
+        env_name = "JAVA_PARAMS_" + name.upper().replace("-", "_")
+        return os.getenv(env_name) or config.JAVA_PARAMS or ""
+
+    def subprocess_env(self) -> dict[str, str]:
+        env = dict(os.environ)
+        env["PHOTON_INSTANCE_DATA_DIR"] = self.data_dir
+        env["PHOTON_INSTANCE_PORT"] = str(self.port)
+        if self.region:
+            env["REGION"] = self.region
+        return env
+
+
+def is_multi_region() -> bool:
+    return len(config.REGIONS) > 1
+
+
+def needs_router() -> bool:
+    return is_multi_region() or config.PHOTON_REPLICAS > 1
+
+
+def primaries(instances: list[PhotonInstance]) -> list[PhotonInstance]:
+    return [i for i in instances if i.replica_of is None]
+
+
+def replicas_of(instances: list[PhotonInstance], primary: PhotonInstance) -> list[PhotonInstance]:
+    return [i for i in instances if i.replica_of is primary]
+
+
+def configured_instances() -> list[PhotonInstance]:
+    """One instance serving ``REGION`` directly, or loopback instances behind the router.
+
+    Behind the router every region (``REGIONS``) gets a primary instance that downloads and updates the index,
+    plus ``PHOTON_REPLICAS - 1`` replicas serving clones of it from ``<data_dir>/replicas/<n>``.
+    """
+    if not needs_router():
+        region = config.REGIONS[0] if config.REGIONS else config.REGION
+        return [PhotonInstance("default", region, config.DATA_DIR, config.PHOTON_PORT, config.PHOTON_LISTEN_IP)]
+
+    if is_multi_region():
+        names = [normalize_region(region) or region for region in config.REGIONS]
+        groups = [(name, name, os.path.join(config.DATA_DIR, "regions", name)) for name in names]
+    else:
+        groups = [("default", config.REGIONS[0] if config.REGIONS else config.REGION, config.DATA_DIR)]
+
+    instances = []
+    port = config.PHOTON_INSTANCE_BASE_PORT
+    for name, region, data_dir in groups:
+        primary = PhotonInstance(name, region, data_dir, port, "127.0.0.1")
+        instances.append(primary)
+        port += 1
+        for n in range(1, config.PHOTON_REPLICAS):
+            replica_dir = os.path.join(data_dir, "replicas", str(n))
+            instances.append(PhotonInstance(f"{name}-{n}", region, replica_dir, port, "127.0.0.1", replica_of=primary))
+            port += 1
+    return instances
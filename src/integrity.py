@@ -0,0 +1,96 @@
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from src.utils import config
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+# Lucene's CodecUtil frames every index file with a header and a 16 byte footer (magic, algorithm id, checksum)
+CODEC_MAGIC = 0x3FD76C17
+FOOTER_MAGIC = 0xC02893E8
+FOOTER_LENGTH = 16
+CODEC_EXTENSIONS = {
+    "cfe", "cfs", "doc", "dvd", "dvm", "fdm", "fdt", "fdx", "fnm", "kdd", "kdi", "kdm", "liv", "nvd", "nvm", "pay",
+    "pos", "si", "st", "tim", "tip", "tmd", "tvd", "tvm", "tvx", "vec", "vem", "vex",
+}  # fmt: skip
+MAX_REPORTED_PROBLEMS = 20
+
+
+class IndexIntegrityError(Exception):
+    pass
+
+
+@dataclass
+class FileProblem:
+    path: str
+    reason: str
+
+
+def has_codec_footer(name: str) -> bool:
+    return name.startswith("segments_") or name.rsplit(".", 1)[-1] in CODEC_EXTENSIONS
+
+
+def check_file(path: str, expected_size: int | None) -> FileProblem | None:
+    """Check a single file's size and, for Lucene/OpenSearch files, its codec header and footer magic."""
+    try:
+        size = os.path.getsize(path)
+        if expected_size is not None and size != expected_size:
+            return FileProblem(path, f"size {size}, expected {expected_size}")
+        if not has_codec_footer(os.path.basename(path)):
+            return None
+        if size < FOOTER_LENGTH + 4:
+            return FileProblem(path, f"too small for a Lucene file ({size} bytes)")
+        with open(path, "rb") as f:
+            (header,) = struct.unpack(">I", f.read(4))
+            f.seek(-FOOTER_LENGTH, os.SEEK_END)
+            footer, algorithm = struct.unpack(">II", f.read(8))
+    except OSError as e:
+        return FileProblem(path, f"unreadable: {e}")
+
+    if header != CODEC_MAGIC:
+        return FileProblem(path, f"bad codec header 0x{header:08x}")
+    if footer != FOOTER_MAGIC or algorithm != 0:
+        return FileProblem(path, f"bad codec footer 0x{footer:08x}, truncated or corrupt")
+    return None
+
+
+def check_index(index_dir: str, expected: dict[str, int] | None = None, base_dir: str | None = None):
+    """Structurally check an extracted index before it is swapped in, without reading the files in full.
+
+    ``expected`` maps member names of the archive (relative to ``base_dir``, the extraction directory) to their
+    sizes; every listed file has to exist with that size. Raises ``IndexIntegrityError`` naming the bad files.
+    """
+    start = time.time()
+    base_dir = base_dir or os.path.dirname(index_dir)
+    sizes: dict[str, int | None] = {}
+    for root, _dirs, files in os.walk(index_dir):
+        for name in files:
+            sizes[os.path.join(root, name)] = None
+
+    problems = []
+    if expected:
+        for name, size in expected.items():
+            path = os.path.normpath(os.path.join(base_dir, name))
+            if path in sizes:
+                sizes[path] = size
+            elif path.startswith(index_dir + os.sep):
+                problems.append(FileProblem(path, "missing"))
+
+    if not sizes:
+        raise IndexIntegrityError(f"No files found in {index_dir}")
+
+    with ThreadPoolExecutor(max_workers=config.INDEX_CHECK_WORKERS, thread_name_prefix="check") as pool:
+        problems.extend(problem for problem in pool.map(check_file, sizes, sizes.values()) if problem)
+
+    if problems:
+        for problem in problems[:MAX_REPORTED_PROBLEMS]:
+            logging.error(f"Index check: {os.path.relpath(problem.path, base_dir)}: {problem.reason}")
+        if len(problems) > MAX_REPORTED_PROBLEMS:
+            logging.error(f"Index check: ... and {len(problems) - MAX_REPORTED_PROBLEMS} more")
+        raise IndexIntegrityError(f"Extracted index failed the integrity check: {len(problems)} bad file(s)")
+
+    logging.info(f"Index check passed: {len(sizes)} files in {time.time() - start:.1f}s")
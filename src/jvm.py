@@ -0,0 +1,184 @@
+import os
+import re
+import signal
+import socket
+import time
+from dataclasses import dataclass
+
+from src.utils import config, metrics
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+# unified logging line of a stop-the-world pause, e.g.
+# [2026-01-01T10:00:00.000+0000][12.345s][info][gc] GC(3) Pause Young (Normal) (G1 Evacuation Pause) 24M->4M(256M) 2.345ms
+GC_PAUSE_PATTERN = re.compile(
+    r"GC\((?P<gc>\d+)\) (?P<cause>Pause .+?) (?P<before>\d+)(?P<before_unit>[KMG])->(?P<after>\d+)(?P<after_unit>[KMG])"
+    r"\((?P<committed>\d+)(?P<committed_unit>[KMG])\) (?P<ms>[\d.]+)ms$"
+)
+UNITS = {"K": 1024, "M": 1024**2, "G": 1024**3}
+ATTACH_TIMEOUT = 10
+
+
+class AttachError(Exception):
+    pass
+
+
+@dataclass
+class GcPause:
+    kind: str
+    seconds: float
+    heap_before: int
+    heap_after: int
+    heap_committed: int
+
+
+def gc_log_path(instance_name: str) -> str:
+    return os.path.join(config.LOGS_DIR, f"gc-{instance_name}.log")
+
+
+def gc_log_options(instance_name: str) -> list[str]:
+    """JVM options writing GC pauses and heap sizes to a rotating log under ``LOGS_DIR``."""
+    os.makedirs(config.LOGS_DIR, exist_ok=True)
+    rotation = f"filecount={config.GC_LOG_FILES},filesize={config.GC_LOG_FILE_SIZE}"
+    return [f"-Xlog:gc,gc+heap=info:file={gc_log_path(instance_name)}:time,uptime,level,tags:{rotation}"]
+
+
+def parse_gc_line(line: str) -> GcPause | None:
+    match = GC_PAUSE_PATTERN.search(line.rstrip())
+    if not match:
+        return None
+    return GcPause(
+        kind=match["cause"].split()[1].lower(),
+        seconds=float(match["ms"]) / 1000,
+        heap_before=int(match["before"]) * UNITS[match["before_unit"]],
+        heap_after=int(match["after"]) * UNITS[match["after_unit"]],
+        heap_committed=int(match["committed"]) * UNITS[match["committed_unit"]],
+    )
+
+
+class GcLogReader:
+    """Follow the GC log of one Photon instance and turn its pauses into metrics.
+
+    The log is read incrementally from the last offset. A new inode or a shrinking file means the JVM rotated it or
+    was restarted, so reading starts over at the beginning; the counters keep accumulating across both.
+    """
+
+    def __init__(self, instance_name: str):
+        self.instance = instance_name
+        self.path = gc_log_path(instance_name)
+        self.offset = 0
+        self.inode: int | None = None
+        self.partial = b""
+        self.pauses: dict[str, int] = {}
+        self.pause_seconds: dict[str, float] = {}
+        self.max_pause = 0.0
+
+    def read_new_lines(self) -> list[str]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.inode, self.offset, self.partial = stat.st_ino, 0, b""
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = self.partial + f.read(stat.st_size - self.offset)
+        self.offset = stat.st_size
+        *lines, self.partial = data.split(b"\n")
+        return [line.decode(errors="replace") for line in lines]
+
+    def poll(self) -> list[GcPause]:
+        pauses = [pause for line in self.read_new_lines() if (pause := parse_gc_line(line))]
+        for pause in pauses:
+            self.record(pause)
+        return pauses
+
+    def record(self, pause: GcPause):
+        self.pauses[pause.kind] = self.pauses.get(pause.kind, 0) + 1
+        self.pause_seconds[pause.kind] = self.pause_seconds.get(pause.kind, 0.0) + pause.seconds
+        self.max_pause = max(self.max_pause, pause.seconds)
+
+        labels = {"instance": self.instance}
+        metrics.set_counter(
+            "photon_jvm_gc_pauses_total", self.pauses[pause.kind], "GC pauses", kind=pause.kind, **labels
+        )
+        metrics.set_counter(
+            "photon_jvm_gc_pause_seconds_total",
+            self.pause_seconds[pause.kind],
+            "Time spent in GC pauses",
+            kind=pause.kind,
+            **labels,
+        )
+        metrics.set_gauge("photon_jvm_gc_last_pause_seconds", pause.seconds, "Duration of the last GC pause", **labels)
+        metrics.set_gauge("photon_jvm_gc_max_pause_seconds", self.max_pause, "Longest GC pause seen", **labels)
+        metrics.set_gauge(
+            "photon_jvm_heap_before_gc_bytes", pause.heap_before, "Heap used before the last GC", **labels
+        )
+        metrics.set_gauge("photon_jvm_heap_after_gc_bytes", pause.heap_after, "Heap used after the last GC", **labels)
+        metrics.set_gauge("photon_jvm_heap_committed_bytes", pause.heap_committed, "Committed heap size", **labels)
+
+
+def _attach_socket(pid: int, timeout: float) -> str:
+    """Path of the JVM's attach socket, asking the JVM to open it first if needed.
+
+    This is the HotSpot attach handshake that ``jcmd`` performs, done here because the JRE image does not ship
+    ``jcmd``: an ``.attach_pid<pid>`` file plus SIGQUIT makes the JVM start its attach listener.
+    """
+    tmp_dir = os.path.join("/proc", str(pid), "root", "tmp")
+    socket_path = os.path.join(tmp_dir, f".java_pid{pid}")
+    if os.path.exists(socket_path):
+        return socket_path
+
+    attach_file = os.path.join("/proc", str(pid), "cwd", f".attach_pid{pid}")
+    try:
+        open(attach_file, "w").close()
+    except OSError:
+        attach_file = os.path.join(tmp_dir, f".attach_pid{pid}")
+        open(attach_file, "w").close()
+
+    try:
+        os.kill(pid, signal.SIGQUIT)
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(socket_path):
+            if time.monotonic() > deadline:
+                raise AttachError(f"JVM {pid} did not open its attach socket within {timeout}s")
+            time.sleep(0.1)
+    finally:
+        os.remove(attach_file)
+    return socket_path
+
+
+def jcmd(pid: int, command: str, timeout: float = ATTACH_TIMEOUT) -> str:
+    """Run a diagnostic command (as in ``jcmd <pid> <command>``) in a running JVM and return its output."""
+    try:
+        socket_path = _attach_socket(pid, timeout)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            # protocol version, operation and three arguments, each NUL terminated
+            sock.sendall(b"\0".join([b"1", b"jcmd", command.encode(), b"", b"", b""]))
+            response = b""
+            while chunk := sock.recv(4096):
+                response += chunk
+    except OSError as e:
+        raise AttachError(f"Could not attach to JVM {pid}: {e}") from e
+
+    code, _, output = response.decode(errors="replace").partition("\n")
+    if code.strip() != "0":
+        raise AttachError(f"JVM {pid} rejected '{command}' with code {code.strip()}: {output.strip()}")
+    return output
+
+
+def start_recording(pid: int, instance_name: str, duration: int | None = None) -> str:
+    """Start a time-boxed JFR recording; the JVM writes it to ``LOGS_DIR`` by itself once it ends."""
+    duration = duration or config.JFR_DURATION
+    os.makedirs(config.LOGS_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(config.LOGS_DIR, f"photon-{instance_name}-{stamp}.jfr")
+    jcmd(pid, f"JFR.start name=photon-{stamp} settings=profile duration={duration}s filename={path}")
+    logging.info(f"Recording {duration}s of JFR data from Photon [{instance_name}] to {path}")
+    return path
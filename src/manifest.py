@@ -0,0 +1,54 @@
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, fields
+
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+# lives inside photon_data, so it moves, is backed up and is cloned to replicas together with the index it describes
+MANIFEST_FILE = ".photon-manifest.json"
+
+
+@dataclass
+class IndexManifest:
+    url: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    size: int | None = None
+    md5: str | None = None
+    installed_at: float | None = None
+
+
+def read_manifest(index_dir: str) -> IndexManifest | None:
+    try:
+        with open(os.path.join(index_dir, MANIFEST_FILE)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    known = {field.name for field in fields(IndexManifest)}
+    return IndexManifest(**{key: value for key, value in data.items() if key in known})
+
+
+def write_manifest(index_dir: str, manifest: IndexManifest):
+    manifest.installed_at = time.time()
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(asdict(manifest), f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def describe_change(local: IndexManifest, remote: IndexManifest) -> str | None:
+    """Say how the remote archive differs from the installed one, using the strongest identity both know.
+
+    The checksum identifies the content itself, ETag and Last-Modified identify the object on the server and the size
+    is only a last resort. Returns ``None`` when the installed index is current.
+    """
+    if local.url and remote.url and local.url != remote.url:
+        return f"source changed from {local.url} to {remote.url}"
+    for name in ("md5", "etag", "last_modified", "size"):
+        local_value, remote_value = getattr(local, name), getattr(remote, name)
+        if local_value is not None and remote_value is not None:
+            return None if local_value == remote_value else f"{name} changed from {local_value} to {remote_value}"
+    return "installed index has no identity comparable with the remote"
@@ -0,0 +1,143 @@
+import grp
+import json
+import os
+import pwd
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging import Formatter, StreamHandler
+
+from src.generations import list_generations
+from src.instances import configured_instances
+from src.utils import config
+from src.utils.logger import LOG_FORMAT, get_logger
+
+logging = get_logger()
+
+OWNERSHIP_MARKER = ".photon-ownership"
+OWNERSHIP_WORKERS = 16
+
+
+def target_ids() -> tuple[int, int]:
+    try:
+        return pwd.getpwnam("photon").pw_uid, grp.getgrnam("photon").gr_gid
+    except KeyError:
+        return int(os.getenv("PUID", "9011")), int(os.getenv("PGID", "9011"))
+
+
+def index_directories(data_dir: str) -> list[str]:
+    """The index of every configured instance, replicas included, and the generations kept next to each of them."""
+    directories = []
+    for instance in configured_instances():
+        index_dir = os.path.join(data_dir, os.path.relpath(instance.photon_data_dir, config.DATA_DIR))
+        directories.append(index_dir)
+        directories.extend(generation.path for generation in list_generations(index_dir))
+    return directories
+
+
+def index_generation(data_dir: str) -> list[str]:
+    """Identify the index directories on disk; every update swaps in a new directory with a new inode."""
+    generation = []
+    for path in index_directories(data_dir):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        generation.append(f"{os.path.relpath(path, data_dir)}:{stat.st_ino}:{stat.st_mtime_ns}")
+    return generation
+
+
+def read_marker(data_dir: str) -> dict:
+    try:
+        with open(os.path.join(data_dir, OWNERSHIP_MARKER)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_marker(data_dir: str, state: dict, uid: int, gid: int):
+    marker = os.path.join(data_dir, OWNERSHIP_MARKER)
+    with open(marker, "w") as f:
+        json.dump(state, f)
+    os.lchown(marker, uid, gid)
+
+
+def refresh_marker(data_dir: str | None = None):
+    """Record a new index generation after an update done by the (already correct) photon user itself."""
+    data_dir = data_dir or config.DATA_DIR
+    state = read_marker(data_dir)
+    uid, gid = os.getuid(), os.getgid()
+    if state.get("uid") != uid or state.get("gid") != gid:
+        return
+    state["generation"] = index_generation(data_dir)
+    write_marker(data_dir, state, uid, gid)
+
+
+def _fix_directory(directory: str, uid: int, gid: int) -> tuple[list[str], int, int]:
+    subdirs = []
+    scanned = 0
+    changed = 0
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                    scanned += 1
+                    if stat.st_uid != uid or stat.st_gid != gid:
+                        os.lchown(entry.path, uid, gid)
+                        changed += 1
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                except FileNotFoundError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return subdirs, scanned, changed
+
+
+def reconcile(root: str, uid: int, gid: int, workers: int = OWNERSHIP_WORKERS) -> tuple[int, int]:
+    """Give every entry below ``root`` to ``uid:gid``, touching only entries that differ.
+
+    Directories are scanned in parallel; on large indexes this is dominated by metadata reads, which the kernel
+    serves concurrently.
+    """
+    stat = os.lstat(root)
+    scanned = 1
+    changed = 0
+    if stat.st_uid != uid or stat.st_gid != gid:
+        os.lchown(root, uid, gid)
+        changed += 1
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ownership") as pool:
+        pending = [pool.submit(_fix_directory, root, uid, gid)]
+        while pending:
+            subdirs, dir_scanned, dir_changed = pending.pop().result()
+            scanned += dir_scanned
+            changed += dir_changed
+            pending.extend(pool.submit(_fix_directory, subdir, uid, gid) for subdir in subdirs)
+    return scanned, changed
+
+
+def main() -> int:
+    start = time.time()
+    uid, gid = target_ids()
+    state = {"uid": uid, "gid": gid, "generation": index_generation(config.DATA_DIR)}
+
+    if read_marker(config.DATA_DIR) == state:
+        logging.info(f"Ownership unchanged since last start ({uid}:{gid}), skipping check")
+        return 0
+
+    logging.info(f"Reconciling ownership of {config.PHOTON_DIR} to {uid}:{gid}...")
+    scanned, changed = reconcile(config.PHOTON_DIR, uid, gid)
+    write_marker(config.DATA_DIR, state, uid, gid)
+    logging.info(f"Ownership reconciled in {time.time() - start:.1f}s: {changed} of {scanned} entries changed")
+    return 0
+
+
+if __name__ == "__main__":
+    # runs as root before privileges are dropped, so log to stdout only and never create a root-owned log file
+    handler = StreamHandler(sys.stdout)
+    handler.setFormatter(Formatter(LOG_FORMAT))
+    logging.addHandler(handler)
+    logging.setLevel(config.LOG_LEVEL)
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import cast
+
+import requests
+from requests.exceptions import RequestException
+
+from src.filesystem import preallocate
+from src.trash import move_to_trash
+from src.utils import config, metrics
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+MD5_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+MD5_HEADER = "X-Photon-MD5"
+PEER_PATH_PREFIX = "/peer/"
+PEER_TIMEOUT = (5, 60)
+
+
+class PeerDownloadError(Exception):
+    pass
+
+
+@dataclass
+class Peer:
+    url: str
+    size: int
+
+
+def publish_archive(archive: str, md5: str):
+    """Keep a verified archive under ``PEER_DIR/<md5>/`` so other nodes can pull it; older archives are trashed."""
+    os.makedirs(config.PEER_DIR, exist_ok=True)
+    target_dir = os.path.join(config.PEER_DIR, md5)
+    staging_dir = target_dir + ".partial"
+    if os.path.exists(staging_dir):
+        move_to_trash(staging_dir)
+
+    os.makedirs(staging_dir)
+    os.rename(archive, os.path.join(staging_dir, os.path.basename(archive)))
+    if os.path.exists(target_dir):
+        move_to_trash(target_dir)
+    os.rename(staging_dir, target_dir)
+
+    for entry in os.listdir(config.PEER_DIR):
+        if entry != md5 and not entry.startswith("."):
+            move_to_trash(os.path.join(config.PEER_DIR, entry))
+
+    logging.info(f"Published archive {md5} for peers")
+
+
+def find_published_archive(directories: list[str], md5: str) -> str | None:
+    if not MD5_PATTERN.match(md5):
+        return None
+    for directory in directories:
+        archive_dir = os.path.join(directory, md5)
+        try:
+            names = sorted(os.listdir(archive_dir))
+        except OSError:
+            continue
+        archives = [name for name in names if name.endswith(f".{config.INDEX_FILE_EXTENSION}")]
+        if archives:
+            return os.path.join(archive_dir, archives[0])
+    return None
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Return the inclusive byte range of a single-range ``Range`` header, or ``None`` if it is unsatisfiable."""
+    if not header:
+        return 0, size - 1
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+class PeerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, directories: list[str]):
+        super().__init__(address, PeerHandler)
+        self.directories = directories
+
+
+class PeerHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logging.debug(f"Peer: {self.address_string()} {format % args}")
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool):
+        md5 = self.path.removeprefix(PEER_PATH_PREFIX) if self.path.startswith(PEER_PATH_PREFIX) else ""
+        archive = find_published_archive(cast(PeerServer, self.server).directories, md5)
+        if not archive:
+            self.send_error(404)
+            return
+
+        with open(archive, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            byte_range = parse_range(self.headers.get("Range"), size)
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            start, end = byte_range
+            partial = self.headers.get("Range") is not None
+            self.send_response(206 if partial else 200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header(MD5_HEADER, md5)
+            if partial:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+
+            if send_body:
+                self.wfile.flush()
+                self.connection.sendfile(f, start, end - start + 1)
+
+
+def start_peer_server(directories: list[str]) -> PeerServer:
+    server = PeerServer((config.PHOTON_LISTEN_IP, config.PEER_PORT), directories)
+    thread = threading.Thread(target=server.serve_forever, name="peer-server", daemon=True)
+    thread.start()
+    logging.info(f"Serving verified archives to peers on {config.PHOTON_LISTEN_IP}:{config.PEER_PORT}")
+    return server
+
+
+def _probe_peer(url: str, md5: str) -> Peer | None:
+    try:
+        response = requests.head(f"{url}{PEER_PATH_PREFIX}{md5}", timeout=PEER_TIMEOUT[0])
+    except RequestException as e:
+        logging.debug(f"Peer {url} unreachable: {e}")
+        return None
+    if response.status_code != 200 or response.headers.get(MD5_HEADER) != md5:
+        return None
+    return Peer(url, int(response.headers.get("Content-Length", 0)))
+
+
+def discover_peers(md5: str) -> list[Peer]:
+    """Ask every configured peer whether it has published the archive with the expected checksum."""
+    if not config.PEERS:
+        return []
+    with ThreadPoolExecutor(max_workers=len(config.PEERS)) as pool:
+        found = [peer for peer in pool.map(lambda url: _probe_peer(url, md5), config.PEERS) if peer]
+
+    sizes = {peer.size for peer in found}
+    if len(sizes) > 1:
+        logging.warning(f"Peers disagree on the size of archive {md5}: {sorted(sizes)}, ignoring peers")
+        return []
+    return found
+
+
+class _PeerTransfer:
+    def __init__(self, fd: int, md5: str, size: int, cancel_event: threading.Event | None):
+        self.fd = fd
+        self.md5 = md5
+        self.size = size
+        self.cancel_event = cancel_event
+        self.chunks: queue.Queue[tuple[int, int]] = queue.Queue()
+        for offset in range(0, size, config.PEER_CHUNK_SIZE):
+            self.chunks.put((offset, min(config.PEER_CHUNK_SIZE, size - offset)))
+        self.remaining = self.chunks.qsize()
+        self.downloaded = 0
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if not self.remaining:
+            self.done.set()
+
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def fetch_chunk(self, session: requests.Session, peer: Peer, offset: int, length: int):
+        headers = {"Range": f"bytes={offset}-{offset + length - 1}"}
+        url = f"{peer.url}{PEER_PATH_PREFIX}{self.md5}"
+        position = offset
+        with session.get(url, headers=headers, stream=True, timeout=PEER_TIMEOUT) as response:
+            if response.status_code != 206:
+                raise PeerDownloadError(f"Peer {peer.url} answered {response.status_code}")
+            for data in response.iter_content(chunk_size=1024 * 1024):
+                if self.cancelled():
+                    raise PeerDownloadError("Download cancelled")
+                data = data[: offset + length - position]
+                os.pwrite(self.fd, data, position)
+                position += len(data)
+                with self.lock:
+                    self.downloaded += len(data)
+        if position != offset + length:
+            raise PeerDownloadError(f"Peer {peer.url} sent {position - offset} of {length} bytes")
+
+    def worker(self, peer: Peer):
+        session = requests.Session()
+        while not self.done.is_set() and not self.cancelled():
+            try:
+                offset, length = self.chunks.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self.fetch_chunk(session, peer, offset, length)
+            except (RequestException, PeerDownloadError, OSError) as e:
+                logging.warning(f"Dropping peer {peer.url}: {e}")
+                self.chunks.put((offset, length))
+                return
+            with self.lock:
+                self.remaining -= 1
+                if self.remaining == 0:
+                    self.done.set()
+
+
+def download_from_peers(md5: str, destination: str, cancel_event: threading.Event | None = None) -> bool:
+    """Pull the archive with checksum ``md5`` from all peers that have it, splitting it into ranges.
+
+    Returns ``False`` (leaving nothing behind) when no peer has the archive or every peer failed, so the caller can
+    fall back to the origin. The result is still verified against the published MD5 by the regular update flow.
+    """
+    peers = discover_peers(md5)
+    if not peers:
+        logging.info("No peer has the current archive, downloading from origin")
+        return False
+
+    size = peers[0].size
+    logging.info(f"Downloading {size / (1024**3):.2f}GB from {len(peers)} peer(s): {', '.join(p.url for p in peers)}")
+    start_time = time.time()
+
+    fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if config.DOWNLOAD_PREALLOCATE:
+            preallocate(fd, 0, size)
+        os.ftruncate(fd, size)
+
+        transfer = _PeerTransfer(fd, md5, size, cancel_event)
+        threads = [
+            threading.Thread(target=transfer.worker, args=(peer,), name=f"peer-{i}", daemon=True)
+            for i, peer in enumerate(peers * config.PEER_STREAMS)
+        ]
+        for thread in threads:
+            thread.start()
+
+        last_log = time.time()
+        while not transfer.done.wait(1):
+            if transfer.cancelled() or not any(thread.is_alive() for thread in threads):
+                break
+            if time.time() - last_log >= config.PROGRESS_LOG_INTERVAL:
+                last_log = time.time()
+                logging.info(f"Peer download progress: {transfer.downloaded / size * 100:.1f}%")
+                metrics.set_gauge("photon_download_bytes", transfer.downloaded, "Bytes downloaded so far")
+                metrics.set_gauge("photon_download_bytes_total", size, "Total download size")
+                metrics.write_textfile()
+
+        transfer.done.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        os.close(fd)
+
+    if transfer.remaining:
+        logging.warning(f"Peer download incomplete ({transfer.remaining} chunks missing), falling back to origin")
+        os.remove(destination)
+        return False
+
+    duration = time.time() - start_time
+    logging.info(f"Peer download completed: {size / (1024**3):.2f}GB in {duration:.1f}s")
+    return True
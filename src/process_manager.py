@@ -6,33 +6,42 @@ import subprocess
 import sys
 import threading
 import time
+from contextlib import contextmanager
 from enum import Enum
-
-import psutil
-import requests
-import schedule
-from requests.exceptions import RequestException
-
-from src.check_remote import compare_mtime
-from src.filesystem import cleanup_backup_after_verification
-from src.utils import config
+from http.client import HTTPConnection, HTTPException
+
+from src.cds import class_data_options, record_startup
+from src.generations import active_generation
+from src.instances import PhotonInstance, configured_instances, needs_router, primaries, replicas_of
+from src.jvm import AttachError, GcLogReader, gc_log_options, start_recording
+from src.ownership import refresh_marker
+from src.trash import start_reaper
+from src.utils import config, metrics
 from src.utils.logger import get_logger, setup_logging
+from src.utils.maintenance import in_window, parse_window
+from src.utils.startup import StartupTimer
+from src.worker import run_module
 
-logger = get_logger()
+# requests, psutil, schedule and the download/extraction modules are imported where they are used, so the
+# resident manager starts quickly and keeps a small footprint until it actually has to update an index
 
+logger = get_logger()
 
-def check_photon_health(timeout=30, max_retries=10) -> bool:
-    url = "http://localhost:2322/status"
 
+def check_photon_health(timeout=30, max_retries=10, port=None) -> bool:
     for attempt in range(max_retries):
+        connection = HTTPConnection("localhost", port or config.PHOTON_PORT, timeout=timeout)
         try:
-            response = requests.get(url, timeout=timeout)
-            if response.status_code == 200:
+            connection.request("GET", "/status")
+            status = connection.getresponse().status
+            if status == 200:
                 logger.info("Photon health check passed")
                 return True
-            logger.warning(f"Photon health check failed with status {response.status_code}")
-        except RequestException as e:
+            logger.warning(f"Photon health check failed with status {status}")
+        except (OSError, HTTPException) as e:
             logger.debug(f"Health check attempt {attempt + 1} failed: {e}")
+        finally:
+            connection.close()
 
         if attempt < max_retries - 1:
             time.sleep(3)
@@ -41,12 +50,12 @@ def check_photon_health(timeout=30, max_retries=10) -> bool:
     return False
 
 
-def wait_for_photon_ready(timeout=120) -> bool:
+def wait_for_photon_ready(timeout=120, port=None) -> bool:
     start_time = time.time()
     logger.info("Waiting for Photon to become ready...")
 
     while time.time() - start_time < timeout:
-        if check_photon_health(timeout=5, max_retries=1):
+        if check_photon_health(timeout=5, max_retries=1, port=port):
             elapsed = time.time() - start_time
             logger.info(f"Photon ready after {elapsed:.1f} seconds")
             return True
@@ -56,6 +65,14 @@ def wait_for_photon_ready(timeout=120) -> bool:
     return False
 
 
+def _data_dir_arg(cmdline: list[str]) -> str | None:
+    if "-data-dir" in cmdline:
+        index = cmdline.index("-data-dir")
+        if index + 1 < len(cmdline):
+            return cmdline[index + 1]
+    return None
+
+
 class AppState(Enum):
     INITIALIZING = 1
     RUNNING = 2
@@ -66,33 +83,88 @@ class AppState(Enum):
 class PhotonManager:
     def __init__(self):
         self.state = AppState.INITIALIZING
-        self.photon_process = None
+        self.instances = configured_instances()
+        self.router = None
+        self.peer_server = None
+        self.batch_server = None
         self.should_exit = False
+        self.activation_requested = False
+        self.update_deferred = False
+        self.profile_requested = False
+        self.gc_logs: dict[str, GcLogReader] = {}
+        # held while instances are updated, activated or switched, so the scheduler and monitor threads take turns
+        self.update_lock = threading.RLock()
+        self.manual_activation = (config.UPDATE_WINDOW or "").upper() == "MANUAL"
+        self.update_window = None
+        if config.UPDATE_WINDOW and not self.manual_activation:
+            try:
+                self.update_window = parse_window(config.UPDATE_WINDOW)
+            except ValueError as e:
+                logger.error(f"{e}, activating updates as soon as they are ready")
 
         signal.signal(signal.SIGTERM, self.handle_shutdown)
         signal.signal(signal.SIGINT, self.handle_shutdown)
+        signal.signal(signal.SIGUSR1, self.handle_activate)
+        signal.signal(signal.SIGUSR2, self.handle_profile)
+
+    @staticmethod
+    def _label(instance: PhotonInstance) -> str:
+        return "" if instance.name == "default" else f" [{instance.name}]"
 
     def handle_shutdown(self, signum, _frame):
         logger.info(f"Received shutdown signal {signum}")
         self.should_exit = True
         self.shutdown()
 
-    def run_initial_setup(self):
-        logger.info("Running initial setup...")
-        result = subprocess.run(["uv", "run", "--no-sync", "-m", "src.entrypoint", "setup"], check=False, cwd="/photon")  # noqa S603
+    def handle_activate(self, signum, _frame):
+        logger.info(f"Received signal {signum}, activating staged updates")
+        self.activation_requested = True
+
+    def handle_profile(self, signum, _frame):
+        logger.info(f"Received signal {signum}, recording a JFR profile")
+        self.profile_requested = True
+
+    @property
+    def stages_updates(self) -> bool:
+        """With an update window, new indexes are prepared as soon as they are published but swapped in later."""
+        return bool(self.update_window or self.manual_activation)
+
+    def activation_due(self) -> bool:
+        return not self.manual_activation and in_window(self.update_window)
 
-        if result.returncode != 0:
+    def run_initial_setup(self, instance: PhotonInstance):
+        logger.info(f"Running initial setup{self._label(instance)}...")
+        os.makedirs(instance.data_dir, exist_ok=True)
+        returncode = run_module("src.entrypoint", instance.subprocess_env(), "setup")
+
+        if returncode != 0:
             logger.error("Setup failed!")
             sys.exit(1)
 
     def start_photon(self, max_startup_retries=3):
+        """Start every instance; Photon is up when each region has at least one instance serving it."""
+        results = [(instance, self.start_instance(instance, max_startup_retries)) for instance in self.instances]
+        failed = [instance for instance, started in results if not started]
+        for instance in failed:
+            self.mark_failed(instance)
+        if failed:
+            logger.error(f"Photon failed to start: {', '.join(instance.name for instance in failed)}")
+
+        serving = {(instance.replica_of or instance).name for instance, started in results if started}
+        self.state = AppState.RUNNING
+        return all(primary.name in serving for primary in primaries(self.instances))
+
+    def start_instance(self, instance: PhotonInstance, max_startup_retries=3):
+        label = self._label(instance)
+        instance.generation = active_generation(instance.photon_data_dir)
         for attempt in range(max_startup_retries):
-            logger.info(f"Starting Photon (attempt {attempt + 1}/{max_startup_retries})...")
-            self.state = AppState.RUNNING
+            logger.info(f"Starting Photon{label} (attempt {attempt + 1}/{max_startup_retries})...")
 
             enable_metrics = config.ENABLE_METRICS or ""
-            java_params = config.JAVA_PARAMS or ""
+            java_params = instance.java_params
             photon_params = config.PHOTON_PARAMS or ""
+            # one instance keeps the archive up to date, the others only map it
+            cds_params, with_archive = class_data_options(java_params, maintain=instance is self.instances[0])
 
             cmd = [
                 "java",
@@ -104,18 +176,25 @@ class PhotonManager:
                 "-Dlog4j2.disable.jmx=true",
             ]
 
+            cmd.extend(cds_params)
+
+            if config.GC_LOGGING:
+                cmd.extend(gc_log_options(instance.name))
+
             if java_params:
                 cmd.extend(shlex.split(java_params))
 
             cmd.extend(
                 [
                     "-jar",
-                    "/photon/photon.jar",
+                    config.PHOTON_JAR,
                     "serve",
                     "-listen-ip",
-                    config.PHOTON_LISTEN_IP,
+                    instance.listen_ip,
+                    "-listen-port",
+                    str(instance.port),
                     "-data-dir",
-                    config.DATA_DIR,
+                    instance.data_dir,
                 ]
             )
 
@@ -125,57 +204,69 @@ class PhotonManager:
             if photon_params:
                 cmd.extend(shlex.split(photon_params))
 
-            self.photon_process = subprocess.Popen(cmd, cwd="/photon", preexec_fn=os.setsid)  # noqa S603
+            launched = time.time()
+            instance.process = subprocess.Popen(cmd, cwd=config.PHOTON_DIR, preexec_fn=os.setsid)  # noqa S603
 
-            logger.info(f"Photon started with PID: {self.photon_process.pid}")
+            logger.info(f"Photon{label} started with PID: {instance.process.pid}")
 
-            if wait_for_photon_ready():
-                logger.info("Photon startup successful")
+            if wait_for_photon_ready(port=instance.port):
+                logger.info(f"Photon{label} startup successful")
+                instance.failed_at = None
+                if cds_params:
+                    record_startup(time.time() - launched, with_archive)
+                    metrics.write_textfile(config.JVM_METRICS_FILE, prefix="photon_jvm_")
                 return True
-            logger.error(f"Photon health check failed on attempt {attempt + 1}")
-            self.stop_photon()
+            logger.error(f"Photon{label} health check failed on attempt {attempt + 1}")
+            self.stop_instance(instance)
 
             if attempt < max_startup_retries - 1:
                 logger.info("Retrying Photon startup...")
                 time.sleep(5)
 
-        logger.error(f"Photon failed to start successfully after {max_startup_retries} attempts")
+        logger.error(f"Photon{label} failed to start successfully after {max_startup_retries} attempts")
         return False
 
     def stop_photon(self):
-        if self.photon_process:
-            logger.info("Stopping Photon...")
+        for instance in self.instances:
+            self.stop_instance(instance)
+
+    def stop_instance(self, instance: PhotonInstance):
+        if instance.process:
+            logger.info(f"Stopping Photon{self._label(instance)}...")
 
             try:
-                os.killpg(os.getpgid(self.photon_process.pid), signal.SIGTERM)
-                self.photon_process.wait(timeout=30)
+                os.killpg(os.getpgid(instance.process.pid), signal.SIGTERM)
+                instance.process.wait(timeout=30)
             except subprocess.TimeoutExpired:
                 logger.warning("Photon didn't stop gracefully, force killing...")
                 # Force kill
                 try:
-                    os.killpg(os.getpgid(self.photon_process.pid), signal.SIGKILL)
+                    os.killpg(os.getpgid(instance.process.pid), signal.SIGKILL)
                 except ProcessLookupError:
                     pass  # Process dead
-                self.photon_process.wait()
+                instance.process.wait()
             except ProcessLookupError:
                 # Process dead
                 pass
 
-            self.photon_process = None
+            instance.process = None
 
-            self.cleanup_orphaned_photon_processes()
+            self.cleanup_orphaned_photon_processes(instance)
 
-            self._cleanup_lock_files()
+            self._cleanup_lock_files(instance)
 
             time.sleep(2)
 
-    def cleanup_orphaned_photon_processes(self):
+    def cleanup_orphaned_photon_processes(self, instance: PhotonInstance):
+        import psutil
+
         try:
             for proc in psutil.process_iter(["pid", "name", "cmdline"]):
+                cmdline = proc.info["cmdline"] or []
                 if (
                     proc.info["name"] == "java"
-                    and proc.info["cmdline"]
-                    and any("photon.jar" in arg for arg in proc.info["cmdline"])
+                    and any("photon.jar" in arg for arg in cmdline)
+                    and _data_dir_arg(cmdline) in (None, instance.data_dir)
                 ):
                     logger.warning(f"Found orphaned Photon process PID {proc.info['pid']}, terminating...")
                     proc.terminate()
@@ -186,10 +277,10 @@ class PhotonManager:
         except Exception as e:
             logger.debug(f"Error checking for orphaned processes: {e}")
 
-    def _cleanup_lock_files(self):
+    def _cleanup_lock_files(self, instance: PhotonInstance):
         lock_files = [
-            os.path.join(config.OS_NODE_DIR, "node.lock"),
-            os.path.join(config.OS_NODE_DIR, "data", "node.lock"),
+            os.path.join(instance.os_node_dir, "node.lock"),
+            os.path.join(instance.os_node_dir, "data", "node.lock"),
         ]
 
         for lock_file in lock_files:
@@ -205,58 +296,267 @@ class PhotonManager:
             logger.info("Updates disabled, skipping")
             return
 
-        self.state = AppState.UPDATING
-        logger.info(f"Running {config.UPDATE_STRATEGY.lower()} update...")
+        if config.UPDATE_STRATEGY != "PARALLEL" and self.stages_updates and not self.activation_due():
+            # the other strategies may take Photon down before the index is ready, so all of it waits for the window
+            logger.info(
+                f"Deferring {config.UPDATE_STRATEGY.lower()} update until the update window ({config.UPDATE_WINDOW})"
+            )
+            self.update_deferred = True
+            return
+
+        with self.updating():
+            for instance in primaries(self.instances):
+                self.update_instance(instance)
+
+    @contextmanager
+    def updating(self):
+        """Hold the state at UPDATING until every instance of the loop is done, not just the first restarted one."""
+        with self.update_lock:
+            self.state = AppState.UPDATING
+            try:
+                yield
+            finally:
+                if self.state == AppState.UPDATING:
+                    self.state = AppState.RUNNING
+
+    def update_instance(self, instance: PhotonInstance):
+        label = self._label(instance)
+        logger.info(f"Running {config.UPDATE_STRATEGY.lower()} update{label}...")
         update_start = time.time()
 
-        if not compare_mtime():
+        from src.check_remote import update_available
+
+        if not update_available(instance.region, instance.data_dir):
             update_duration = time.time() - update_start
-            logger.info(f"Index already up to date - no restart needed ({update_duration:.1f}s)")
-            self.state = AppState.RUNNING
+            logger.info(f"Index{label} already up to date - no restart needed ({update_duration:.1f}s)")
             return
 
-        if config.UPDATE_STRATEGY == "SEQUENTIAL":
-            self.stop_photon()
+        if config.UPDATE_STRATEGY == "PARALLEL" and self.stages_updates:
+            self.stage_update(instance, update_start)
+            return
 
-        result = subprocess.run(["uv", "run", "--no-sync", "-m", "src.updater"], check=False, cwd="/photon")  # noqa S603
+        if config.UPDATE_STRATEGY == "SEQUENTIAL":
+            # replicas keep serving the old index from their own links until they are rolled
+            self.drain_instance(instance)
+            self.stop_instance(instance)
 
-        if result.returncode == 0:
-            logger.info("Update process completed, verifying Photon health...")
+        if config.UPDATE_STRATEGY in ("HYBRID", "AUTO"):
+            returncode = self.run_hybrid_update(instance)
+        else:
+            returncode = run_module("src.updater", instance.subprocess_env())
+        start_reaper().wake()
 
-            if config.UPDATE_STRATEGY == "PARALLEL":
-                self.stop_photon()
-                if self.start_photon():
-                    update_duration = time.time() - update_start
-                    logger.info(f"Update completed successfully - Photon healthy ({update_duration:.1f}s)")
-                    target_node_dir = os.path.join(config.PHOTON_DATA_DIR)
-                    cleanup_backup_after_verification(target_node_dir)
-                else:
-                    update_duration = time.time() - update_start
-                    logger.error(f"Update failed - Photon health check failed after restart ({update_duration:.1f}s)")
-            elif config.UPDATE_STRATEGY == "SEQUENTIAL":
-                if self.start_photon():
-                    update_duration = time.time() - update_start
-                    logger.info(f"Update completed successfully - Photon healthy ({update_duration:.1f}s)")
-                    target_node_dir = os.path.join(config.PHOTON_DATA_DIR)
-                    cleanup_backup_after_verification(target_node_dir)
-                else:
-                    update_duration = time.time() - update_start
-                    logger.error(f"Update failed - Photon health check failed after restart ({update_duration:.1f}s)")
+        if returncode == 0:
+            logger.info(f"Update process{label} completed, verifying Photon health...")
+            self.finish_update(instance, update_start)
         else:
             update_duration = time.time() - update_start
-            logger.error(f"Update process failed with code {result.returncode} ({update_duration:.1f}s)")
-            if config.UPDATE_STRATEGY == "SEQUENTIAL" and not self.photon_process:
+            logger.error(f"Update process{label} failed with code {returncode} ({update_duration:.1f}s)")
+            if not instance.process:
                 logger.info("Attempting to restart Photon after failed update")
-                if not self.start_photon():
+                if not self.restart_instance(instance):
                     logger.error("Failed to restart Photon after update failure")
 
-        self.state = AppState.RUNNING
+    def run_hybrid_update(self, instance: PhotonInstance) -> int:
+        """Download while Photon serves, then stop it only for the extraction if both indexes do not fit on disk."""
+        returncode = run_module("src.updater", instance.subprocess_env(), "download")
+        if returncode != config.ARCHIVE_READY_EXIT_CODE:
+            return returncode
+
+        logger.info(f"Archive{self._label(instance)} downloaded, stopping Photon to extract over its index")
+        self.drain_instance(instance)
+        self.stop_instance(instance)
+        return run_module("src.updater", instance.subprocess_env(), "install")
+
+    def finish_update(self, instance: PhotonInstance, update_start: float):
+        """Restart an instance on the index that was just moved into place and bring its replicas along."""
+        from src.filesystem import retire_old_generations
+
+        label = self._label(instance)
+        with self.update_lock:
+            # clone before Photon opens the new index so replicas get the verified files as extracted
+            staged = self.stage_replicas(instance)
+
+            if self.restart_instance(instance):
+                update_duration = time.time() - update_start
+                logger.info(f"Update{label} completed successfully - Photon healthy ({update_duration:.1f}s)")
+                self.roll_replicas(staged)
+                retire_old_generations(instance.photon_data_dir)
+                refresh_marker()
+            else:
+                update_duration = time.time() - update_start
+                logger.error(
+                    f"Update{label} failed - Photon health check failed after restart ({update_duration:.1f}s)"
+                )
+
+    def stage_update(self, instance: PhotonInstance, update_start: float):
+        from src.check_remote import update_available
+        from src.manifest import read_manifest
+
+        label = self._label(instance)
+        if read_manifest(instance.pending_dir) and not update_available(
+            instance.region, instance.data_dir, instance.pending_dir
+        ):
+            logger.info(f"Current index{label} is already staged, waiting for activation")
+            return
+
+        returncode = run_module("src.updater", instance.subprocess_env(), "prepare")
+        start_reaper().wake()
+        update_duration = time.time() - update_start
+
+        if returncode != 0:
+            logger.error(f"Update staging{label} failed with code {returncode} ({update_duration:.1f}s)")
+        elif self.manual_activation:
+            logger.info(f"Update{label} staged in {update_duration:.1f}s, send SIGUSR1 to activate it")
+        else:
+            logger.info(f"Update{label} staged in {update_duration:.1f}s, activating in window {config.UPDATE_WINDOW}")
+
+    def activate_pending_updates(self):
+        """Swap in staged indexes once the update window opens or an activation was requested."""
+        requested = self.activation_requested or os.path.exists(config.ACTIVATE_TRIGGER_FILE)
+        if not requested and not self.activation_due():
+            return
+
+        if requested:
+            self.activation_requested = False
+            if os.path.exists(config.ACTIVATE_TRIGGER_FILE):
+                os.remove(config.ACTIVATE_TRIGGER_FILE)
+
+        if self.update_deferred:
+            self.update_deferred = False
+            with self.updating():
+                for instance in primaries(self.instances):
+                    self.update_instance(instance)
+            return
+
+        pending = [instance for instance in primaries(self.instances) if os.path.isdir(instance.pending_dir)]
+        if not pending:
+            if requested:
+                logger.info("No staged update to activate")
+            return
+
+        with self.updating():
+            for instance in pending:
+                self.activate_instance(instance)
+
+    def activate_instance(self, instance: PhotonInstance):
+        from src.filesystem import activate_pending_index
+
+        update_start = time.time()
+        try:
+            activate_pending_index(instance.pending_dir, instance.photon_data_dir)
+        except Exception as e:
+            logger.error(f"Failed to activate staged index{self._label(instance)}: {e}")
+            return
+        self.finish_update(instance, update_start)
+
+    def drain_instance(self, instance: PhotonInstance):
+        instance.draining = True
+        if self.router and not self.router.wait_idle(instance, config.REPLICA_DRAIN_TIMEOUT):
+            logger.warning(f"Photon{self._label(instance)} still busy after {config.REPLICA_DRAIN_TIMEOUT}s, stopping")
+
+    def restart_instance(self, instance: PhotonInstance) -> bool:
+        self.drain_instance(instance)
+        self.stop_instance(instance)
+        try:
+            started = self.start_instance(instance)
+        finally:
+            instance.draining = False
+        if not started:
+            self.mark_failed(instance)
+        return started
+
+    def mark_failed(self, instance: PhotonInstance):
+        # the router sticks to the instances that are up until the monitor got this one running again
+        instance.draining = True
+        instance.failed_at = time.time()
+
+    def retry_failed_instances(self):
+        """Try again to start instances that failed to start, e.g. one replica of several at startup."""
+        if not self.update_lock.acquire(blocking=False):
+            return
+        try:
+            for instance in self.instances:
+                if instance.failed_at is None or time.time() - instance.failed_at < config.INSTANCE_RETRY_INTERVAL:
+                    continue
+                logger.info(f"Retrying to start Photon{self._label(instance)}...")
+                if self.start_instance(instance, max_startup_retries=1):
+                    instance.draining = False
+                else:
+                    instance.failed_at = time.time()
+        finally:
+            self.update_lock.release()
+
+    def stage_replicas(self, primary: PhotonInstance) -> list[tuple[PhotonInstance, str]]:
+        from src.replicas import stage_replica_index
+
+        staged = []
+        for replica in replicas_of(self.instances, primary):
+            try:
+                staged.append((replica, stage_replica_index(primary, replica)))
+            except Exception as e:
+                logger.error(f"Failed to stage index for replica {replica.name}, it keeps the old index: {e}")
+        return staged
+
+    def roll_replicas(self, staged: list[tuple[PhotonInstance, str]]):
+        """Swap replicas to the new index one at a time so the others keep serving."""
+        from src.filesystem import retire_old_generations
+        from src.replicas import activate_replica_index
+
+        for replica, staged_dir in staged:
+            self.drain_instance(replica)
+            self.stop_instance(replica)
+            try:
+                activate_replica_index(staged_dir, replica)
+            except Exception as e:
+                logger.error(f"Failed to activate new index for replica {replica.name}: {e}")
+
+            if self.restart_instance(replica):
+                retire_old_generations(replica.photon_data_dir)
+            else:
+                logger.error(f"Replica {replica.name} failed to start with the new index")
+
+    def ensure_replica_index(self, replica: PhotonInstance, force: bool = False):
+        primary = replica.replica_of
+        if primary is None:
+            return
+        if not (force or config.FORCE_UPDATE) and os.path.isdir(replica.os_node_dir):
+            return
+
+        from src.filesystem import retire_old_generations
+        from src.replicas import activate_replica_index, stage_replica_index
+
+        logger.info(f"Creating index for replica {replica.name} from {primary.photon_data_dir}")
+        activate_replica_index(stage_replica_index(primary, replica), replica)
+        retire_old_generations(replica.photon_data_dir)
+
+    def activate_pending_at_startup(self) -> set[str]:
+        """A staged index that survived a restart is swapped in before Photon starts, saving a second restart.
+
+        Returns the names of the primaries whose index changed, so their replicas can be cloned again.
+        """
+        activated = set()
+        if not self.activation_due():
+            return activated
+        from src.filesystem import activate_pending_index, retire_old_generations
+
+        for instance in primaries(self.instances):
+            if os.path.isdir(instance.pending_dir):
+                try:
+                    activate_pending_index(instance.pending_dir, instance.photon_data_dir)
+                    retire_old_generations(instance.photon_data_dir)
+                    activated.add(instance.name)
+                except Exception as e:
+                    logger.error(f"Failed to activate staged index{self._label(instance)}: {e}")
+        return activated
 
     def schedule_updates(self):
         if config.UPDATE_STRATEGY == "DISABLED":
             logger.info("Updates disabled, not scheduling")
             return
 
+        import schedule
+
         interval = config.UPDATE_INTERVAL.lower()
 
         if interval.endswith("d"):
@@ -278,38 +578,128 @@ class PhotonManager:
         def scheduler_loop():
             while not self.should_exit:
                 schedule.run_pending()
+                if self.stages_updates:
+                    self.activate_pending_updates()
                 time.sleep(1)
 
         thread = threading.Thread(target=scheduler_loop, daemon=True)
         thread.start()
 
+    def follow_generation_changes(self):
+        """Restart primaries whose index generation was switched underneath them, e.g. by a rollback."""
+        if not self.update_lock.acquire(blocking=False):
+            # an update is in progress and restarts the instances it switches itself
+            return
+        try:
+            for instance in primaries(self.instances):
+                current = active_generation(instance.photon_data_dir)
+                if instance.process and current != instance.generation:
+                    logger.info(f"Index of Photon{self._label(instance)} switched to generation {current}, restarting")
+                    with self.updating():
+                        self.finish_update(instance, time.time())
+        finally:
+            self.update_lock.release()
+
+    def read_gc_logs(self):
+        pauses = 0
+        for instance in self.instances:
+            reader = self.gc_logs.setdefault(instance.name, GcLogReader(instance.name))
+            pauses += len(reader.poll())
+        if pauses:
+            metrics.write_textfile(config.JVM_METRICS_FILE, prefix="photon_jvm_")
+
+    def record_profiles(self):
+        """Start a JFR recording in every running Photon, on SIGUSR2 or when the trigger file appears."""
+        requested = self.profile_requested or os.path.exists(config.PROFILE_TRIGGER_FILE)
+        if not requested:
+            return
+        self.profile_requested = False
+        if os.path.exists(config.PROFILE_TRIGGER_FILE):
+            os.remove(config.PROFILE_TRIGGER_FILE)
+
+        running = [
+            (instance, instance.process)
+            for instance in self.instances
+            if instance.process and instance.process.poll() is None
+        ]
+        if not running:
+            logger.info("No running Photon to profile")
+        for instance, process in running:
+            try:
+                start_recording(process.pid, instance.name)
+            except AttachError as e:
+                logger.error(f"Failed to start JFR recording{self._label(instance)}: {e}")
+
     def monitor_photon(self):
         while not self.should_exit:
-            if self.photon_process and self.state == AppState.RUNNING:
-                ret = self.photon_process.poll()
-                if ret is not None:
-                    logger.warning(f"Photon exited with code {ret}, restarting...")
-                    if not self.start_photon():
-                        logger.error("Failed to restart Photon after unexpected exit")
+            if config.GC_LOGGING:
+                self.read_gc_logs()
+            self.record_profiles()
+            if self.state == AppState.RUNNING:
+                self.follow_generation_changes()
+                self.retry_failed_instances()
+            for instance in self.instances:
+                if instance.process and self.state == AppState.RUNNING:
+                    ret = instance.process.poll()
+                    if ret is not None:
+                        logger.warning(f"Photon{self._label(instance)} exited with code {ret}, restarting...")
+                        if not self.start_instance(instance):
+                            logger.error("Failed to restart Photon after unexpected exit")
+                            self.mark_failed(instance)
             time.sleep(5)
 
     def shutdown(self):
         logger.info("Shutting down...")
         self.state = AppState.SHUTTING_DOWN
+        if self.router:
+            self.router.shutdown()
+        if self.peer_server:
+            self.peer_server.shutdown()
+        if self.batch_server:
+            self.batch_server.shutdown()
         self.stop_photon()
         sys.exit(0)
 
     def run(self):
         logger.info("Photon Manager starting...")
+        timer = StartupTimer()
+
+        with timer.phase("initial setup"):
+            activated = self.activate_pending_at_startup()
+            for instance in self.instances:
+                if instance.replica_of:
+                    self.ensure_replica_index(instance, force=instance.replica_of.name in activated)
+                elif not config.FORCE_UPDATE and os.path.isdir(instance.os_node_dir):
+                    logger.info(f"Existing index{self._label(instance)} found, skipping initial setup")
+                else:
+                    self.run_initial_setup(instance)
+            refresh_marker()
 
-        if not config.FORCE_UPDATE and os.path.isdir(config.OS_NODE_DIR):
-            logger.info("Existing index found, skipping initial setup")
-        else:
-            self.run_initial_setup()
+        with timer.phase("photon start"):
+            if not self.start_photon():
+                logger.error("Failed to start Photon during initial startup")
+                sys.exit(1)
 
-        if not self.start_photon():
-            logger.error("Failed to start Photon during initial startup")
-            sys.exit(1)
+        # reaping is background IO, start it once Photon no longer competes for the disk
+        start_reaper([instance.data_dir for instance in self.instances])
+
+        if needs_router():
+            from src.router import start_router
+
+            self.router = start_router(self.instances)
+
+        if config.PEER_SERVE:
+            from src.peers import start_peer_server
+
+            directories = [d for instance in primaries(self.instances) for d in (instance.peer_dir, instance.cache_dir)]
+            self.peer_server = start_peer_server(directories)
+
+        if config.BATCH_SERVE:
+            from src.batch import start_batch_server
+
+            self.batch_server = start_batch_server()
+
+        timer.log()
 
         self.schedule_updates()
 
@@ -0,0 +1,106 @@
+import errno
+import fcntl
+import os
+import shutil
+import time
+from dataclasses import dataclass
+
+from src.filesystem import move_index_atomic
+from src.instances import PhotonInstance
+from src.trash import move_to_trash
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+REFLINK_UNSUPPORTED = (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS)
+
+
+@dataclass
+class CloneStats:
+    reflinked: int = 0
+    hardlinked: int = 0
+    copied: int = 0
+    skipped: int = 0
+
+
+def _is_write_once(rel_path: str) -> bool:
+    """Lucene never modifies segment files after writing them, so they are safe to share between processes.
+
+    Everything else OpenSearch keeps on disk (translog, cluster state, checkpoints) is rewritten in place and
+    needs a private copy per replica.
+    """
+    parts = rel_path.split(os.sep)
+    return "index" in parts[:-1] and "translog" not in parts and "_state" not in parts and parts[-1] != "write.lock"
+
+
+def _reflink(source: str, target: str):
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, target)
+
+
+def clone_index(source_dir: str, target_dir: str) -> CloneStats:
+    """Recreate ``source_dir`` at ``target_dir`` without duplicating the index on disk.
+
+    Files are reflinked where the filesystem supports it (copy-on-write, safe for every file). Otherwise immutable
+    Lucene segments are hard-linked and the remaining, small mutable files are copied. Lock files are skipped.
+    """
+    stats = CloneStats()
+    reflink = True
+
+    for root, dirs, files in os.walk(source_dir):
+        rel_root = os.path.relpath(root, source_dir)
+        os.makedirs(os.path.join(target_dir, rel_root), exist_ok=True)
+        dirs.sort()
+
+        for name in files:
+            source = os.path.join(root, name)
+            target = os.path.join(target_dir, rel_root, name)
+            rel_path = os.path.normpath(os.path.join(rel_root, name))
+
+            if name.endswith(".lock"):
+                stats.skipped += 1
+                continue
+
+            if reflink:
+                try:
+                    _reflink(source, target)
+                    stats.reflinked += 1
+                    continue
+                except OSError as e:
+                    if e.errno not in REFLINK_UNSUPPORTED:
+                        raise
+                    logging.debug(f"Reflinks not supported for {target_dir} ({e}), falling back to hard links")
+                    reflink = False
+                    os.unlink(target)
+
+            if _is_write_once(rel_path):
+                os.link(source, target)
+                stats.hardlinked += 1
+            else:
+                shutil.copy2(source, target)
+                stats.copied += 1
+
+    return stats
+
+
+def stage_replica_index(primary: PhotonInstance, replica: PhotonInstance) -> str:
+    """Clone the primary's index into the replica's temp directory, ready to be swapped in."""
+    staged = os.path.join(replica.data_dir, "temp", "photon_data")
+    if os.path.exists(staged):
+        move_to_trash(staged)
+    os.makedirs(os.path.dirname(staged), exist_ok=True)
+
+    start = time.time()
+    stats = clone_index(primary.photon_data_dir, staged)
+    logging.info(
+        f"Staged index for replica {replica.name} in {time.time() - start:.1f}s "
+        f"({stats.reflinked} reflinked, {stats.hardlinked} hard-linked, {stats.copied} copied)"
+    )
+    return staged
+
+
+def activate_replica_index(staged: str, replica: PhotonInstance) -> bool:
+    return move_index_atomic(staged, replica.photon_data_dir)
@@ -0,0 +1,260 @@
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import cast
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.exceptions import RequestException
+
+from src.instances import PhotonInstance, primaries, replicas_of
+from src.utils import config
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+BBox = tuple[float, float, float, float]
+
+ROUTER_BACKEND_TIMEOUT = 30
+
+
+def _float_param(params: dict[str, list[str]], name: str) -> float | None:
+    try:
+        return float(params[name][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def _parse_bbox(value: str) -> BBox | None:
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(","))
+    except ValueError:
+        return None
+    return (min_lon, min_lat, max_lon, max_lat)
+
+
+def _contains(bbox: BBox, lon: float, lat: float) -> bool:
+    return bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]
+
+
+def _contains_bbox(outer: BBox, inner: BBox) -> bool:
+    return _contains(outer, inner[0], inner[1]) and _contains(outer, inner[2], inner[3])
+
+
+def _intersects(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _area(instance: PhotonInstance) -> float:
+    return sum((b[2] - b[0]) * (b[3] - b[1]) for b in instance.bboxes)
+
+
+def _covers(outer: PhotonInstance, inner: PhotonInstance) -> bool:
+    return all(any(_contains_bbox(o, i) for o in outer.bboxes) for i in inner.bboxes)
+
+
+def _most_specific(candidates: list[PhotonInstance]) -> list[PhotonInstance]:
+    """Pick the smallest region if every other candidate fully covers it, otherwise keep all (ambiguous)."""
+    if len(candidates) <= 1:
+        return candidates
+    smallest = min(candidates, key=_area)
+    if all(_covers(other, smallest) for other in candidates if other is not smallest):
+        return [smallest]
+    return candidates
+
+
+def select_instances(instances: list[PhotonInstance], path: str, params: dict[str, list[str]]) -> list[PhotonInstance]:
+    """Choose the instances that have to answer a request; more than one means fan out and merge."""
+    lat = _float_param(params, "lat")
+    lon = _float_param(params, "lon")
+
+    if path in ("/reverse", "/api", "/api/") and lat is not None and lon is not None:
+        candidates = [i for i in instances if any(_contains(b, lon, lat) for b in i.bboxes)]
+        if candidates:
+            return _most_specific(candidates)
+
+    if path in ("/api", "/api/") and params.get("bbox"):
+        bbox = _parse_bbox(params["bbox"][0])
+        if bbox:
+            covering = [i for i in instances if any(_contains_bbox(b, bbox) for b in i.bboxes)]
+            if covering:
+                return _most_specific(covering)
+            candidates = [i for i in instances if any(_intersects(b, bbox) for b in i.bboxes)]
+            if candidates:
+                return candidates
+
+    return list(instances)
+
+
+def _distance(feature: dict, lon: float, lat: float) -> float:
+    try:
+        f_lon, f_lat = feature["geometry"]["coordinates"][:2]
+    except (KeyError, TypeError, ValueError):
+        return math.inf
+    x = math.radians(f_lon - lon) * math.cos(math.radians((f_lat + lat) / 2))
+    y = math.radians(f_lat - lat)
+    return math.hypot(x, y)
+
+
+def merge_feature_collections(bodies: list[dict], params: dict[str, list[str]], nearest_first: bool) -> dict:
+    """Merge GeoJSON answers of several instances.
+
+    Reverse results are ordered by distance to the query point; search results are interleaved so that every
+    instance's best match comes before anyone's second best. Without an explicit ``limit`` the merged answer is
+    as long as the longest single answer.
+    """
+    feature_lists = [body.get("features", []) for body in bodies]
+    limit = int(_float_param(params, "limit") or max((len(f) for f in feature_lists), default=0))
+
+    lat = _float_param(params, "lat")
+    lon = _float_param(params, "lon")
+    if nearest_first and lat is not None and lon is not None:
+        merged = sorted((f for features in feature_lists for f in features), key=lambda f: _distance(f, lon, lat))
+    else:
+        merged = []
+        for rank in range(max((len(f) for f in feature_lists), default=0)):
+            merged.extend(features[rank] for features in feature_lists if rank < len(features))
+
+    return {"type": "FeatureCollection", "features": merged[:limit]}
+
+
+class RouterServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, instances: list[PhotonInstance]):
+        super().__init__(address, RouterHandler)
+        self.instances = instances
+        self.primaries = primaries(instances)
+        self.groups = {p.name: [p, *replicas_of(instances, p)] for p in self.primaries}
+        self.outstanding = dict.fromkeys((i.name for i in instances), 0)
+        self.served = dict.fromkeys((i.name for i in instances), 0)
+        self._balance_lock = threading.Condition()
+        self.pool = ThreadPoolExecutor(max_workers=max(4, len(instances) * 4), thread_name_prefix="router")
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def acquire(self, primary: PhotonInstance) -> PhotonInstance:
+        """Pick the member of a replica group with the fewest requests in flight, skipping draining ones."""
+        with self._balance_lock:
+            members = [i for i in self.groups[primary.name] if not i.draining] or self.groups[primary.name]
+            chosen = min(members, key=lambda i: (self.outstanding[i.name], self.served[i.name]))
+            self.outstanding[chosen.name] += 1
+            self.served[chosen.name] += 1
+            return chosen
+
+    def release(self, instance: PhotonInstance):
+        with self._balance_lock:
+            self.outstanding[instance.name] -= 1
+            self._balance_lock.notify_all()
+
+    def wait_idle(self, instance: PhotonInstance, timeout: float) -> bool:
+        """Block until no request is in flight on ``instance``; used to drain it before a restart."""
+        with self._balance_lock:
+            return self._balance_lock.wait_for(lambda: self.outstanding[instance.name] == 0, timeout)
+
+    def fetch(self, instance: PhotonInstance, path: str) -> requests.Response:
+        return self.session.get(instance.base_url + path, timeout=ROUTER_BACKEND_TIMEOUT)
+
+    def fetch_balanced(self, primary: PhotonInstance, path: str) -> requests.Response:
+        instance = self.acquire(primary)
+        try:
+            return self.fetch(instance, path)
+        finally:
+            self.release(instance)
+
+
+class RouterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logging.debug(f"Router: {self.address_string()} {format % args}")
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload).encode())
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == "/status":
+            self._status()
+            return
+
+        targets = select_instances(cast(RouterServer, self.server).primaries, url.path, params)
+        if len(targets) == 1:
+            self._proxy(targets[0])
+        else:
+            self._fan_out(targets, url.path, params)
+
+    def _status(self):
+        server = cast(RouterServer, self.server)
+        responses = server.pool.map(lambda i: self._try_fetch(i, "/status", balanced=False), server.instances)
+        states = {
+            instance.name: "Ok" if response is not None and response.status_code == 200 else "Unavailable"
+            for instance, response in zip(server.instances, responses, strict=True)
+        }
+        serviceable = all(any(states[i.name] == "Ok" for i in group) for group in server.groups.values())
+        status = "Ok" if all(state == "Ok" for state in states.values()) else "Degraded"
+        self._send_json(200 if serviceable else 503, {"status": status, "instances": states})
+
+    def _try_fetch(self, instance: PhotonInstance, path: str, balanced: bool = True) -> requests.Response | None:
+        server = cast(RouterServer, self.server)
+        try:
+            if balanced:
+                return server.fetch_balanced(instance, path)
+            return server.fetch(instance, path)
+        except RequestException as e:
+            logging.debug(f"Router: backend {instance.name} failed: {e}")
+            return None
+
+    def _proxy(self, instance: PhotonInstance):
+        response = self._try_fetch(instance, self.path)
+        if response is None:
+            self._send_json(503, {"message": f"Photon instance '{instance.name}' is unavailable"})
+            return
+        self._send(response.status_code, response.content, response.headers.get("Content-Type", "application/json"))
+
+    def _fan_out(self, targets: list[PhotonInstance], path: str, params: dict[str, list[str]]):
+        responses = list(cast(RouterServer, self.server).pool.map(lambda i: self._try_fetch(i, self.path), targets))
+        bodies = []
+        for response in responses:
+            if response is not None and response.status_code == 200:
+                try:
+                    bodies.append(response.json())
+                except ValueError:
+                    continue
+
+        if not bodies:
+            errors = [r for r in responses if r is not None]
+            if errors:
+                self._send(
+                    errors[0].status_code, errors[0].content, errors[0].headers.get("Content-Type", "text/plain")
+                )
+            else:
+                self._send_json(503, {"message": "No Photon instance is available"})
+            return
+
+        self._send_json(200, merge_feature_collections(bodies, params, nearest_first=path == "/reverse"))
+
+
+def start_router(instances: list[PhotonInstance]) -> RouterServer:
+    server = RouterServer((config.PHOTON_LISTEN_IP, config.PHOTON_PORT), instances)
+    thread = threading.Thread(target=server.serve_forever, name="router", daemon=True)
+    thread.start()
+    names = ", ".join(f"{i.name}:{i.port}" for i in instances)
+    logging.info(f"Routing requests on {config.PHOTON_LISTEN_IP}:{config.PHOTON_PORT} to {names}")
+    return server
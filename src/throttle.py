@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+from http.client import HTTPConnection, HTTPException
+
+from src.utils import config, metrics
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+PRIORITIES = {"NORMAL": None, "LOW": (10, "best-effort"), "IDLE": (19, "idle")}
+BACKOFF_FACTOR = 0.5
+RECOVERY_FACTOR = 1.25
+LATENCY_SMOOTHING = 0.5
+
+
+def available_cpus() -> int:
+    """CPUs this process may actually use: affinity mask and cgroup v2 quota, not just the host's core count."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def extraction_threads(serving: bool) -> int:
+    if config.EXTRACT_THREADS > 0:
+        return config.EXTRACT_THREADS
+    cpus = available_cpus()
+    # leave half of the CPUs to Photon while it answers queries
+    return max(1, cpus // 2) if serving else cpus
+
+
+def lower_priority(pid: int, priority: str):
+    """Apply ``EXTRACT_PRIORITY`` (nice value and IO scheduling class) to an extraction process."""
+    setting = PRIORITIES.get(priority)
+    if setting is None:
+        return
+    nice, io_class = setting
+    try:
+        os.setpriority(os.PRIO_PROCESS, pid, nice)
+    except (AttributeError, OSError) as e:
+        logging.debug(f"Could not lower CPU priority of process {pid}: {e}")
+
+    import psutil
+
+    try:
+        if io_class == "idle":
+            psutil.Process(pid).ionice(psutil.IOPRIO_CLASS_IDLE)
+        else:
+            psutil.Process(pid).ionice(psutil.IOPRIO_CLASS_BE, value=7)
+    except (AttributeError, psutil.Error, OSError) as e:
+        logging.debug(f"Could not lower IO priority of process {pid}: {e}")
+
+
+def probe_latency(port: int, timeout: float = 5) -> float | None:
+    """Time one small geocoding query against Photon, in milliseconds; ``None`` if it is not answering."""
+    connection = HTTPConnection("localhost", port, timeout=timeout)
+    start = time.monotonic()
+    try:
+        connection.request("GET", config.THROTTLE_PROBE_PATH)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            return None
+    except (OSError, HTTPException):
+        return None
+    finally:
+        connection.close()
+    return (time.monotonic() - start) * 1000
+
+
+class ExtractionThrottle:
+    """Pace the archive fed into an extraction while Photon serves queries from the same machine.
+
+    A controller thread probes Photon's query latency and the load per available CPU every ``THROTTLE_INTERVAL``
+    seconds. When either crosses its threshold the feed rate is halved, otherwise it recovers by a quarter per
+    interval until the limit is lifted. Pacing happens in the feeding thread only, so it works inside any container
+    without cgroup write access, and the time spent waiting is reported as the price of the throttling.
+    """
+
+    def __init__(self, port: int):
+        self.port = port
+        self.rate: float | None = None
+        self.throttled_seconds = 0.0
+        self.backoffs = 0
+        self.max_latency = 0.0
+        self.latency: float | None = None
+        self._fed = 0
+        self._measured_at = time.monotonic()
+        self._next_chunk = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="extract-throttle", daemon=True)
+
+    @classmethod
+    def for_extraction(cls, serving: bool) -> "ExtractionThrottle | None":
+        if not serving or (config.THROTTLE_LATENCY_MS <= 0 and config.THROTTLE_MAX_LOAD <= 0):
+            return None
+        throttle = cls(config.INSTANCE_PORT)
+        if probe_latency(throttle.port) is None:
+            logging.info("Photon is not answering queries, extracting without throttling")
+            return None
+        return throttle
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=config.THROTTLE_INTERVAL)
+
+    def pace(self, size: int):
+        """Called by the feeding thread after every chunk; sleeps as long as the current rate asks for."""
+        self._fed += size
+        rate = self.rate
+        now = time.monotonic()
+        if rate is None:
+            self._next_chunk = now
+            return
+        self._next_chunk = max(self._next_chunk, now) + size / rate
+        delay = self._next_chunk - now
+        if delay > 0:
+            self.throttled_seconds += delay
+            time.sleep(delay)
+
+    def overloaded(self) -> str | None:
+        latency = probe_latency(self.port)
+        if latency is not None:
+            self.latency = (
+                latency
+                if self.latency is None
+                else (LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency)
+            )
+            self.max_latency = max(self.max_latency, latency)
+            if 0 < config.THROTTLE_LATENCY_MS < self.latency:
+                return f"query latency {self.latency:.0f}ms"
+
+        load = os.getloadavg()[0] / available_cpus()
+        if 0 < config.THROTTLE_MAX_LOAD < load:
+            return f"load {load:.2f} per CPU"
+        return None
+
+    def adjust(self):
+        now = time.monotonic()
+        observed = self._fed / max(now - self._measured_at, 1e-6)
+        self._fed, self._measured_at = 0, now
+
+        reason = self.overloaded()
+        if reason:
+            self.rate = max((self.rate or observed) * BACKOFF_FACTOR, config.THROTTLE_MIN_RATE)
+            self.backoffs += 1
+            logging.info(
+                f"Throttling extraction to {self.rate / 1024**2:.1f} MB/s ({reason})",
+                extra={"rate_key": "extract-throttle"},
+            )
+        elif self.rate is not None:
+            self.rate *= RECOVERY_FACTOR
+            if observed < self.rate * BACKOFF_FACTOR:
+                # the extraction no longer comes close to the limit, so it is not what holds it back
+                self.rate = None
+                logging.info("Extraction no longer throttled")
+
+        metrics.set_gauge("photon_extract_throttle_rate_bytes_per_second", self.rate or 0, "Paced feed rate, 0 if off")
+        metrics.set_gauge("photon_extract_throttled_seconds", self.throttled_seconds, "Time extraction was paced")
+
+    def _run(self):
+        while not self._stop.wait(config.THROTTLE_INTERVAL):
+            try:
+                self.adjust()
+            except Exception as e:
+                logging.warning(f"Extraction throttle check failed: {e}")
+
+    def report(self, duration: float):
+        if not self.backoffs:
+            logging.info("Extraction was not throttled, Photon stayed responsive")
+            return
+        share = self.throttled_seconds / duration * 100 if duration > 0 else 0
+        latency = f", worst probe latency {self.max_latency:.0f}ms" if self.max_latency else ""
+        logging.info(
+            f"Extraction throttled {self.backoffs} time(s): paced for {self.throttled_seconds:.0f}s "
+            f"({share:.0f}% of {duration:.0f}s) to keep Photon responsive{latency}"
+        )
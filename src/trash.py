@@ -0,0 +1,187 @@
+import errno
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils import config
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+TRASH_PREFIX = ".trash-"
+
+_reaper = None
+_reaper_lock = threading.Lock()
+
+
+def _rename_to_trash(path: str, trash_path: str) -> str:
+    os.rename(path, trash_path)
+    logging.info(f"Moved {path} to trash: {trash_path}")
+
+    if _reaper:
+        _reaper.wake()
+    return trash_path
+
+
+def move_to_trash(path: str) -> str | None:
+    """Rename ``path`` to a ``.trash-<ts>`` entry so it can be deleted off the critical path.
+
+    The rename stays on the same filesystem and is therefore instant regardless of the size of the tree. Paths
+    nested deeper inside ``DATA_DIR`` (cache, peer and replica directories) are moved to its top level, where the
+    reaper looks for them. Returns the trash path, or ``None`` if ``path`` did not exist.
+    """
+    if not os.path.lexists(path):
+        return None
+
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    trash_name = f"{TRASH_PREFIX}{time.time_ns()}-{os.path.basename(path)}"
+
+    root = os.path.abspath(config.DATA_DIR)
+    if parent != root and path.startswith(root + os.sep):
+        try:
+            return _rename_to_trash(path, os.path.join(root, trash_name))
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    return _rename_to_trash(path, os.path.join(parent, trash_name))
+
+
+def find_trash(directories: list[str] | None = None) -> list[str]:
+    entries = []
+    for directory in directories or [config.DATA_DIR]:
+        try:
+            with os.scandir(directory) as it:
+                entries.extend(entry.path for entry in it if entry.name.startswith(TRASH_PREFIX))
+        except OSError:
+            continue
+    return sorted(entries)
+
+
+def _lower_priority():
+    """Drop CPU and IO priority of the calling thread so reaping never competes with Photon or an update."""
+    tid = threading.get_native_id()
+    try:
+        os.setpriority(os.PRIO_PROCESS, tid, 19)
+    except (AttributeError, OSError) as e:
+        logging.debug(f"Could not lower CPU priority of trash reaper: {e}")
+
+    import psutil
+
+    try:
+        psutil.Process(tid).ionice(psutil.IOPRIO_CLASS_IDLE)
+    except (AttributeError, psutil.Error, OSError) as e:
+        logging.debug(f"Could not lower IO priority of trash reaper: {e}")
+
+
+def _unlink_files(directory: str) -> list[str]:
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    continue
+    except FileNotFoundError:
+        # another reaper (e.g. the updater reclaiming space) got there first
+        pass
+    return subdirs
+
+
+def reap(path: str, pool: ThreadPoolExecutor) -> int:
+    """Delete a trash entry, unlinking the files of different directories in parallel."""
+    if not os.path.isdir(path) or os.path.islink(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        return 1
+
+    directories = [path]
+    pending = [pool.submit(_unlink_files, path)]
+    while pending:
+        subdirs = pending.pop().result()
+        directories.extend(subdirs)
+        pending.extend(pool.submit(_unlink_files, subdir) for subdir in subdirs)
+
+    for directory in sorted(directories, key=lambda d: d.count(os.sep), reverse=True):
+        try:
+            os.rmdir(directory)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            shutil.rmtree(directory, ignore_errors=True)
+    return len(directories)
+
+
+def reap_all(directories: list[str] | None = None, workers: int | None = None) -> int:
+    entries = find_trash(directories)
+    if not entries:
+        return 0
+
+    with ThreadPoolExecutor(
+        max_workers=workers or config.TRASH_REAPER_WORKERS, thread_name_prefix="trash", initializer=_lower_priority
+    ) as pool:
+        for entry in entries:
+            start = time.time()
+            try:
+                count = reap(entry, pool)
+                logging.info(f"Reaped trash {entry} ({count} directories) in {time.time() - start:.1f}s")
+            except Exception as e:
+                logging.warning(f"Failed to reap trash {entry}: {e}")
+    return len(entries)
+
+
+class TrashReaper:
+    def __init__(self, directories: list[str] | None = None, poll_interval: float = 300):
+        self.directories = directories
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trash-reaper", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        _lower_priority()
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                reap_all(self.directories)
+            except Exception as e:
+                logging.warning(f"Trash reaper error: {e}", extra={"rate_key": "trash-reaper-error"})
+            self._wake.wait(self.poll_interval)
+
+
+def start_reaper(directories: list[str] | None = None) -> TrashReaper:
+    """Start the background reaper once per process; it resumes any trash left over from a previous run."""
+    global _reaper
+    with _reaper_lock:
+        if _reaper is None:
+            _reaper = TrashReaper(directories)
+            _reaper.start()
+        return _reaper
+
+
+def _forget_reaper():
+    # a forked updater inherits the reference but not the thread, so it has to start its own
+    global _reaper, _reaper_lock
+    _reaper = None
+    _reaper_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_reaper)
@@ -1,6 +1,13 @@
 import sys
 
-from src.downloader import parallel_update, sequential_update
+from src.downloader import (
+    download_update,
+    hybrid_update,
+    install_update,
+    parallel_update,
+    prepare_update,
+    sequential_update,
+)
 from src.utils import config
 from src.utils.logger import get_logger, setup_logging
 from src.utils.notify import send_notification
@@ -12,12 +19,29 @@ def main():
     logger.info("Starting update process...")
 
     try:
-        if config.UPDATE_STRATEGY == "PARALLEL":
+        if "prepare" in sys.argv[1:]:
+            logger.info("Staging update for later activation...")
+            prepare_update()
+            logger.info("Update staged successfully")
+            send_notification("Photon Index Update Staged - waiting for activation")
+            return
+
+        if "download" in sys.argv[1:]:
+            if download_update(config.UPDATE_STRATEGY) == "HYBRID":
+                logger.info("Archive ready, Photon has to stop for the extraction")
+                sys.exit(config.ARCHIVE_READY_EXIT_CODE)
+        elif "install" in sys.argv[1:]:
+            logger.info("Installing downloaded update...")
+            install_update()
+        elif config.UPDATE_STRATEGY == "PARALLEL":
             logger.info("Running parallel update...")
             parallel_update()
         elif config.UPDATE_STRATEGY == "SEQUENTIAL":
             logger.info("Running sequential update...")
             sequential_update()
+        elif config.UPDATE_STRATEGY in ("HYBRID", "AUTO"):
+            logger.info(f"Running {config.UPDATE_STRATEGY.lower()} update...")
+            hybrid_update(config.UPDATE_STRATEGY)
         else:
             logger.error(f"Unknown update strategy: {config.UPDATE_STRATEGY}")
             sys.exit(1)
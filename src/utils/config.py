@@ -1,9 +1,24 @@
 import os
 
+# numeric settings that could not be parsed, reported by validate_config instead of failing on import
+INVALID_NUMBERS: dict[str, str] = {}
+
+
+def _number(name: str, default: str, cast=int):
+    value = os.getenv(name, default)
+    try:
+        return cast(value)
+    except ValueError:
+        INVALID_NUMBERS[name] = value
+        return cast(default)
+
+
 # USER CONFIG
 UPDATE_STRATEGY = os.getenv("UPDATE_STRATEGY", "SEQUENTIAL")
 UPDATE_INTERVAL = os.getenv("UPDATE_INTERVAL", "30d")
+UPDATE_WINDOW = os.getenv("UPDATE_WINDOW")
 REGION = os.getenv("REGION")
+REGIONS = [r.strip() for r in os.getenv("REGIONS", "").split(",") if r.strip()]
 FORCE_UPDATE = os.getenv("FORCE_UPDATE", "False").lower() in ("true", "1", "t")
 DOWNLOAD_MAX_RETRIES = os.getenv("DOWNLOAD_MAX_RETRIES", "3")
 FILE_URL = os.getenv("FILE_URL")
@@ -12,23 +27,80 @@ PHOTON_PARAMS = os.getenv("PHOTON_PARAMS")
 ENABLE_METRICS = os.getenv("ENABLE_METRICS", "False").lower() in ("true", "1", "t")
 JAVA_PARAMS = os.getenv("JAVA_PARAMS")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_JSON = os.getenv("LOG_JSON", "False").lower() in ("true", "1", "t")
 BASE_URL = os.getenv("BASE_URL", "https://r2.koalasec.org/public").rstrip("/")
 SKIP_MD5_CHECK = os.getenv("SKIP_MD5_CHECK", "False").lower() in ("true", "1", "t")
 INITIAL_DOWNLOAD = os.getenv("INITIAL_DOWNLOAD", "True").lower() in ("true", "1", "t")
 SKIP_SPACE_CHECK = os.getenv("SKIP_SPACE_CHECK", "False").lower() in ("true", "1", "t")
 APPRISE_URLS = os.getenv("APPRISE_URLS")
 MIN_INDEX_DATE = os.getenv("MIN_INDEX_DATE", "10.02.26")
+DOWNLOAD_PREALLOCATE = os.getenv("DOWNLOAD_PREALLOCATE", "True").lower() in ("true", "1", "t")
 PHOTON_LISTEN_IP = os.getenv("PHOTON_LISTEN_IP", "0.0.0.0")  # noqa: S104
+PHOTON_PORT = _number("PHOTON_PORT", "2322")
+PHOTON_INSTANCE_BASE_PORT = _number("PHOTON_INSTANCE_BASE_PORT", "2340")
+PHOTON_REPLICAS = _number("PHOTON_REPLICAS", "1")
+PEERS = [p.strip().rstrip("/") for p in os.getenv("PEERS", "").split(",") if p.strip()]
+PEER_SERVE = os.getenv("PEER_SERVE", "False").lower() in ("true", "1", "t")
+PEER_PORT = _number("PEER_PORT", "2380")
+BATCH_SERVE = os.getenv("BATCH_SERVE", "False").lower() in ("true", "1", "t")
+BATCH_PORT = _number("BATCH_PORT", "2390")
+BATCH_CONCURRENCY = _number("BATCH_CONCURRENCY", "16")
+ARCHIVE_CACHE_MAX_GB = _number("ARCHIVE_CACHE_MAX_GB", "0", float)
+INDEX_GENERATIONS = _number("INDEX_GENERATIONS", "1")
+UPDATER_MODE = os.getenv("UPDATER_MODE", "SUBPROCESS").upper()
+EXTRACT_THREADS = _number("EXTRACT_THREADS", "0")
+EXTRACT_PRIORITY = os.getenv("EXTRACT_PRIORITY", "LOW").upper()
+THROTTLE_LATENCY_MS = _number("THROTTLE_LATENCY_MS", "500", float)
+THROTTLE_MAX_LOAD = _number("THROTTLE_MAX_LOAD", "1.5", float)
+GC_LOGGING = os.getenv("GC_LOGGING", "False").lower() in ("true", "1", "t")
+JFR_DURATION = _number("JFR_DURATION", "60")
+CDS_ARCHIVE = os.getenv("CDS_ARCHIVE", "True").lower() in ("true", "1", "t")
 
 # APP CONFIG
 INDEX_DB_VERSION = "1.0"
 INDEX_FILE_EXTENSION = "tar.bz2"
 
 PHOTON_DIR = "/photon"
-DATA_DIR = "/photon/data"
+PHOTON_JAR = os.path.join(PHOTON_DIR, "photon.jar")
+# set by the manager when it runs setup/update subprocesses for one of several instances
+DATA_DIR = os.getenv("PHOTON_INSTANCE_DATA_DIR", "/photon/data")
+INSTANCE_PORT = _number("PHOTON_INSTANCE_PORT", str(PHOTON_PORT))
 PHOTON_DATA_DIR = os.path.join(DATA_DIR, "photon_data")
 TEMP_DIR = os.path.join(DATA_DIR, "temp")
+PENDING_INDEX_DIR = os.path.join(DATA_DIR, "pending", "photon_data")
+ACTIVATE_TRIGGER_FILE = os.path.join(DATA_DIR, ".photon-activate")
 OS_NODE_DIR = os.path.join(PHOTON_DATA_DIR, "node_1")
+METRICS_FILE = os.path.join(DATA_DIR, "metrics", "photon-docker.prom")
+JVM_METRICS_FILE = os.path.join(DATA_DIR, "metrics", "photon-jvm.prom")
+LOGS_DIR = os.path.join(DATA_DIR, "logs")
+CDS_DIR = os.path.join(DATA_DIR, "cds")
+PROFILE_TRIGGER_FILE = os.path.join(DATA_DIR, ".photon-profile")
+GC_LOG_FILES = 5
+GC_LOG_FILE_SIZE = "20m"
+PEER_DIR = os.path.join(DATA_DIR, "peer")
+ARCHIVE_CACHE_DIR = os.path.join(DATA_DIR, "cache")
+PEER_CHUNK_SIZE = 64 * 1024 * 1024
+PEER_STREAMS = 2
+BATCH_MAX_QUERIES = 10000
+BATCH_BACKEND_TIMEOUT = 30
+PROGRESS_LOG_INTERVAL = 10
+LOG_RATE_LIMIT_INTERVAL = 60
+TRASH_REAPER_WORKERS = 8
+INDEX_CHECK_WORKERS = 16
+THROTTLE_INTERVAL = 5
+THROTTLE_MIN_RATE = 1024 * 1024
+THROTTLE_PROBE_PATH = "/api?q=berlin&limit=1"
+SPACE_SAMPLE_SIZE = 32 * 1024 * 1024
+SPACE_SAFETY_MARGIN = 0.05
+SPACE_MIN_FREE = 1024 * 1024 * 1024
+REPLICA_DRAIN_TIMEOUT = 30
+INSTANCE_RETRY_INTERVAL = 60
+# `src.updater download` exits with this once a HYBRID archive is ready and Photon has to be stopped for the install
+ARCHIVE_READY_EXIT_CODE = 3
+NOTIFY_QUEUE_SIZE = 100
+NOTIFY_COALESCE_SECONDS = 2
+NOTIFY_FLUSH_TIMEOUT = 30
+NOTIFY_TIMEOUT = 10
 
 if FILE_URL:
     UPDATE_STRATEGY = "DISABLED"
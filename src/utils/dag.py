@@ -0,0 +1,123 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+
+@dataclass
+class Step:
+    name: str
+    func: Callable[[dict[str, Any]], Any]
+    depends_on: tuple[str, ...] = ()
+    started: float = field(default=0.0, init=False)
+    finished: float = field(default=0.0, init=False)
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+def _validate(steps: dict[str, Step]):
+    for step in steps.values():
+        for dep in step.depends_on:
+            if dep not in steps:
+                raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+
+    visiting, done = set(), set()
+
+    def visit(name: str):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle detected at step '{name}'")
+        visiting.add(name)
+        for dep in steps[name].depends_on:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in steps:
+        visit(name)
+
+
+def critical_path(steps: list[Step]) -> list[Step]:
+    """Walk back from the last step to finish, always following the dependency that finished last."""
+    by_name = {step.name: step for step in steps}
+    completed = [step for step in steps if step.finished]
+    if not completed:
+        return []
+
+    path = [max(completed, key=lambda step: step.finished)]
+    while path[-1].depends_on:
+        path.append(max((by_name[dep] for dep in path[-1].depends_on), key=lambda step: step.finished))
+    return list(reversed(path))
+
+
+def run_dag(
+    steps: list[Step], max_workers: int = 4, cancel_event: threading.Event | None = None, label: str = "Pipeline"
+) -> dict[str, Any]:
+    """Run steps on a thread pool as soon as all of their dependencies have completed.
+
+    The first failing step aborts the run: no further steps are started, ``cancel_event`` is set so that
+    long-running steps can stop early, and the original exception is re-raised once running steps return.
+    """
+    by_name = {step.name: step for step in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("Step names must be unique")
+    _validate(by_name)
+
+    cancel_event = cancel_event or threading.Event()
+    results: dict[str, Any] = {}
+    remaining = dict(by_name)
+    running: dict[Future, Step] = {}
+    failure: BaseException | None = None
+    start_time = time.time()
+
+    def execute(step: Step):
+        step.started = time.time()
+        try:
+            return step.func(results)
+        finally:
+            step.finished = time.time()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dag") as pool:
+        while remaining or running:
+            if failure is None:
+                for step in [s for s in remaining.values() if all(dep in results for dep in s.depends_on)]:
+                    logging.debug(f"{label}: starting step '{step.name}'")
+                    running[pool.submit(execute, step)] = remaining.pop(step.name)
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    results[step.name] = future.result()
+                    logging.debug(f"{label}: step '{step.name}' completed in {step.duration:.1f}s")
+                except BaseException as e:
+                    logging.error(f"{label}: step '{step.name}' failed after {step.duration:.1f}s: {e}")
+                    if failure is None:
+                        failure = e
+                        cancel_event.set()
+
+    if failure is not None:
+        raise failure
+
+    _log_critical_path(steps, time.time() - start_time, label)
+    return results
+
+
+def _log_critical_path(steps: list[Step], total: float, label: str):
+    path = critical_path(steps)
+    serial_total = sum(step.duration for step in steps)
+    path_str = " -> ".join(f"{step.name} ({step.duration:.1f}s)" for step in path)
+    logging.info(f"{label} critical path: {path_str}")
+    logging.info(f"{label} finished in {total:.1f}s (serial execution would take {serial_total:.1f}s)")
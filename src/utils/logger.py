@@ -1,14 +1,89 @@
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
+import math
+import queue
 import sys
+import threading
 from pathlib import Path
 
 from src.utils import config
 
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
+_queue_handler: logging.handlers.QueueHandler | None = None
+_listener: logging.handlers.QueueListener | None = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most one record per ``rate_key`` every ``interval`` seconds.
+
+    Hot loops tag their messages with ``extra={"rate_key": ...}`` (optionally ``rate_interval``); untagged records
+    always pass. The next record let through for a key says how many were suppressed in between.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self._last: dict[str, float] = {}
+        self._suppressed: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "rate_key", None)
+        if key is None:
+            return True
+
+        interval = getattr(record, "rate_interval", self.interval)
+        with self._lock:
+            if record.created - self._last.get(key, -math.inf) < interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = record.created
+            suppressed = self._suppressed.pop(key, 0)
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """Queue records with their traceback as text, instead of folded into the message like the stdlib does.
+
+    The formatters on the listener side then still see it apart, so the JSON log keeps its ``exception`` key.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # the traceback's frames stay behind in the producer
+        record.exc_info = None
+        return record
+
 
 def setup_logging() -> None:
+    global _queue_handler
     root_logger = logging.getLogger()
 
     if root_logger.handlers:
@@ -16,12 +91,12 @@ def setup_logging() -> None:
 
     root_logger.setLevel(config.LOG_LEVEL)
 
-    formatter = logging.Formatter(LOG_FORMAT)
+    formatter = JsonFormatter() if config.LOG_JSON else logging.Formatter(LOG_FORMAT)
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(config.LOG_LEVEL)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    handlers: list[logging.Handler] = [console_handler]
 
     try:
         log_dir = Path(config.DATA_DIR) / "logs"
@@ -34,14 +109,44 @@ def setup_logging() -> None:
         )
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except (OSError, PermissionError):
         pass
 
+    # the handlers write from a background thread, so hot loops never wait on stdout or the data volume
+    log_queue = queue.SimpleQueue()
+    _queue_handler = TracebackQueueHandler(log_queue)
+    _queue_handler.addFilter(RateLimitFilter(config.LOG_RATE_LIMIT_INTERVAL))
+    root_logger.addHandler(_queue_handler)
+    _start_listener(log_queue, handlers)
+    atexit.register(shutdown_logging)
+
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("requests").setLevel(logging.WARNING)
 
 
+def _start_listener(log_queue: queue.SimpleQueue, handlers) -> None:
+    global _listener
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def restart_after_fork() -> None:
+    """Give a forked child its own writer thread; the parent's does not exist in the child."""
+    if _queue_handler and _listener:
+        log_queue = queue.SimpleQueue()
+        _queue_handler.queue = log_queue
+        _start_listener(log_queue, _listener.handlers)
+
+
+def shutdown_logging() -> None:
+    """Write out everything still queued and stop the writer thread."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
 def get_logger(name: str = "") -> logging.Logger:
     if name:
         return logging.getLogger(name)
@@ -0,0 +1,26 @@
+import datetime
+import re
+
+WINDOW_PATTERN = re.compile(r"^([01]\d|2[0-3]):([0-5]\d)-([01]\d|2[0-3]):([0-5]\d)$")
+
+
+def parse_window(window: str | None) -> tuple[datetime.time, datetime.time] | None:
+    """Parse ``HH:MM-HH:MM`` (local time). A window may wrap around midnight, e.g. ``23:00-02:00``."""
+    if not window:
+        return None
+    match = WINDOW_PATTERN.match(window.strip())
+    if not match:
+        raise ValueError(f"Invalid maintenance window '{window}', expected HH:MM-HH:MM")
+    start_hour, start_minute, end_hour, end_minute = (int(group) for group in match.groups())
+    return datetime.time(start_hour, start_minute), datetime.time(end_hour, end_minute)
+
+
+def in_window(window: tuple[datetime.time, datetime.time] | None, now: datetime.datetime | None = None) -> bool:
+    """Whether ``now`` falls into ``window``; without a window every moment qualifies."""
+    if window is None:
+        return True
+    current = (now or datetime.datetime.now()).time()
+    start, end = window
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
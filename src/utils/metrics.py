@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+
+from src.utils import config
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+_lock = threading.Lock()
+_gauges: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+_help: dict[str, str] = {}
+_counters: set[str] = set()
+
+
+def set_gauge(name: str, value: float, help_text: str = "", **labels: str):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _gauges[key] = float(value)
+        if help_text:
+            _help[name] = help_text
+
+
+def set_counter(name: str, value: float, help_text: str = "", **labels: str):
+    """Like ``set_gauge`` for a value that only grows, exported with the counter type."""
+    set_gauge(name, value, help_text, **labels)
+    with _lock:
+        _counters.add(name)
+
+
+def get_gauge(name: str, **labels: str) -> float | None:
+    with _lock:
+        return _gauges.get((name, tuple(sorted(labels.items()))))
+
+
+def clear_gauges(prefix: str):
+    with _lock:
+        for key in [key for key in _gauges if key[0].startswith(prefix)]:
+            del _gauges[key]
+
+
+def _reset_after_fork():
+    # forked workers write their own textfile, starting from an empty registry like a fresh process would
+    global _lock
+    _lock = threading.Lock()
+    _gauges.clear()
+    _help.clear()
+    _counters.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def render(prefix: str = "") -> str:
+    with _lock:
+        items = sorted(item for item in _gauges.items() if item[0][0].startswith(prefix))
+        help_texts = dict(_help)
+        counters = set(_counters)
+
+    lines = []
+    seen = set()
+    for (name, labels), value in items:
+        if name not in seen:
+            seen.add(name)
+            if name in help_texts:
+                lines.append(f"# HELP {name} {help_texts[name]}")
+            lines.append(f"# TYPE {name} {'counter' if name in counters else 'gauge'}")
+        label_str = ",".join(f'{key}="{val}"' for key, val in labels)
+        value_str = str(int(value)) if value.is_integer() else repr(value)
+        lines.append(f"{name}{{{label_str}}} {value_str}" if label_str else f"{name} {value_str}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_textfile(path: str | None = None, prefix: str = ""):
+    """Write all gauges (or those starting with ``prefix``) to a Prometheus textfile for other processes."""
+    path = path or config.METRICS_FILE
+    set_gauge("photon_metrics_last_write_timestamp_seconds", time.time(), "Unix time the metrics file was written")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(render(prefix))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.debug(f"Could not write metrics file {path}: {e}")
@@ -1,25 +1,93 @@
 # notification module for apprise notifications
+#
+# Notifications are handed to a background worker so a slow target never holds up a download or an update.
+# Messages arriving close together are sent as one, and anything still queued is delivered before the process exits.
 
-import apprise
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import Counter
 
 from src.utils import config
 from src.utils.logger import get_logger
 
 logging = get_logger()
 
+_queue: queue.Queue[tuple[str, str]] = queue.Queue(maxsize=config.NOTIFY_QUEUE_SIZE)
+_idle = threading.Condition()
+_pending = 0
+_flush_requested = threading.Event()
+_worker: threading.Thread | None = None
+_apprise = None
+
 
 def send_notification(message: str, title: str = "Photon Status"):
-    apprise_urls = config.APPRISE_URLS
-    if not apprise_urls:
+    global _pending
+    if not config.APPRISE_URLS:
         logging.info("No APPRISE_URLS set, skipping notification.")
         return
 
-    apobj = apprise.Apprise()
+    _start_worker()
+    with _idle:
+        try:
+            _queue.put_nowait((title, message))
+        except queue.Full:
+            logging.warning(f"Notification queue is full, dropping notification: {message}")
+            return
+        _pending += 1
+
+
+def flush(timeout: float | None = None) -> bool:
+    """Wait until every queued notification was delivered. Returns ``False`` if ``timeout`` expired first."""
+    timeout = config.NOTIFY_FLUSH_TIMEOUT if timeout is None else timeout
+    _flush_requested.set()
+    try:
+        with _idle:
+            if not _idle.wait_for(lambda: _pending == 0, timeout):
+                logging.warning(f"{_pending} notification(s) not delivered within {timeout}s")
+                return False
+            return True
+    finally:
+        _flush_requested.clear()
+
+
+def coalesce(batch: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Merge a burst of notifications into one message per title, counting repeats instead of resending them."""
+    by_title: dict[str, Counter[str]] = {}
+    for title, message in batch:
+        by_title.setdefault(title, Counter())[message] += 1
+    return [
+        (title, "\n".join(message if count == 1 else f"{message} (x{count})" for message, count in messages.items()))
+        for title, messages in by_title.items()
+    ]
+
+
+def with_timeouts(url: str) -> str:
+    """Bound connect and read time of every target unless the URL already sets its own ``cto``/``rto``."""
+    query = url.partition("?")[2]
+    if any(param.startswith(("cto=", "rto=")) for param in query.split("&")):
+        return url
+    timeouts = f"cto={config.NOTIFY_TIMEOUT}&rto={config.NOTIFY_TIMEOUT}"
+    return f"{url}&{timeouts}" if query else f"{url}?{timeouts}"
+
+
+def _get_apprise():
+    global _apprise
+    if _apprise is None:
+        import apprise
+
+        apobj = apprise.Apprise()
+        for url in (config.APPRISE_URLS or "").split(","):
+            if url.strip():
+                apobj.add(with_timeouts(url.strip()))
+        _apprise = apobj
+    return _apprise
 
-    for url in apprise_urls.split(","):
-        if url.strip():
-            apobj.add(url.strip())
 
+def _deliver(title: str, message: str):
+    apobj = _get_apprise()
     if len(apobj) == 0:
         logging.warning("No valid Apprise URLs were found after processing the APPRISE_URLS variable.")
         return
@@ -28,3 +96,55 @@ def send_notification(message: str, title: str = "Photon Status"):
         logging.error("Failed to send notification to one or more Apprise targets.")
     else:
         logging.info("Successfully sent notification.")
+
+
+def _next_batch() -> list[tuple[str, str]]:
+    batch = [_queue.get()]
+    deadline = time.monotonic() + config.NOTIFY_COALESCE_SECONDS
+    while not _flush_requested.is_set() and (remaining := deadline - time.monotonic()) > 0:
+        try:
+            batch.append(_queue.get(timeout=min(remaining, 0.1)))
+        except queue.Empty:
+            continue
+    while True:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            return batch
+
+
+def _run_worker():
+    global _pending
+    while True:
+        batch = _next_batch()
+        try:
+            for title, message in coalesce(batch):
+                _deliver(title, message)
+        except Exception as e:
+            logging.error(f"Failed to send notification: {e}")
+        finally:
+            with _idle:
+                _pending -= len(batch)
+                _idle.notify_all()
+
+
+def _start_worker():
+    global _worker
+    with _idle:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_worker, name="notify", daemon=True)
+            _worker.start()
+            atexit.register(flush)
+
+
+def _reset_after_fork():
+    global _queue, _idle, _pending, _flush_requested, _worker, _apprise
+    _queue = queue.Queue(maxsize=config.NOTIFY_QUEUE_SIZE)
+    _idle = threading.Condition()
+    _pending = 0
+    _flush_requested = threading.Event()
+    _worker = None
+    _apprise = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -24,6 +24,34 @@ REGION_MAPPING = {
     "argentina": {"type": "sub-region", "continent": "south-america", "available": True},
 }
 
+# Approximate coverage of each extract as (min_lon, min_lat, max_lon, max_lat), used to route queries
+# between several regional instances. Regions crossing the antimeridian are split into two boxes.
+REGION_BBOXES = {
+    "planet": [(-180.0, -90.0, 180.0, 90.0)],
+    "africa": [(-26.0, -47.0, 64.0, 38.0)],
+    "asia": [(25.0, -13.0, 180.0, 82.0)],
+    "australia-oceania": [(110.0, -56.0, 180.0, 20.0), (-180.0, -56.0, -120.0, 20.0)],
+    "europe": [(-32.0, 34.0, 45.0, 82.0)],
+    "north-america": [(-170.0, 5.0, -10.0, 84.0)],
+    "south-america": [(-93.0, -57.0, -32.0, 13.0)],
+    "india": [(68.0, 6.0, 98.0, 36.0)],
+    "japan": [(122.0, 24.0, 154.0, 46.0)],
+    "andorra": [(1.4, 42.4, 1.8, 42.7)],
+    "austria": [(9.5, 46.3, 17.2, 49.1)],
+    "denmark": [(8.0, 54.5, 15.2, 57.8)],
+    "france-monacco": [(-5.2, 41.3, 9.6, 51.1)],
+    "germany": [(5.8, 47.2, 15.1, 55.1)],
+    "luxemburg": [(5.7, 49.4, 6.6, 50.2)],
+    "netherlands": [(3.3, 50.7, 7.3, 53.6)],
+    "russia": [(19.6, 41.1, 180.0, 82.0), (-180.0, 64.0, -168.0, 72.0)],
+    "slovakia": [(16.8, 47.7, 22.6, 49.7)],
+    "spain": [(-18.2, 27.6, 4.4, 43.8)],
+    "canada": [(-141.1, 41.6, -52.6, 83.2)],
+    "mexico": [(-118.5, 14.5, -86.7, 32.8)],
+    "usa": [(-179.3, 18.9, -66.9, 71.4), (172.0, 51.0, 180.0, 53.0)],
+    "argentina": [(-73.6, -55.1, -53.6, -21.8)],
+}
+
 REGION_ALIASES = {
     "in": "india",
     "jp": "japan",
@@ -78,6 +106,11 @@ def is_valid_region(region: str) -> bool:
     return get_region_info(region) is not None
 
 
+def get_region_bboxes(region: str | None) -> list[tuple[float, float, float, float]]:
+    normalized = normalize_region(region) if region else "planet"
+    return REGION_BBOXES.get(normalized, []) if normalized else []
+
+
 def get_index_filename(region_name: str, db_version: str, extension: str) -> str:
     return f"photon-db-{region_name}-{db_version}-latest.{extension}"
 
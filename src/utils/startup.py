@@ -0,0 +1,55 @@
+import os
+import time
+from contextlib import contextmanager
+
+from src.utils import metrics
+from src.utils.logger import get_logger
+
+logging = get_logger()
+
+
+def _env_time(name: str) -> float | None:
+    try:
+        return float(os.environ[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class StartupTimer:
+    """Collect how long each step from container start to a ready Photon took.
+
+    ``entrypoint.sh`` exports the wall-clock timestamps of its own steps, the manager adds its phases on top.
+    """
+
+    def __init__(self):
+        now = time.time()
+        self.phases: list[tuple[str, float]] = []
+        container_start = _env_time("PHOTON_CONTAINER_START")
+        ownership_start = _env_time("PHOTON_OWNERSHIP_START")
+        ownership_done = _env_time("PHOTON_OWNERSHIP_DONE")
+
+        self.origin = container_start or now
+        if container_start and ownership_start and ownership_done:
+            self.phases.append(("entrypoint", ownership_start - container_start))
+            self.phases.append(("ownership", ownership_done - ownership_start))
+            self.phases.append(("manager startup", now - ownership_done))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.time() - start))
+
+    def log(self):
+        total = time.time() - self.origin
+        breakdown = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.phases)
+        logging.info(f"Startup took {total:.1f}s: {breakdown}")
+
+        for name, seconds in self.phases:
+            metrics.set_gauge(
+                "photon_startup_phase_seconds", seconds, "Duration of startup phases", phase=name.replace(" ", "_")
+            )
+        metrics.set_gauge("photon_startup_seconds", total, "Seconds from container start until Photon was ready")
+        metrics.write_textfile()
@@ -0,0 +1,146 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+
+BLOCK_SIZE = 512
+REGULAR_TYPES = (b"0", b"\0", b"7")
+_MAX_META_SIZE = 1024 * 1024
+
+
+@dataclass
+class TarMember:
+    name: str
+    size: int
+    type: bytes
+    offset: int
+
+    @property
+    def is_file(self) -> bool:
+        return self.type in REGULAR_TYPES
+
+
+def _parse_size(field: bytes) -> int:
+    if field[0] & 0x80:
+        # GNU base-256 encoding for members larger than 8 GiB
+        return int.from_bytes(field[1:], "big")
+    digits = field.strip(b"\0 ")
+    return int(digits, 8) if digits else 0
+
+
+def _parse_pax(data: bytes) -> dict[str, str]:
+    records = {}
+    pos = 0
+    while pos < len(data):
+        space = data.find(b" ", pos)
+        if space == -1:
+            break
+        length = int(data[pos:space])
+        if length <= 0:
+            break
+        record = data[space + 1 : pos + length - 1]
+        key, _, value = record.partition(b"=")
+        records[key.decode("utf-8", "replace")] = value.decode("utf-8", "replace")
+        pos += length
+    return records
+
+
+class TarStreamScanner:
+    """Follow a tar stream chunk by chunk and report member headers without buffering member data."""
+
+    def __init__(self, on_member: Callable[[TarMember], None] | None = None):
+        self.on_member = on_member
+        self.offset = 0
+        self.members = 0
+        self.files = 0
+        self.payload_bytes = 0
+        self.current: TarMember | None = None
+        self.finished = False
+
+        self._header = bytearray()
+        self._skip = 0
+        self._zero_blocks = 0
+        self._capture: bytearray | None = None
+        self._capture_size = 0
+        self._capture_type = b""
+        self._long_name: str | None = None
+        self._pax: dict[str, str] = {}
+
+    def feed(self, data: bytes):
+        view = memoryview(data)
+        pos = 0
+        length = len(view)
+
+        while pos < length and not self.finished:
+            if self._skip:
+                take = min(self._skip, length - pos)
+                if self._capture is not None and len(self._capture) < self._capture_size:
+                    self._capture += view[pos : pos + min(take, self._capture_size - len(self._capture))]
+                self._skip -= take
+                pos += take
+                self.offset += take
+                if self._skip == 0 and self._capture is not None:
+                    self._finish_capture()
+                continue
+
+            take = min(BLOCK_SIZE - len(self._header), length - pos)
+            self._header += view[pos : pos + take]
+            pos += take
+            self.offset += take
+            if len(self._header) == BLOCK_SIZE:
+                header = bytes(self._header)
+                self._header.clear()
+                self._parse_header(header)
+
+    def _parse_header(self, header: bytes):
+        if not header.strip(b"\0"):
+            self._zero_blocks += 1
+            if self._zero_blocks >= 2:
+                self.finished = True
+                self.current = None
+            return
+        self._zero_blocks = 0
+
+        size = _parse_size(header[124:136])
+        typeflag = header[156:157]
+        padded = -(-size // BLOCK_SIZE) * BLOCK_SIZE
+
+        if typeflag in (b"L", b"x", b"g"):
+            if size > _MAX_META_SIZE:
+                raise ValueError(f"Tar metadata header too large: {size} bytes")
+            self._capture = bytearray()
+            self._capture_size = size
+            self._capture_type = typeflag
+            self._skip = padded
+            if not padded:
+                self._finish_capture()
+            return
+
+        name = header[0:100].split(b"\0", 1)[0]
+        if header[257:262] == b"ustar":
+            prefix = header[345:500].split(b"\0", 1)[0]
+            if prefix:
+                name = prefix + b"/" + name
+        member_name = self._pax.get("path") or self._long_name or name.decode("utf-8", "replace")
+        if "size" in self._pax:
+            size = int(self._pax["size"])
+            padded = -(-size // BLOCK_SIZE) * BLOCK_SIZE
+        self._long_name = None
+        self._pax = {}
+
+        member = TarMember(name=member_name, size=size, type=typeflag, offset=self.offset - BLOCK_SIZE)
+        self.members += 1
+        if member.is_file:
+            self.files += 1
+            self.payload_bytes += size
+        self.current = member
+        self._skip = padded
+
+        if self.on_member:
+            self.on_member(member)
+
+    def _finish_capture(self):
+        data = bytes(self._capture or b"")
+        self._capture = None
+        if self._capture_type == b"L":
+            self._long_name = data.rstrip(b"\0").decode("utf-8", "replace")
+        elif self._capture_type == b"x":
+            self._pax = _parse_pax(data)
@@ -2,6 +2,7 @@ import re
 
 from src.utils import config
 from src.utils.logger import get_logger
+from src.utils.maintenance import parse_window
 from src.utils.regions import is_valid_region
 
 logging = get_logger()
@@ -9,24 +10,84 @@ logging = get_logger()
 
 def validate_config():
     logging.info("Validating environment variables...")
-    error_messages = []
+    error_messages = [f"Invalid {name}: '{value}'. Must be a number." for name, value in config.INVALID_NUMBERS.items()]
 
-    valid_strategies = ["SEQUENTIAL", "PARALLEL", "DISABLED"]
+    valid_strategies = ["SEQUENTIAL", "PARALLEL", "HYBRID", "AUTO", "DISABLED"]
     if config.UPDATE_STRATEGY not in valid_strategies:
         error_messages.append(
             f"Invalid UPDATE_STRATEGY: '{config.UPDATE_STRATEGY}'. Must be one of {valid_strategies}."
         )
 
+    error_messages.extend(validate_extraction())
+
+    valid_updater_modes = ["SUBPROCESS", "FORK"]
+    if config.UPDATER_MODE not in valid_updater_modes:
+        error_messages.append(f"Invalid UPDATER_MODE: '{config.UPDATER_MODE}'. Must be one of {valid_updater_modes}.")
+
     if not re.match(r"^\d+[dhm]$", config.UPDATE_INTERVAL):
         error_messages.append(
             f"Invalid UPDATE_INTERVAL format: '{config.UPDATE_INTERVAL}'. Expected format like '30d', '12h', or '30m'."
         )
 
+    if (config.UPDATE_WINDOW or "").upper() != "MANUAL":
+        try:
+            parse_window(config.UPDATE_WINDOW)
+        except ValueError as e:
+            error_messages.append(f"Invalid UPDATE_WINDOW: {e}")
+
     if config.REGION and not is_valid_region(config.REGION):
         error_messages.append(f"Invalid REGION: '{config.REGION}'. Must be a valid continent, sub-region, or 'planet'.")
 
+    for region in config.REGIONS:
+        if not is_valid_region(region):
+            error_messages.append(
+                f"Invalid entry in REGIONS: '{region}'. Must be a valid continent, sub-region, or 'planet'."
+            )
+
+    if len(config.REGIONS) > 1 and config.FILE_URL:
+        error_messages.append("FILE_URL cannot be combined with multiple REGIONS.")
+
+    if config.INDEX_GENERATIONS < 1:
+        error_messages.append(f"Invalid INDEX_GENERATIONS: '{config.INDEX_GENERATIONS}'. Must be at least 1.")
+
+    error_messages.extend(validate_serving())
+
     if error_messages:
         full_error_message = "Configuration validation failed:\n" + "\n".join(error_messages)
         raise ValueError(full_error_message)
 
     logging.info("Environment variables are valid.")
+
+
+def validate_extraction() -> list[str]:
+    error_messages = []
+
+    valid_priorities = ["NORMAL", "LOW", "IDLE"]
+    if config.EXTRACT_PRIORITY not in valid_priorities:
+        error_messages.append(
+            f"Invalid EXTRACT_PRIORITY: '{config.EXTRACT_PRIORITY}'. Must be one of {valid_priorities}."
+        )
+
+    if config.EXTRACT_THREADS < 0:
+        error_messages.append(f"Invalid EXTRACT_THREADS: '{config.EXTRACT_THREADS}'. Must be 0 (automatic) or more.")
+
+    return error_messages
+
+
+def validate_serving() -> list[str]:
+    error_messages = []
+
+    if config.PHOTON_REPLICAS < 1:
+        error_messages.append(f"Invalid PHOTON_REPLICAS: '{config.PHOTON_REPLICAS}'. Must be at least 1.")
+
+    for peer in config.PEERS:
+        if not peer.startswith(("http://", "https://")):
+            error_messages.append(f"Invalid entry in PEERS: '{peer}'. Must be a URL like 'http://node-2:2380'.")
+
+    if config.BATCH_CONCURRENCY < 1:
+        error_messages.append(f"Invalid BATCH_CONCURRENCY: '{config.BATCH_CONCURRENCY}'. Must be at least 1.")
+
+    if config.JFR_DURATION < 1:
+        error_messages.append(f"Invalid JFR_DURATION: '{config.JFR_DURATION}'. Must be at least 1 second.")
+
+    return error_messages
@@ -0,0 +1,52 @@
+import importlib
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+
+from src.utils import config, logger
+
+logging = logger.get_logger()
+
+
+def _run_child(module: str, env: dict[str, str], args: tuple[str, ...]):
+    # the manager's handlers would stop Photon from inside the worker
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    os.environ.clear()
+    os.environ.update(env)
+    sys.argv = [module, *args]
+    importlib.reload(config)
+    logger.restart_after_fork()
+
+    try:
+        importlib.import_module(module).main()
+    finally:
+        # multiprocessing leaves the child without running atexit handlers
+        from src.utils.notify import flush
+
+        flush()
+        logger.shutdown_logging()
+
+
+def run_forked(module: str, env: dict[str, str], *args: str) -> int:
+    """Run ``module.main()`` in a fork of the calling process, with ``env`` as its environment.
+
+    The child shares the parent's already imported modules copy-on-write instead of starting a new interpreter.
+    """
+    process = multiprocessing.get_context("fork").Process(target=_run_child, args=(module, env, args), name=module)
+    process.start()
+    process.join()
+    return process.exitcode if process.exitcode is not None else 1
+
+
+def run_module(module: str, env: dict[str, str], *args: str) -> int:
+    """Run a setup or update module for an instance the way ``UPDATER_MODE`` asks for, returning its exit code."""
+    if config.UPDATER_MODE == "FORK":
+        logging.debug(f"Running {module} in a forked worker")
+        return run_forked(module, env, *args)
+
+    result = subprocess.run(["uv", "run", "--no-sync", "-m", module, *args], check=False, cwd="/photon", env=env)  # noqa S603
+    return result.returncode
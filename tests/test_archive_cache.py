@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src import archive_cache
+from src.utils import config
+
+URL = "http://example.com/photon-db-latest.tar.bz2"
+
+
+@pytest.fixture
+def cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "ARCHIVE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(config, "ARCHIVE_CACHE_MAX_GB", 1000 / 1024**3)
+    monkeypatch.setattr(archive_cache, "get_etag", lambda _url: '"v1"')
+    return tmp_path
+
+
+def _archive(directory: Path, name: str, size: int) -> str:
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def _lookup(url: str, md5: str | None = None) -> archive_cache.CacheEntry:
+    entry = archive_cache.lookup(url, md5)
+    assert entry is not None
+    return entry
+
+
+def test_store_and_restore_by_md5(cache: Path):
+    archive = _archive(cache, "photon-db-latest.tar.bz2", 100)
+
+    entry = archive_cache.store(archive, "a" * 32, URL)
+
+    assert entry is not None
+    assert entry.size == 100
+    assert entry.etag == '"v1"'
+    destination = cache / "temp.tar.bz2"
+    archive_cache.restore(_lookup(URL, "a" * 32), str(destination))
+    assert destination.read_bytes() == b"x" * 100
+    assert os.path.samefile(destination, entry.archive)
+    assert archive_cache.lookup(URL, "b" * 32) is None
+
+
+def test_lookup_by_etag_without_md5(cache: Path, monkeypatch: pytest.MonkeyPatch):
+    archive_cache.store(_archive(cache, "a.tar.bz2", 100), "a" * 32, URL)
+
+    assert _lookup(URL).md5 == "a" * 32
+    assert archive_cache.lookup("http://example.com/other.tar.bz2") is None
+    monkeypatch.setattr(archive_cache, "get_etag", lambda _url: '"v2"')
+    assert archive_cache.lookup(URL) is None
+
+
+def test_store_evicts_least_recently_used(cache: Path):
+    for i, md5 in enumerate(("a" * 32, "b" * 32, "c" * 32)):
+        archive_cache.store(_archive(cache, f"{i}.tar.bz2", 400), md5, URL)
+        entry = _lookup(URL, md5)
+        os.utime(os.path.join(entry.path, archive_cache.META_FILE), (i, i))
+        if md5 == "b" * 32:
+            archive_cache.touch(_lookup(URL, "a" * 32))
+
+    assert [e.md5 for e in archive_cache.entries()] == ["c" * 32, "a" * 32]
+    assert not os.path.exists(cache / "cache" / ("b" * 32))
+
+
+def test_store_skips_archives_larger_than_cache(cache: Path):
+    assert archive_cache.store(_archive(cache, "big.tar.bz2", 2000), "a" * 32, URL) is None
+    assert archive_cache.entries() == []
+
+
+def test_store_existing_entry_only_refreshes_it(cache: Path):
+    first = archive_cache.store(_archive(cache, "a.tar.bz2", 100), "a" * 32, URL)
+    second = archive_cache.store(_archive(cache, "b.tar.bz2", 200), "a" * 32, URL)
+    assert first is not None
+    assert second is not None
+    assert second.archive == first.archive
+    assert second.size == 100
@@ -0,0 +1,122 @@
+import json
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+
+import pytest
+import requests
+
+from src.batch import BatchError, BatchServer, normalize_query, parse_batch
+
+
+class PhotonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    paths: ClassVar[list[str]] = []
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        status = 400 if "q=bad" in self.path else 200
+        data = json.dumps({"path": self.path}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def batch_url():
+    PhotonHandler.paths = []
+    photon = ThreadingHTTPServer(("127.0.0.1", 0), PhotonHandler)
+    server = BatchServer(("127.0.0.1", 0), f"http://127.0.0.1:{photon.server_address[1]}")
+    for s in (photon, server):
+        threading.Thread(target=s.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/batch"
+    for s in (server, photon):
+        s.shutdown()
+        s.server_close()
+    server.pool.shutdown()
+
+
+@pytest.mark.parametrize(
+    ("item", "expected"),
+    [
+        ("/api?q=berlin&limit=1", "/api?limit=1&q=berlin"),
+        ("/api/?limit=1&q=berlin", "/api?limit=1&q=berlin"),
+        ({"path": "/reverse", "lon": 13.4, "lat": 52.5}, "/reverse?lat=52.5&lon=13.4"),
+        (
+            {"path": "/api", "q": "x", "layer": ["city", "state"], "debug": True},
+            "/api?debug=true&layer=city&layer=state&q=x",
+        ),
+        ("/reverse", "/reverse"),
+    ],
+)
+def test_normalize_query(item, expected):
+    assert normalize_query(item) == expected
+
+
+@pytest.mark.parametrize("item", ["/status", "/peer/abc?q=x", {"q": "berlin"}, 42])
+def test_normalize_query_rejects_other_requests(item):
+    with pytest.raises(BatchError):
+        normalize_query(item)
+
+
+def test_parse_batch_accepts_json_array_and_ndjson():
+    assert parse_batch(b'["/api?q=a", {"path": "/reverse"}]') == ["/api?q=a", {"path": "/reverse"}]
+    assert parse_batch(b'"/api?q=a"\n\n{"path": "/reverse"}\n') == ["/api?q=a", {"path": "/reverse"}]
+    # an NDJSON line may itself be an array only when the client says it is NDJSON
+    assert parse_batch(b'["/api?q=a"]', "application/x-ndjson") == [["/api?q=a"]]
+
+
+@pytest.mark.parametrize("body", [b"", b"[1,", b'{"path": "/api"}x'])
+def test_parse_batch_rejects_invalid_bodies(body):
+    with pytest.raises(BatchError):
+        parse_batch(body)
+
+
+def test_parse_batch_limits_batch_size(monkeypatch):
+    monkeypatch.setattr("src.utils.config.BATCH_MAX_QUERIES", 2)
+    with pytest.raises(BatchError, match="exceeds"):
+        parse_batch(b'["/api?q=a", "/api?q=b", "/api?q=c"]')
+
+
+def test_dispatch_deduplicates_identical_queries(monkeypatch):
+    server = BatchServer(("127.0.0.1", 0), "http://unused")
+    fetched = []
+    monkeypatch.setattr(server, "fetch", lambda path: fetched.append(path) or (200, path))
+    try:
+        results = server.dispatch(["/api?q=a&limit=1", {"path": "/api", "limit": 1, "q": "a"}, "/status"])
+        assert results[0] is results[1]
+        assert isinstance(results[0], Future)
+        assert not isinstance(results[2], Future)
+        assert results[2][0] == 400
+        results[0].result()
+        assert fetched == ["/api?limit=1&q=a"]
+    finally:
+        server.server_close()
+        server.pool.shutdown()
+
+
+def test_batch_streams_results_in_request_order(batch_url):
+    body = "\n".join(json.dumps(q) for q in ["/api?q=a", "/reverse?lat=1&lon=2", "/status", "/api?q=bad", "/api?q=a"])
+    response = requests.post(batch_url, data=body, stream=True, timeout=5)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+    assert [line["status"] for line in lines] == [200, 200, 400, 400, 200]
+    assert lines[0]["result"] == lines[4]["result"] == {"path": "/api?q=a"}
+    assert "unsupported path" in lines[2]["error"]["message"]
+    assert lines[3]["error"] == {"path": "/api?q=bad"}
+    assert sorted(PhotonHandler.paths) == ["/api?q=a", "/api?q=bad", "/reverse?lat=1&lon=2"]
+
+
+def test_batch_rejects_invalid_requests(batch_url):
+    assert requests.post(batch_url, data="[1,", timeout=5).status_code == 400
+    assert requests.post(batch_url.replace("/batch", "/other"), data="[]", timeout=5).status_code == 404
+    assert PhotonHandler.paths == []
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from src.bench import Connection, LoadGenerator, load_corpus, percentile
+
+RESPONSES = {
+    "/api?q=length": b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}",
+    "/api?q=chunked": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n2\r\n{}\r\n0\r\n\r\n",
+    "/reverse?q=close": b"HTTP/1.1 503 Unavailable\r\nConnection: close\r\nContent-Length: 0\r\n\r\n",
+}
+
+
+async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    while request := await reader.readline():
+        path = request.split()[1].decode()
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        writer.write(RESPONSES[path])
+        await writer.drain()
+        if b"close" in RESPONSES[path]:
+            break
+    writer.close()
+
+
+async def with_server(test):
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        return await test(port)
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3
+    assert percentile([], 50) == 0
+
+
+def test_corpus_skips_comments_and_blank_lines(tmp_path):
+    corpus = tmp_path / "queries.txt"
+    corpus.write_text("# cities\n/api?q=berlin\n\n/reverse?lon=1&lat=2\n")
+    assert load_corpus(str(corpus)) == ["/api?q=berlin", "/reverse?lon=1&lat=2"]
+
+    corpus.write_text("# nothing\n")
+    with pytest.raises(ValueError, match="No queries"):
+        load_corpus(str(corpus))
+
+
+def test_connection_is_reused_until_the_server_closes_it():
+    async def test(port):
+        connection = Connection("127.0.0.1", port)
+        assert await connection.request("/api?q=length") == 200
+        writer = connection.writer
+        assert await connection.request("/api?q=chunked") == 200
+        assert connection.writer is writer
+        assert await connection.request("/reverse?q=close") == 503
+        assert connection.writer is None
+        assert await connection.request("/api?q=length") == 200
+        await connection.close()
+
+    asyncio.run(with_server(test))
+
+
+def test_load_generator_counts_successes_and_errors(capsys):
+    async def test(port):
+        corpus = ["/api?q=length", "/api?q=chunked", "/reverse?q=close"]
+        generator = LoadGenerator(f"http://127.0.0.1:{port}", corpus, connections=2, timeout=5, interval=0.1)
+        return await generator.run(0.3, rate=None, concurrency=2)
+
+    results = asyncio.run(with_server(test))
+    summary = results["summary"]
+    assert summary["requests"] > 0
+    assert summary["by_endpoint"]["/reverse"] == pytest.approx(summary["requests"] / 2, rel=0.2, abs=2)
+    assert results["intervals"]
+    assert "req/s" in capsys.readouterr().out
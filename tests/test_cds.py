@@ -0,0 +1,51 @@
+import pytest
+
+from src import cds
+from src.cds import class_data_options, record_startup
+from src.utils import config
+
+
+@pytest.fixture
+def jar(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "CDS_ARCHIVE", True)
+    monkeypatch.setattr(config, "CDS_DIR", str(tmp_path / "cds"))
+    monkeypatch.setattr(config, "PHOTON_JAR", str(tmp_path / "photon.jar"))
+    path = tmp_path / "photon.jar"
+    path.write_bytes(b"1.0")
+    return path
+
+
+def test_maintaining_instance_creates_the_archive(jar):
+    options, exists = class_data_options("-Xmx4g", maintain=True)
+    assert not exists
+    assert options == ["-XX:+AutoCreateSharedArchive", f"-XX:SharedArchiveFile={cds.archive_path()}"]
+
+    assert class_data_options("", maintain=False) == ([], False)
+    open(cds.archive_path(), "w").close()
+    assert class_data_options("", maintain=False) == ([f"-XX:SharedArchiveFile={cds.archive_path()}"], True)
+
+
+def test_new_jar_gets_a_new_archive_and_the_old_one_is_removed(jar):
+    class_data_options("", maintain=True)
+    old_archive = cds.archive_path()
+    open(old_archive, "w").close()
+
+    jar.write_bytes(b"2.0 with a different size")
+    options, exists = class_data_options("", maintain=True)
+    assert not exists
+    assert old_archive not in options[1]
+    assert not (jar.parent / "cds" / old_archive).exists()
+
+
+def test_disabled_or_configured_by_the_user(jar, monkeypatch: pytest.MonkeyPatch):
+    assert class_data_options("-XX:SharedArchiveFile=/custom.jsa", maintain=True) == ([], False)
+    monkeypatch.setattr(config, "CDS_ARCHIVE", False)
+    assert class_data_options("", maintain=True) == ([], False)
+
+
+def test_startup_is_compared_with_the_other_mode(jar, caplog):
+    caplog.set_level("INFO")
+    class_data_options("", maintain=True)
+    record_startup(40.0, with_archive=False)
+    record_startup(25.0, with_archive=True)
+    assert "Photon ready in 25.0s with class data archive, 40.0s without it last time" in caplog.text
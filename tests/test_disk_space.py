@@ -0,0 +1,119 @@
+import pytest
+
+from src import disk_space
+from src.disk_space import ArchiveSample, InsufficientSpaceError
+from src.utils import config
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "TEMP_DIR", str(tmp_path / "temp"))
+    monkeypatch.setattr(config, "PHOTON_DATA_DIR", str(tmp_path / "photon_data"))
+    return tmp_path
+
+
+def test_estimate_uses_sampled_ratio_and_file_density(data_dir, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(disk_space, "sample_archive", lambda _url: ArchiveSample(1000, 2500, 10))
+
+    estimate = disk_space.estimate_extracted_size(1_000_000, "http://example.com/index.tar.bz2")
+
+    assert estimate.extracted_size == 2_500_000
+    assert estimate.file_count == 10_000
+    assert "sampled" in estimate.source
+
+
+def test_estimate_falls_back_to_current_index_size(data_dir, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(disk_space, "sample_archive", lambda _url: None)
+    node_dir = data_dir / "photon_data" / "node_1"
+    node_dir.mkdir(parents=True)
+    (node_dir / "segment.cfs").write_bytes(b"x" * 8192)
+
+    estimate = disk_space.estimate_extracted_size(1_000_000, "http://example.com/index.tar.bz2")
+
+    assert estimate.extracted_size >= 8192
+    assert estimate.file_count == 1
+    assert estimate.source == "size of the current index"
+
+
+def test_estimate_falls_back_to_fixed_ratio_without_any_metadata(data_dir):
+    estimate = disk_space.estimate_extracted_size(1_000_000)
+
+    assert estimate.extracted_size == int(1_000_000 * disk_space.FALLBACK_EXTRACTION_RATIO)
+
+
+@pytest.mark.parametrize(("available", "sufficient"), [(3_000_000, True), (2_700_000, False)])
+def test_plan_update_adds_archive_extracted_index_and_margin(
+    data_dir, monkeypatch: pytest.MonkeyPatch, available: int, sufficient: bool
+):
+    monkeypatch.setattr(disk_space, "get_available_space", lambda _path: available)
+
+    plan = disk_space.plan_update(1_000_000)
+
+    assert len(plan.requirements) == 1
+    assert plan.requirements[0].needed == 1_000_000 + 1_630_000 + int(2_630_000 * config.SPACE_SAFETY_MARGIN)
+    assert plan.sufficient is sufficient
+
+
+@pytest.mark.parametrize(
+    ("archive_bytes", "written_bytes", "available", "raises"),
+    [(50, 100, 2000, False), (50, 100, 90, True), (0, 0, 10**12, False), (50, 100, 10, True)],
+)
+def test_check_extraction_space_projects_remaining_output(
+    tmp_path, monkeypatch: pytest.MonkeyPatch, archive_bytes: int, written_bytes: int, available: int, raises: bool
+):
+    monkeypatch.setattr(config, "SPACE_MIN_FREE", 50)
+    monkeypatch.setattr(disk_space, "get_available_space", lambda _path: available)
+
+    if raises:
+        with pytest.raises(InsufficientSpaceError):
+            disk_space.check_extraction_space(str(tmp_path), archive_bytes, 100, written_bytes)
+    else:
+        disk_space.check_extraction_space(str(tmp_path), archive_bytes, 100, written_bytes)
+
+
+@pytest.mark.parametrize(
+    ("strategy", "available", "selected"),
+    [
+        ("AUTO", 3_000_000, "PARALLEL"),
+        ("AUTO", 1_500_000, "HYBRID"),
+        ("AUTO", 900_000, None),
+        ("PARALLEL", 1_500_000, None),
+        ("HYBRID", 1_500_000, "HYBRID"),
+    ],
+)
+def test_check_disk_space_picks_strategy_that_fits(
+    data_dir, monkeypatch: pytest.MonkeyPatch, strategy: str, available: int, selected: str | None
+):
+    monkeypatch.setattr(disk_space, "get_available_space", lambda _path: available)
+    monkeypatch.setattr(disk_space, "reclaimable_index_size", lambda: 1_500_000)
+
+    assert disk_space.check_disk_space_requirements(1_000_000, strategy=strategy) == selected
+
+
+def test_reclaimable_index_size_skips_files_shared_with_replicas(data_dir):
+    index = data_dir / "photon_data"
+    index.mkdir()
+    (index / "own.cfs").write_bytes(b"x" * 8192)
+    (index / "shared.cfs").write_bytes(b"x" * 8192)
+    (data_dir / "replica.cfs").hardlink_to(index / "shared.cfs")
+
+    total, files = disk_space.directory_size(str(index))
+    assert files == 2
+    assert disk_space.reclaimable_index_size() == total // 2
+
+
+@pytest.mark.parametrize("strategy", ["PARALLEL", "HYBRID"])
+def test_plan_update_does_not_charge_a_resumed_download_twice(data_dir, monkeypatch: pytest.MonkeyPatch, strategy):
+    monkeypatch.setattr(disk_space, "get_available_space", lambda _path: 10**12)
+    monkeypatch.setattr(disk_space, "reclaimable_index_size", lambda: 1_500_000)
+    full = disk_space.plan_update(1_000_000, strategy=strategy)
+
+    (data_dir / "temp").mkdir()
+    (data_dir / "temp" / "photon-db-latest.tar.bz2").write_bytes(b"x" * 400_000)
+    downloaded = disk_space.downloaded_archive_size(1_000_000)
+    resumed = disk_space.plan_update(1_000_000, strategy=strategy)
+
+    assert 400_000 <= downloaded <= 1_000_000
+    for before, after in zip(full.requirements, resumed.requirements, strict=True):
+        assert after.needed == before.needed - downloaded
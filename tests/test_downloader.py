@@ -0,0 +1,121 @@
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+from src import downloader
+from src.manifest import IndexManifest
+from src.utils import config
+
+ARCHIVE = os.urandom(10_000)
+MD5 = hashlib.md5(ARCHIVE).hexdigest()  # noqa: S324
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """Run the update DAG with every IO step replaced, recording the order in which the steps touch the archive."""
+    monkeypatch.setattr(config, "TEMP_DIR", str(tmp_path / "temp"))
+    monkeypatch.setattr(config, "PEER_DIR", str(tmp_path / "peer"))
+    monkeypatch.setattr(config, "ARCHIVE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(config, "ARCHIVE_CACHE_MAX_GB", 0)
+    monkeypatch.setattr(config, "PEER_SERVE", True)
+    monkeypatch.setattr(config, "SKIP_MD5_CHECK", False)
+    monkeypatch.setattr(config, "FILE_URL", "https://example.com/photon-db-latest.tar.bz2")
+    events = []
+
+    def download_index(cancel_event=None):
+        os.makedirs(config.TEMP_DIR, exist_ok=True)
+        path = downloader.archive_path()
+        with open(path, "wb") as f:
+            f.write(ARCHIVE)
+        return path
+
+    def extract_index(path, cancel_event=None, hasher=None, serving=False):
+        assert hasher is not None
+        with open(path, "rb") as f:
+            hasher.update(f.read())
+        return {}
+
+    def check_index(*_args):
+        # integrity checks are slow, anything that only waits for the checksum would overtake them
+        time.sleep(0.2)
+        events.append("check")
+
+    def move_index(manifest):
+        events.append(("move", manifest))
+
+    monkeypatch.setattr(downloader, "prepare_temp_dir", lambda: os.makedirs(config.TEMP_DIR, exist_ok=True))
+    monkeypatch.setattr(downloader, "cleanup_staging_and_temp_backup", lambda *_args: None)
+    monkeypatch.setattr(downloader, "ensure_disk_space", lambda strategy: strategy)
+    monkeypatch.setattr(downloader, "download_index", download_index)
+    monkeypatch.setattr(downloader, "download_md5", lambda cancel_event=None: None)
+    monkeypatch.setattr(downloader, "get_remote_identity", lambda _url: IndexManifest(size=len(ARCHIVE)))
+    monkeypatch.setattr(downloader, "extract_index", extract_index)
+    monkeypatch.setattr(downloader, "check_index", check_index)
+    monkeypatch.setattr(downloader, "verify_checksum", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(downloader, "move_index", move_index)
+    monkeypatch.setattr(downloader, "clear_temp_dir", lambda: events.append("clear"))
+    return events
+
+
+def test_parallel_update_publishes_archive_for_peers(pipeline):
+    downloader.run_update_pipeline("PARALLEL")
+
+    assert pipeline[0] == "check"
+    move, manifest = pipeline[1]
+    assert move == "move"
+    assert manifest.size == len(ARCHIVE)
+    assert manifest.md5 == MD5
+    assert pipeline[2] == "clear"
+    with open(os.path.join(config.PEER_DIR, MD5, "photon-db-latest.tar.bz2"), "rb") as f:
+        assert f.read() == ARCHIVE
+
+
+def test_index_manifest_uses_the_recorded_archive_size():
+    # the archive may already be retained elsewhere, so the manifest must not look at it again
+    results = {"remote_identity": IndexManifest(url="u", size=5), "archive_size": 5, "download_index": "/missing"}
+    hasher = hashlib.md5(b"x")  # noqa: S324
+    manifest = downloader.index_manifest(results, hasher)
+    assert (manifest.url, manifest.size, manifest.md5) == ("u", 5, hasher.hexdigest())
+
+    results["archive_size"] = 6
+    assert downloader.index_manifest(results, None) == IndexManifest(url="u", size=6)
+
+
+def _ancestors(steps: dict, name: str) -> set[str]:
+    found = set()
+    pending = list(steps[name].depends_on)
+    while pending:
+        dep = pending.pop()
+        if dep not in found:
+            found.add(dep)
+            pending.extend(steps[dep].depends_on)
+    return found
+
+
+@pytest.mark.parametrize(("peer_serve", "cache_gb"), [(True, 0), (False, 1), (True, 1)])
+@pytest.mark.parametrize("stage_only", [False, True])
+@pytest.mark.parametrize("strategy", ["PARALLEL", "HYBRID"])
+def test_archive_is_retained_after_every_step_that_reads_it(monkeypatch, peer_serve, cache_gb, stage_only, strategy):
+    monkeypatch.setattr(config, "PEER_SERVE", peer_serve)
+    monkeypatch.setattr(config, "ARCHIVE_CACHE_MAX_GB", cache_gb)
+    monkeypatch.setattr(config, "SKIP_MD5_CHECK", False)
+    steps = {step.name: step for step in downloader.build_update_steps(strategy, threading.Event(), stage_only)}
+
+    move_step = "stage_index" if stage_only else "move_index"
+    assert steps["retain_archive"].depends_on == (move_step,)
+    readers = {"archive_size", "extract_index", "verify_checksum", "check_index", move_step}
+    if strategy == "HYBRID" and not stage_only:
+        readers.add("verify_archive")
+    assert readers <= _ancestors(steps, "retain_archive")
+    assert {move_step, "retain_archive"} <= set(steps["clear_temp_dir"].depends_on)
+
+
+def test_archive_is_not_retained_without_peers_or_cache(monkeypatch):
+    monkeypatch.setattr(config, "PEER_SERVE", False)
+    monkeypatch.setattr(config, "ARCHIVE_CACHE_MAX_GB", 0)
+    steps = {step.name: step for step in downloader.build_update_steps("PARALLEL", threading.Event())}
+    assert "retain_archive" not in steps
+    assert steps["clear_temp_dir"].depends_on == ("move_index",)
@@ -0,0 +1,74 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+from src import filesystem
+from src.filesystem import ExtractionProgress, resume_extraction, save_extract_state
+from src.utils import config
+
+FILES = {"photon_data/node_1/a.cfs": b"a" * 1000, "photon_data/node_1/b.cfs": b"b" * 700, "photon_data/c.json": b"{}"}
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch: pytest.MonkeyPatch) -> str:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "TEMP_DIR", str(tmp_path / "temp"))
+    monkeypatch.setattr(filesystem, "move_to_trash", lambda path: os.rename(path, tmp_path / "trashed"))
+    (tmp_path / "temp").mkdir()
+    path = tmp_path / "temp" / "photon-db-latest.tar"
+    path.write_bytes(make_tar(FILES))
+    return str(path)
+
+
+def make_tar(files: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def extracted(tmp_path, files: dict[str, bytes]):
+    for name, data in files.items():
+        path = tmp_path / "temp" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+def checkpoint(archive: str) -> ExtractionProgress:
+    progress = ExtractionProgress(os.path.getsize(archive))
+    with open(archive, "rb") as f:
+        progress.scanner.feed(f.read())
+    save_extract_state(archive, progress)
+    return progress
+
+
+def test_member_counts_as_completed_once_the_next_one_starts(archive):
+    progress = checkpoint(archive)
+    # the last member may still be in tar's pipe, so it is extracted again when resuming
+    assert progress.completed == [("photon_data/node_1/a.cfs", 1000), ("photon_data/node_1/b.cfs", 700)]
+
+
+def test_resume_keeps_verified_files_only(archive, tmp_path):
+    checkpoint(archive)
+    extracted(tmp_path, {"photon_data/node_1/a.cfs": b"a" * 1000, "photon_data/node_1/b.cfs": b"b" * 300})
+    extracted(tmp_path, {"photon_data/c.json": b"{"})
+
+    assert resume_extraction(archive) == 1
+    assert (tmp_path / "temp" / "photon_data" / "node_1" / "a.cfs").exists()
+    assert not (tmp_path / "temp" / "photon_data" / "node_1" / "b.cfs").exists()
+    assert not (tmp_path / "temp" / "photon_data" / "c.json").exists()
+
+
+def test_checkpoint_of_another_archive_starts_from_scratch(archive, tmp_path):
+    checkpoint(archive)
+    extracted(tmp_path, FILES)
+    os.utime(archive, ns=(0, 0))
+
+    assert resume_extraction(archive) == 0
+    assert not (tmp_path / "temp" / "photon_data").exists()
+    assert not os.path.exists(filesystem.get_extract_state_file(archive))
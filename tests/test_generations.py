@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from src import check_remote, generations
+from src.filesystem import move_index_atomic, retire_old_generations
+from src.manifest import IndexManifest, write_manifest
+from src.utils import config
+
+URL = "https://example.com/photon-db-planet-1.0-latest.tar.bz2"
+
+
+@pytest.fixture(autouse=True)
+def trash_in_place(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "trash").mkdir()
+    monkeypatch.setattr(
+        generations, "move_to_trash", lambda path: os.rename(path, tmp_path / "trash" / os.path.basename(path))
+    )
+
+
+def marker(generation: generations.Generation) -> str:
+    with open(os.path.join(generation.path, "marker")) as f:
+        return f.read()
+
+
+def make_index(path, name: str, md5: str | None = None):
+    path.mkdir(parents=True)
+    (path / "marker").write_text(name)
+    if md5:
+        write_manifest(str(path), IndexManifest(URL, md5=md5))
+    return str(path)
+
+
+def install(tmp_path, name: str, md5: str | None = None) -> str:
+    index_dir = str(tmp_path / "photon_data")
+    move_index_atomic(make_index(tmp_path / "temp" / name, name, md5), index_dir)
+    return index_dir
+
+
+def test_move_index_installs_a_generation_behind_a_relative_symlink(tmp_path):
+    index_dir = install(tmp_path, "first")
+
+    assert os.path.islink(index_dir)
+    assert not os.path.isabs(os.readlink(index_dir))
+    assert (tmp_path / "photon_data" / "marker").read_text() == "first"
+    assert [generation.name for generation in generations.list_generations(index_dir)] == [
+        generations.active_generation(index_dir)
+    ]
+
+
+def test_plain_index_is_adopted_as_oldest_generation(tmp_path):
+    make_index(tmp_path / "photon_data", "legacy")
+    index_dir = install(tmp_path, "new")
+
+    installed = generations.list_generations(index_dir)
+    assert [generation.active for generation in installed] == [True, False]
+    assert marker(installed[1]) == "legacy"
+
+
+def test_retire_keeps_active_and_newest_others(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "INDEX_GENERATIONS", 2)
+    for name in ("one", "two", "three"):
+        index_dir = install(tmp_path, name)
+
+    assert retire_old_generations(index_dir)
+
+    kept = generations.list_generations(index_dir)
+    assert [marker(generation) for generation in kept] == ["three", "two"]
+
+
+def test_rollback_to_previous_and_named_generation(tmp_path):
+    for name in ("one", "two", "three"):
+        index_dir = install(tmp_path, name)
+    oldest = generations.list_generations(index_dir)[-1].name
+
+    assert (tmp_path / "photon_data" / "marker").read_text() == "three"
+    generations.rollback(index_dir)
+    assert (tmp_path / "photon_data" / "marker").read_text() == "two"
+    generations.rollback(index_dir, oldest)
+    assert (tmp_path / "photon_data" / "marker").read_text() == "one"
+
+    with pytest.raises(ValueError, match="No generation"):
+        generations.rollback(index_dir)
+    with pytest.raises(ValueError, match="No generation"):
+        generations.rollback(index_dir, "gen-missing")
+
+
+def test_rolled_back_index_is_not_reinstalled(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    install(tmp_path, "good", md5="1")
+    index_dir = install(tmp_path, "bad", md5="2")
+    generations.rollback(index_dir)
+
+    monkeypatch.setattr(check_remote, "get_remote_identity", lambda url, md5_url=None: IndexManifest(URL, md5="2"))
+    assert not check_remote.update_available(data_dir=str(tmp_path))
+
+    monkeypatch.setattr(check_remote, "get_remote_identity", lambda url, md5_url=None: IndexManifest(URL, md5="3"))
+    assert check_remote.update_available(data_dir=str(tmp_path))
+
+
+def test_retire_keeps_only_the_active_generation_by_default(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "INDEX_GENERATIONS", 1)
+    for name in ("one", "two"):
+        index_dir = install(tmp_path, name)
+
+    assert retire_old_generations(index_dir)
+
+    assert [marker(generation) for generation in generations.list_generations(index_dir)] == ["two"]
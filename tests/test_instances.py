@@ -0,0 +1,61 @@
+import pytest
+
+from src import instances
+from src.utils import config
+
+
+@pytest.fixture
+def setup_config(monkeypatch):
+    def _setup(regions: list[str], replicas: int = 1):
+        monkeypatch.setattr(config, "REGIONS", regions)
+        monkeypatch.setattr(config, "REGION", None)
+        monkeypatch.setattr(config, "PHOTON_REPLICAS", replicas)
+        monkeypatch.setattr(config, "DATA_DIR", "/photon/data")
+        monkeypatch.setattr(config, "PHOTON_PORT", 2322)
+        monkeypatch.setattr(config, "PHOTON_INSTANCE_BASE_PORT", 2340)
+
+    return _setup
+
+
+def test_single_instance_serves_photon_port_directly(setup_config):
+    setup_config(["germany"])
+    (instance,) = instances.configured_instances()
+    assert (instance.name, instance.region, instance.data_dir, instance.port) == (
+        "default",
+        "germany",
+        "/photon/data",
+        2322,
+    )
+    assert not instances.needs_router()
+
+
+def test_regions_get_own_data_dir_and_port(setup_config):
+    setup_config(["de", "Japan"])
+    configured = instances.configured_instances()
+    assert [(i.name, i.data_dir, i.port) for i in configured] == [
+        ("germany", "/photon/data/regions/germany", 2340),
+        ("japan", "/photon/data/regions/japan", 2341),
+    ]
+    assert all(i.listen_ip == "127.0.0.1" for i in configured)
+
+
+def test_replicas_follow_their_primary(setup_config):
+    setup_config([], replicas=3)
+    configured = instances.configured_instances()
+    assert [(i.name, i.data_dir, i.port) for i in configured] == [
+        ("default", "/photon/data", 2340),
+        ("default-1", "/photon/data/replicas/1", 2341),
+        ("default-2", "/photon/data/replicas/2", 2342),
+    ]
+    primary = configured[0]
+    assert instances.primaries(configured) == [primary]
+    assert instances.replicas_of(configured, primary) == configured[1:]
+    assert instances.needs_router()
+
+
+def test_replica_java_params_follow_primary(setup_config, monkeypatch):
+    setup_config(["germany", "japan"], replicas=2)
+    monkeypatch.setenv("JAVA_PARAMS_JAPAN", "-Xmx2g")
+    monkeypatch.setattr(config, "JAVA_PARAMS", "-Xmx8g")
+    params = {i.name: i.java_params for i in instances.configured_instances()}
+    assert params == {"germany": "-Xmx8g", "germany-1": "-Xmx8g", "japan": "-Xmx2g", "japan-1": "-Xmx2g"}
@@ -0,0 +1,64 @@
+import struct
+
+import pytest
+
+from src.integrity import CODEC_MAGIC, FOOTER_MAGIC, IndexIntegrityError, check_file, check_index
+
+
+def lucene_file(path, body: bytes = b"data", footer: int = FOOTER_MAGIC) -> bytes:
+    content = struct.pack(">I", CODEC_MAGIC) + body + struct.pack(">IIQ", footer, 0, 1234)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return content
+
+
+@pytest.fixture
+def index(tmp_path):
+    segment = tmp_path / "photon_data" / "node_1" / "nodes" / "0" / "indices" / "x" / "0" / "index"
+    expected = {
+        "photon_data/node_1/nodes/0/indices/x/0/index/_0.cfs": len(lucene_file(segment / "_0.cfs", b"x" * 100)),
+        "photon_data/node_1/nodes/0/indices/x/0/index/segments_2": len(lucene_file(segment / "segments_2")),
+    }
+    (segment / "write.lock").write_bytes(b"")
+    expected["photon_data/node_1/nodes/0/indices/x/0/index/write.lock"] = 0
+    return tmp_path, segment, expected
+
+
+def test_intact_index_passes(index):
+    base, _segment, expected = index
+    check_index(str(base / "photon_data"), expected, str(base))
+
+
+def test_truncated_file_is_reported(index, caplog):
+    base, segment, expected = index
+    content = (segment / "_0.cfs").read_bytes()
+    (segment / "_0.cfs").write_bytes(content[:-10])
+
+    with pytest.raises(IndexIntegrityError, match="1 bad file"):
+        check_index(str(base / "photon_data"), expected, str(base))
+    assert "_0.cfs: size" in caplog.text
+
+
+def test_missing_file_is_reported(index, caplog):
+    base, segment, expected = index
+    (segment / "segments_2").unlink()
+
+    with pytest.raises(IndexIntegrityError):
+        check_index(str(base / "photon_data"), expected, str(base))
+    assert "segments_2: missing" in caplog.text
+
+
+def test_footer_is_checked_without_a_listing(tmp_path):
+    lucene_file(tmp_path / "_1.si", footer=0)
+    problem = check_file(str(tmp_path / "_1.si"), None)
+    assert problem is not None
+    assert "footer" in problem.reason
+    problem = check_file(str(tmp_path / "_1.si"), 99)
+    assert problem is not None
+    assert problem.reason == "size 24, expected 99"
+
+
+def test_empty_index_fails(tmp_path):
+    (tmp_path / "photon_data").mkdir()
+    with pytest.raises(IndexIntegrityError, match="No files"):
+        check_index(str(tmp_path / "photon_data"))
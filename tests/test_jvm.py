@@ -0,0 +1,82 @@
+import os
+import socket
+import threading
+
+import pytest
+
+from src import jvm
+from src.jvm import GcLogReader, parse_gc_line
+from src.utils import config, metrics
+
+YOUNG = "[2026-01-01T10:00:00.000+0000][12.345s][info][gc] GC(3) Pause Young (Normal) (G1 Evacuation Pause) 24M->4M(256M) 2.500ms"
+FULL = "[2026-01-01T10:00:05.000+0000][17.345s][info][gc] GC(4) Pause Full (System.gc()) 1G->300M(2G) 125.000ms"
+HEAP = "[2026-01-01T10:00:00.000+0000][12.345s][info][gc,heap] GC(3) Eden regions: 10->0(12)"
+
+
+@pytest.fixture
+def gc_log(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "LOGS_DIR", str(tmp_path))
+    return tmp_path / "gc-default.log"
+
+
+def test_parse_pause_lines():
+    pause = parse_gc_line(YOUNG)
+    assert pause is not None
+    assert pause.kind == "young"
+    assert pause.seconds == pytest.approx(0.0025)
+    assert (pause.heap_before, pause.heap_after, pause.heap_committed) == (24 << 20, 4 << 20, 256 << 20)
+
+    full = parse_gc_line(FULL)
+    assert full is not None
+    assert full.kind == "full"
+    assert (full.heap_before, full.heap_committed) == (1 << 30, 2 << 30)
+
+    assert parse_gc_line(HEAP) is None
+
+
+def test_reader_follows_appends_and_partial_lines(gc_log):
+    reader = GcLogReader("default")
+    assert reader.poll() == []
+
+    gc_log.write_text(f"{HEAP}\n{YOUNG}\n{FULL[:40]}")
+    assert [pause.kind for pause in reader.poll()] == ["young"]
+
+    with open(gc_log, "a") as f:
+        f.write(f"{FULL[40:]}\n")
+    assert [pause.kind for pause in reader.poll()] == ["full"]
+    assert metrics.get_gauge("photon_jvm_gc_max_pause_seconds", instance="default") == pytest.approx(0.125)
+    assert "photon_jvm_heap_after_gc_bytes" in metrics.render(prefix="photon_jvm_")
+    assert "photon_startup" not in metrics.render(prefix="photon_jvm_")
+
+
+def test_reader_starts_over_after_rotation(gc_log):
+    reader = GcLogReader("default")
+    gc_log.write_text(f"{YOUNG}\n{YOUNG}\n")
+    reader.poll()
+
+    os.rename(gc_log, f"{gc_log}.0")
+    gc_log.write_text(f"{YOUNG}\n")
+    assert len(reader.poll()) == 1
+    assert metrics.get_gauge("photon_jvm_gc_pauses_total", instance="default", kind="young") == 3
+
+
+def test_rejected_command_raises(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    path = str(tmp_path / "attach.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    received = []
+
+    def answer():
+        connection, _ = server.accept()
+        received.append(connection.recv(4096))
+        connection.sendall(b"1\nUnknown diagnostic command\n")
+        connection.close()
+
+    threading.Thread(target=answer, daemon=True).start()
+    monkeypatch.setattr(jvm, "_attach_socket", lambda pid, timeout: path)
+
+    with pytest.raises(jvm.AttachError, match="Unknown diagnostic command"):
+        jvm.jcmd(1234, "JFR.start")
+    assert received == [b"1\0jcmd\0JFR.start\0\0\0"]
+    server.close()
@@ -0,0 +1,49 @@
+import pytest
+
+from src import check_remote
+from src.manifest import IndexManifest, describe_change, read_manifest, write_manifest
+
+URL = "https://example.com/photon-db-planet-1.0-latest.tar.bz2"
+
+
+def test_write_and_read_manifest(tmp_path):
+    write_manifest(str(tmp_path), IndexManifest(url=URL, etag='"abc"', size=10, md5="0" * 32))
+
+    manifest = read_manifest(str(tmp_path))
+    assert manifest is not None
+    assert manifest.etag == '"abc"'
+    assert manifest.installed_at is not None
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_read_manifest_of_index_without_one(tmp_path):
+    assert read_manifest(str(tmp_path)) is None
+
+
+@pytest.mark.parametrize(
+    ("local", "remote", "changed"),
+    [
+        (IndexManifest(URL, etag='"a"', md5="1"), IndexManifest(URL, etag='"b"', md5="1"), False),
+        (IndexManifest(URL, etag='"a"', md5="1"), IndexManifest(URL, etag='"a"', md5="2"), True),
+        (IndexManifest(URL, etag='"a"', size=5), IndexManifest(URL, etag='"b"', size=5), True),
+        (IndexManifest(URL, last_modified="x", size=5), IndexManifest(URL, last_modified="x", size=6), False),
+        (IndexManifest(URL, size=5), IndexManifest(URL, size=5), False),
+        (IndexManifest(URL, size=5), IndexManifest(URL + ".other", size=5), True),
+        (IndexManifest(URL), IndexManifest(URL, etag='"a"'), True),
+    ],
+)
+def test_describe_change(local, remote, changed):
+    assert (describe_change(local, remote) is not None) == changed
+
+
+def test_update_available_compares_manifest_with_remote(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "photon_data").mkdir()
+    write_manifest(str(tmp_path / "photon_data"), IndexManifest(URL, etag='"a"', size=5))
+    remote = IndexManifest(URL, etag='"a"', size=5)
+    monkeypatch.setattr(check_remote, "get_remote_identity", lambda url, md5_url=None: remote)
+    monkeypatch.setattr(check_remote, "compare_mtime", lambda *_args: pytest.fail("timestamps must not be used"))
+
+    assert not check_remote.update_available("planet", str(tmp_path))
+
+    remote.etag = '"b"'
+    assert check_remote.update_available("planet", str(tmp_path))
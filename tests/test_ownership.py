@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from src import ownership
+from src.utils import config
+
+requires_root = pytest.mark.skipif(os.geteuid() != 0, reason="changing ownership to another user requires root")
+
+
+@pytest.fixture
+def photon_dir(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    data_dir = tmp_path / "data"
+    (data_dir / "photon_data" / "node_1").mkdir(parents=True)
+    for i in range(20):
+        (data_dir / "photon_data" / "node_1" / f"segment-{i}").write_bytes(b"x")
+    (tmp_path / "photon.jar").write_bytes(b"jar")
+    monkeypatch.setattr(config, "PHOTON_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(config, "REGIONS", [])
+    monkeypatch.setattr(config, "PHOTON_REPLICAS", 1)
+    monkeypatch.setattr(ownership, "target_ids", lambda: (os.getuid(), os.getgid()))
+    return tmp_path
+
+
+def test_index_generation_changes_when_index_is_swapped(photon_dir):
+    data_dir = photon_dir / "data"
+    before = ownership.index_generation(str(data_dir))
+    os.rename(data_dir / "photon_data", data_dir / "photon_data.backup")
+    (data_dir / "photon_data").mkdir()
+
+    assert before != ownership.index_generation(str(data_dir))
+    assert ownership.index_generation(str(data_dir))[0].startswith("photon_data:")
+
+
+def test_index_generation_changes_when_a_generation_is_replaced(photon_dir):
+    data_dir = photon_dir / "data"
+    generations_dir = data_dir / "generations"
+    for name in ("gen-20250101-000000", "gen-20250201-000000"):
+        (generations_dir / name / "node_1").mkdir(parents=True)
+    (data_dir / "photon_data").rename(data_dir / "legacy")
+    (data_dir / "photon_data").symlink_to(generations_dir / "gen-20250201-000000")
+    before = ownership.index_generation(str(data_dir))
+    assert [entry.split(":")[0] for entry in before] == [
+        "photon_data",
+        "generations/gen-20250201-000000",
+        "generations/gen-20250101-000000",
+    ]
+
+    (generations_dir / "gen-20250101-000000").rename(data_dir / "old")
+    (generations_dir / "gen-20250101-000000").mkdir()
+
+    assert before != ownership.index_generation(str(data_dir))
+
+
+def test_index_generation_covers_replicas(photon_dir, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "PHOTON_REPLICAS", 2)
+    data_dir = photon_dir / "data"
+    (data_dir / "replicas" / "1" / "photon_data").mkdir(parents=True)
+    before = ownership.index_generation(str(data_dir))
+    assert before[1].startswith("replicas/1/photon_data:")
+
+    (data_dir / "replicas" / "1" / "photon_data").rename(data_dir / "replicas" / "1" / "old")
+    (data_dir / "replicas" / "1" / "photon_data").mkdir()
+
+    assert before != ownership.index_generation(str(data_dir))
+
+
+def test_main_skips_walk_when_marker_matches(photon_dir, monkeypatch: pytest.MonkeyPatch):
+    calls = []
+    monkeypatch.setattr(ownership, "reconcile", lambda root, uid, gid: calls.append(root) or (0, 0))
+
+    ownership.main()
+    ownership.main()
+
+    assert calls == [str(photon_dir)]
+    assert ownership.read_marker(config.DATA_DIR)["uid"] == os.getuid()
+
+
+def test_refresh_marker_records_new_generation(photon_dir, monkeypatch: pytest.MonkeyPatch):
+    ownership.main()
+    (photon_dir / "data" / "photon_data").rename(photon_dir / "data" / "old")
+    (photon_dir / "data" / "photon_data").mkdir()
+
+    ownership.refresh_marker()
+
+    calls = []
+    monkeypatch.setattr(ownership, "reconcile", lambda root, uid, gid: calls.append(root) or (0, 0))
+    ownership.main()
+    assert calls == []
+
+
+@requires_root
+def test_reconcile_changes_only_differing_entries(photon_dir):
+    node_dir = photon_dir / "data" / "photon_data" / "node_1"
+    os.lchown(node_dir / "segment-3", 12345, 12345)
+    os.lchown(node_dir, 12345, os.getgid())
+
+    scanned, changed = ownership.reconcile(str(photon_dir), os.getuid(), os.getgid(), workers=4)
+
+    assert scanned == 25
+    assert changed == 2
+    assert os.lstat(node_dir / "segment-3").st_uid == os.getuid()
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import threading
+
+import pytest
+import requests
+
+from src import peers
+from src.utils import config
+
+ARCHIVE = os.urandom(10_000)
+MD5 = hashlib.md5(ARCHIVE).hexdigest()  # noqa: S324
+
+
+@pytest.fixture
+def peer_config(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "PEER_DIR", str(tmp_path / "peer"))
+    monkeypatch.setattr(config, "PEER_CHUNK_SIZE", 1_000)
+    monkeypatch.setattr(config, "DOWNLOAD_PREALLOCATE", False)
+    monkeypatch.setattr(config, "METRICS_FILE", str(tmp_path / "metrics.prom"))
+    return tmp_path
+
+
+def _start_peer(directory, archive: bytes = ARCHIVE, md5: str = MD5) -> str:
+    (directory / md5).mkdir(parents=True)
+    (directory / md5 / "photon-db-latest.tar.bz2").write_bytes(archive)
+    server = peers.PeerServer(("127.0.0.1", 0), [str(directory)])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, (0, 99)),
+        ("bytes=0-9", (0, 9)),
+        ("bytes=90-", (90, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=50-500", (50, 99)),
+        ("bytes=100-", None),
+        ("bytes=-", None),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert peers.parse_range(header, 100) == expected
+
+
+def test_publish_archive_replaces_previous(peer_config):
+    old = peer_config / "peer" / ("0" * 32)
+    old.mkdir(parents=True)
+    archive = peer_config / "photon-db-latest.tar.bz2"
+    archive.write_bytes(ARCHIVE)
+
+    peers.publish_archive(str(archive), MD5)
+
+    assert not archive.exists()
+    assert sorted(e for e in os.listdir(peer_config / "peer") if not e.startswith(".")) == [MD5]
+    published = peers.find_published_archive([config.PEER_DIR], MD5)
+    assert published is not None
+    assert published.endswith("photon-db-latest.tar.bz2")
+    assert peers.find_published_archive([config.PEER_DIR], "../etc") is None
+
+
+def test_peer_server_serves_ranges(peer_config):
+    url = _start_peer(peer_config / "a")
+
+    head = requests.head(f"{url}/peer/{MD5}", timeout=5)
+    assert head.status_code == 200
+    assert head.headers["X-Photon-MD5"] == MD5
+    assert int(head.headers["Content-Length"]) == len(ARCHIVE)
+
+    part = requests.get(f"{url}/peer/{MD5}", headers={"Range": "bytes=10-19"}, timeout=5)
+    assert part.status_code == 206
+    assert part.content == ARCHIVE[10:20]
+    assert part.headers["Content-Range"] == f"bytes 10-19/{len(ARCHIVE)}"
+
+    assert requests.get(f"{url}/peer/{'f' * 32}", timeout=5).status_code == 404
+    assert requests.get(f"{url}/peer/{MD5}", headers={"Range": "bytes=20000-"}, timeout=5).status_code == 416
+
+
+def test_download_from_several_peers(peer_config, monkeypatch: pytest.MonkeyPatch):
+    stale = _start_peer(peer_config / "stale", archive=b"old", md5="1" * 32)
+    monkeypatch.setattr(
+        config, "PEERS", [_start_peer(peer_config / "a"), _start_peer(peer_config / "b"), stale, "http://127.0.0.1:9"]
+    )
+    destination = peer_config / "download.tar.bz2"
+
+    assert [p.size for p in peers.discover_peers(MD5)] == [len(ARCHIVE), len(ARCHIVE)]
+    assert peers.download_from_peers(MD5, str(destination))
+    assert destination.read_bytes() == ARCHIVE
+
+
+def test_download_falls_back_when_peers_fail(peer_config, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "PEERS", [_start_peer(peer_config / "a")])
+    destination = peer_config / "download.tar.bz2"
+
+    def broken(self, session, peer, offset, length):
+        raise peers.PeerDownloadError("connection reset")
+
+    monkeypatch.setattr(peers._PeerTransfer, "fetch_chunk", broken)
+
+    assert not peers.download_from_peers(MD5, str(destination))
+    assert not destination.exists()
+
+
+def test_no_peers_with_matching_checksum(peer_config, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "PEERS", [_start_peer(peer_config / "a")])
+    assert not peers.download_from_peers("2" * 32, str(peer_config / "download.tar.bz2"))
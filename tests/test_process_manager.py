@@ -0,0 +1,170 @@
+import signal
+import subprocess
+import threading
+from typing import cast
+
+import pytest
+
+from src import process_manager
+from src.utils import config
+
+
+@pytest.fixture
+def activated() -> list[str]:
+    """The instances the manager activated a staged update for."""
+    return []
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch: pytest.MonkeyPatch, activated):
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "REGIONS", [])
+    monkeypatch.setattr(config, "PHOTON_REPLICAS", 1)
+    monkeypatch.setattr(config, "ACTIVATE_TRIGGER_FILE", str(tmp_path / ".photon-activate"))
+    monkeypatch.setattr(config, "UPDATE_WINDOW", "MANUAL")
+    handlers = {
+        signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1, signal.SIGUSR2)
+    }
+    manager = process_manager.PhotonManager()
+    monkeypatch.setattr(manager, "activate_instance", lambda instance: activated.append(instance.name))
+    yield manager
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+def test_staged_update_waits_for_activation(manager, activated, tmp_path):
+    (tmp_path / "pending" / "photon_data").mkdir(parents=True)
+
+    manager.activate_pending_updates()
+    assert activated == []
+
+    (tmp_path / ".photon-activate").touch()
+    manager.activate_pending_updates()
+    assert activated == ["default"]
+    assert not (tmp_path / ".photon-activate").exists()
+
+
+def test_signal_without_staged_update(manager, activated):
+    manager.handle_activate(10, None)
+    manager.activate_pending_updates()
+    assert activated == []
+    assert not manager.activation_requested
+
+
+def test_sequential_update_is_deferred_until_window(manager, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "UPDATE_STRATEGY", "SEQUENTIAL")
+    monkeypatch.setattr(manager, "update_instance", lambda _instance: pytest.fail("update ran outside the window"))
+    manager.run_update()
+    assert manager.update_deferred
+
+
+@pytest.mark.parametrize(
+    ("download_code", "expected"),
+    [(config.ARCHIVE_READY_EXIT_CODE, ["download", "stop", "install"]), (0, ["download"]), (1, ["download"])],
+)
+def test_hybrid_update_stops_photon_only_for_install(manager, monkeypatch: pytest.MonkeyPatch, download_code, expected):
+    calls = []
+
+    def run_module(_module, _env, phase):
+        calls.append(phase)
+        return download_code if phase == "download" else 0
+
+    monkeypatch.setattr(process_manager, "run_module", run_module)
+    monkeypatch.setattr(manager, "stop_instance", lambda _instance: calls.append("stop"))
+
+    manager.run_hybrid_update(manager.instances[0])
+    assert calls == expected
+
+
+@pytest.mark.parametrize(
+    ("failing", "expected"),
+    [(set(), True), ({"default-1"}, True), ({"default"}, True), ({"default", "default-1"}, False)],
+)
+def test_start_photon_starts_every_replica(monkeypatch: pytest.MonkeyPatch, manager, failing, expected):
+    monkeypatch.setattr(config, "PHOTON_REPLICAS", 2)
+    manager.instances = process_manager.configured_instances()
+    started = []
+
+    def start_instance(instance, _retries):
+        started.append(instance.name)
+        return instance.name not in failing
+
+    monkeypatch.setattr(manager, "start_instance", start_instance)
+
+    assert manager.start_photon() is expected
+    assert started == ["default", "default-1"]
+    assert {instance.name for instance in manager.instances if instance.draining} == failing
+
+
+def test_monitor_does_not_restart_primaries_while_an_update_runs(monkeypatch: pytest.MonkeyPatch, manager):
+    monkeypatch.setattr(config, "REGIONS", ["germany", "japan"])
+    manager.instances = process_manager.configured_instances()
+    generations = {}
+    for instance in manager.instances:
+        generations[instance.photon_data_dir] = instance.generation = "gen-1"
+        # only has to look like it is running
+        instance.process = cast(subprocess.Popen, object())
+    restarts = []
+    states = []
+
+    def restart_instance(instance):
+        restarts.append(instance.name)
+        instance.generation = generations[instance.photon_data_dir]
+        return True
+
+    def update_instance(instance):
+        # the updater swaps the symlink, the monitor thread polls in the meantime, then the scheduler restarts
+        states.append(manager.state)
+        generations[instance.photon_data_dir] = "gen-2"
+        monitor = threading.Thread(target=manager.follow_generation_changes)
+        monitor.start()
+        monitor.join()
+        manager.finish_update(instance, 0)
+
+    monkeypatch.setattr(process_manager, "active_generation", lambda path: generations[path])
+    monkeypatch.setattr(process_manager, "refresh_marker", lambda: None)
+    monkeypatch.setattr("src.filesystem.retire_old_generations", lambda _path: True)
+    monkeypatch.setattr(config, "UPDATE_STRATEGY", "PARALLEL")
+    monkeypatch.setattr(config, "UPDATE_WINDOW", None)
+    monkeypatch.setattr(manager, "manual_activation", False)
+    monkeypatch.setattr(manager, "restart_instance", restart_instance)
+    monkeypatch.setattr(manager, "update_instance", update_instance)
+    manager.state = process_manager.AppState.RUNNING
+
+    manager.run_update()
+
+    assert restarts == ["germany", "japan"]
+    assert states == [process_manager.AppState.UPDATING] * 2
+    assert manager.state == process_manager.AppState.RUNNING
+
+    # outside an update a switched generation, e.g. a rollback, is still picked up by the monitor
+    generations[manager.instances[1].photon_data_dir] = "gen-1"
+    manager.follow_generation_changes()
+    assert restarts == ["germany", "japan", "japan"]
+
+
+def test_monitor_retries_instances_that_failed_to_start(monkeypatch: pytest.MonkeyPatch, manager):
+    monkeypatch.setattr(config, "PHOTON_REPLICAS", 2)
+    manager.instances = process_manager.configured_instances()
+    outcomes = {"default": [True], "default-1": [False, False, True]}
+    started = []
+
+    def start_instance(instance, max_startup_retries=3):
+        started.append(instance.name)
+        return outcomes[instance.name].pop(0)
+
+    monkeypatch.setattr(manager, "start_instance", start_instance)
+    assert manager.start_photon()
+    replica = manager.instances[1]
+    assert replica.draining
+    assert replica.failed_at is not None
+
+    manager.retry_failed_instances()
+    assert started == ["default", "default-1"]
+
+    for expected_draining in (True, False):
+        replica.failed_at -= config.INSTANCE_RETRY_INTERVAL
+        manager.retry_failed_instances()
+        assert replica.draining is expected_draining
+    assert started == ["default", "default-1", "default-1", "default-1"]
+    assert replica.failed_at is None or not replica.draining
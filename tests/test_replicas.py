@@ -0,0 +1,81 @@
+import errno
+import os
+
+import pytest
+
+from src import replicas
+from src.instances import PhotonInstance
+
+
+def _make_index(root):
+    index = root / "node_1" / "indices" / "abc" / "0" / "index"
+    index.mkdir(parents=True)
+    (index / "_0.cfs").write_bytes(b"segment")
+    (index / "segments_1").write_bytes(b"commit")
+    (index / "write.lock").write_bytes(b"")
+    translog = root / "node_1" / "indices" / "abc" / "0" / "translog"
+    translog.mkdir()
+    (translog / "translog.ckp").write_bytes(b"checkpoint")
+    state = root / "node_1" / "_state"
+    state.mkdir()
+    (state / "state-1.st").write_bytes(b"state")
+    (root / "node_1" / "node.lock").write_bytes(b"")
+
+
+@pytest.fixture
+def no_reflink(monkeypatch):
+    def _unsupported(source, target):
+        open(target, "wb").close()
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(replicas, "_reflink", _unsupported)
+
+
+@pytest.mark.parametrize(
+    ("rel_path", "expected"),
+    [
+        ("node_1/indices/abc/0/index/_0.cfs", True),
+        ("node_1/indices/abc/0/index/segments_1", True),
+        ("node_1/indices/abc/0/index/write.lock", False),
+        ("node_1/indices/abc/0/translog/translog.ckp", False),
+        ("node_1/_state/state-1.st", False),
+        ("node_1/indices/abc/_state/state-0.st", False),
+    ],
+)
+def test_is_write_once(rel_path, expected):
+    assert replicas._is_write_once(rel_path.replace("/", os.sep)) == expected
+
+
+@pytest.mark.usefixtures("no_reflink")
+def test_clone_index_links_segments_and_copies_mutable_files(tmp_path):
+    source = tmp_path / "photon_data"
+    _make_index(source)
+    target = tmp_path / "clone"
+
+    stats = replicas.clone_index(str(source), str(target))
+
+    assert (stats.reflinked, stats.hardlinked, stats.copied, stats.skipped) == (0, 2, 2, 2)
+    segment = "node_1/indices/abc/0/index/_0.cfs"
+    assert os.path.samefile(source / segment, target / segment)
+    checkpoint = "node_1/indices/abc/0/translog/translog.ckp"
+    assert not os.path.samefile(source / checkpoint, target / checkpoint)
+    assert (target / checkpoint).read_bytes() == b"checkpoint"
+    assert not (target / "node_1" / "node.lock").exists()
+    assert not (target / "node_1" / "indices" / "abc" / "0" / "index" / "write.lock").exists()
+
+
+@pytest.mark.usefixtures("no_reflink")
+def test_replica_index_survives_removal_of_primary(tmp_path):
+    primary = PhotonInstance("default", None, str(tmp_path), 2340, "127.0.0.1")
+    replica = PhotonInstance("default-1", None, str(tmp_path / "replicas" / "1"), 2341, "127.0.0.1", replica_of=primary)
+    _make_index(tmp_path / "photon_data")
+
+    staged = replicas.stage_replica_index(primary, replica)
+    replicas.activate_replica_index(staged, replica)
+    for root, _, files in os.walk(primary.photon_data_dir):
+        for name in files:
+            os.unlink(os.path.join(root, name))
+
+    segment = tmp_path / "replicas" / "1" / "photon_data" / "node_1" / "indices" / "abc" / "0" / "index" / "_0.cfs"
+    assert segment.read_bytes() == b"segment"
+    assert not os.path.exists(staged)
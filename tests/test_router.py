@@ -0,0 +1,124 @@
+import pytest
+
+from src.instances import PhotonInstance
+from src.router import RouterServer, merge_feature_collections, select_instances
+
+
+def _instance(region: str, port: int) -> PhotonInstance:
+    return PhotonInstance(region, region, f"/data/regions/{region}", port, "127.0.0.1")
+
+
+@pytest.fixture
+def instances() -> list[PhotonInstance]:
+    return [_instance("europe", 2340), _instance("germany", 2341), _instance("japan", 2342)]
+
+
+def _names(selected: list[PhotonInstance]) -> list[str]:
+    return [i.name for i in selected]
+
+
+@pytest.mark.parametrize(
+    ("path", "params", "expected"),
+    [
+        ("/reverse", {"lat": ["52.52"], "lon": ["13.40"]}, ["germany"]),
+        ("/reverse", {"lat": ["48.85"], "lon": ["2.35"]}, ["europe"]),
+        ("/api", {"q": ["tokyo"], "lat": ["35.68"], "lon": ["139.69"]}, ["japan"]),
+        ("/api", {"q": ["paris"], "bbox": ["2.2,48.8,2.5,48.9"]}, ["europe"]),
+        ("/api", {"q": ["berlin"]}, ["europe", "germany", "japan"]),
+        ("/reverse", {"lat": ["-33.9"], "lon": ["151.2"]}, ["europe", "germany", "japan"]),
+        ("/api", {"q": ["x"], "bbox": ["invalid"]}, ["europe", "germany", "japan"]),
+    ],
+)
+def test_select_instances(instances, path, params, expected):
+    assert _names(select_instances(instances, path, params)) == expected
+
+
+def test_select_instances_prefers_region_covering_the_bbox(instances):
+    # a box spanning Germany and France intersects germany, but only europe answers for all of it
+    selected = select_instances(instances, "/api", {"q": ["x"], "bbox": ["2.0,47.0,14.0,53.0"]})
+    assert _names(selected) == ["europe"]
+
+
+def test_select_instances_fans_out_for_bbox_without_covering_region(instances):
+    selected = select_instances(instances, "/api", {"q": ["x"], "bbox": ["10.0,35.0,140.0,52.0"]})
+    assert _names(selected) == ["europe", "germany", "japan"]
+
+
+def _feature(name: str, lon: float, lat: float) -> dict:
+    return {"type": "Feature", "properties": {"name": name}, "geometry": {"type": "Point", "coordinates": [lon, lat]}}
+
+
+def _feature_names(collection: dict) -> list[str]:
+    return [f["properties"]["name"] for f in collection["features"]]
+
+
+def test_merge_interleaves_search_results():
+    bodies = [
+        {"features": [_feature("a1", 0, 0), _feature("a2", 0, 0), _feature("a3", 0, 0)]},
+        {"features": [_feature("b1", 0, 0)]},
+    ]
+    merged = merge_feature_collections(bodies, {}, nearest_first=False)
+    assert merged["type"] == "FeatureCollection"
+    assert _feature_names(merged) == ["a1", "b1", "a2"]
+
+
+def test_merge_respects_limit():
+    bodies = [{"features": [_feature("a1", 0, 0), _feature("a2", 0, 0)]}, {"features": [_feature("b1", 0, 0)]}]
+    merged = merge_feature_collections(bodies, {"limit": ["2"]}, nearest_first=False)
+    assert _feature_names(merged) == ["a1", "b1"]
+
+
+def test_merge_orders_reverse_results_by_distance():
+    bodies = [{"features": [_feature("far", 10, 10)]}, {"features": [_feature("near", 1, 1)]}]
+    merged = merge_feature_collections(bodies, {"lat": ["0"], "lon": ["0"]}, nearest_first=True)
+    assert _feature_names(merged) == ["near"]
+
+
+def test_merge_of_empty_answers():
+    assert merge_feature_collections([{"features": []}, {}], {}, nearest_first=False)["features"] == []
+
+
+@pytest.fixture
+def replica_server():
+    primary = _instance("germany", 2340)
+    group = [
+        primary,
+        *(PhotonInstance(f"germany-{n}", "germany", "/r", 2340 + n, "127.0.0.1", primary) for n in (1, 2)),
+    ]
+    server = RouterServer(("127.0.0.1", 0), group)
+    yield server, group
+    server.server_close()
+    server.pool.shutdown()
+
+
+def test_select_instances_ignores_replicas(replica_server):
+    server, group = replica_server
+    assert server.primaries == [group[0]]
+    assert server.groups == {"germany": group}
+
+
+def test_acquire_picks_least_outstanding_replica(replica_server):
+    server, group = replica_server
+    first = [server.acquire(group[0]) for _ in range(3)]
+    assert sorted(i.name for i in first) == ["germany", "germany-1", "germany-2"]
+
+    server.release(group[1])
+    assert server.acquire(group[0]) is group[1]
+
+
+def test_acquire_skips_draining_replicas(replica_server):
+    server, group = replica_server
+    group[0].draining = True
+    group[2].draining = True
+    assert {server.acquire(group[0]).name for _ in range(3)} == {"germany-1"}
+
+    group[1].draining = True
+    assert server.acquire(group[0]) in group
+
+
+def test_wait_idle(replica_server):
+    server, group = replica_server
+    instance = server.acquire(group[0])
+    assert not server.wait_idle(instance, timeout=0.01)
+    server.release(instance)
+    assert server.wait_idle(instance, timeout=0.01)
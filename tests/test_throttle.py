@@ -0,0 +1,72 @@
+import pytest
+
+from src import throttle
+from src.throttle import ExtractionThrottle, extraction_threads
+from src.utils import config
+
+
+@pytest.fixture
+def controller(monkeypatch: pytest.MonkeyPatch) -> ExtractionThrottle:
+    monkeypatch.setattr(config, "THROTTLE_MIN_RATE", 1000)
+    monkeypatch.setattr(throttle.metrics, "set_gauge", lambda *args: None)
+    return ExtractionThrottle(2322)
+
+
+def test_threads_leave_half_of_the_cpus_while_serving(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "EXTRACT_THREADS", 0)
+    monkeypatch.setattr(throttle, "available_cpus", lambda: 8)
+    assert extraction_threads(serving=False) == 8
+    assert extraction_threads(serving=True) == 4
+
+    monkeypatch.setattr(throttle, "available_cpus", lambda: 1)
+    assert extraction_threads(serving=True) == 1
+
+    monkeypatch.setattr(config, "EXTRACT_THREADS", 3)
+    assert extraction_threads(serving=False) == 3
+
+
+def test_backs_off_when_overloaded_and_lifts_the_limit_again(controller, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(controller, "overloaded", lambda: "query latency 900ms")
+    controller._fed = 10**9
+    controller.adjust()
+    first = controller.rate
+    controller._fed = 10**9
+    controller.adjust()
+    assert controller.rate == pytest.approx(first / 2)
+    assert controller.backoffs == 2
+
+    controller.rate = 500
+    controller.adjust()
+    assert controller.rate == 1000
+
+    monkeypatch.setattr(controller, "overloaded", lambda: None)
+    controller._fed = 10**9
+    controller.adjust()
+    assert controller.rate == 1250
+    controller._fed = 0
+    controller.adjust()
+    assert controller.rate is None
+
+
+def test_pace_sleeps_for_the_configured_rate(controller, monkeypatch: pytest.MonkeyPatch):
+    sleeps = []
+    monkeypatch.setattr(throttle.time, "sleep", sleeps.append)
+
+    controller.pace(1000)
+    assert not sleeps
+
+    controller.rate = 2000
+    controller.pace(1000)
+    controller.pace(1000)
+    # sleep is not real here, so the second chunk is still due one second from now
+    assert sleeps == pytest.approx([0.5, 1.0], abs=0.05)
+    assert controller.throttled_seconds == pytest.approx(sum(sleeps))
+
+
+def test_no_throttle_without_a_responding_photon(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(throttle, "probe_latency", lambda port: None)
+    assert ExtractionThrottle.for_extraction(serving=True) is None
+
+    monkeypatch.setattr(throttle, "probe_latency", lambda port: 12.0)
+    assert ExtractionThrottle.for_extraction(serving=False) is None
+    assert ExtractionThrottle.for_extraction(serving=True) is not None
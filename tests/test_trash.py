@@ -0,0 +1,65 @@
+import os
+
+from src import trash
+
+
+def _make_tree(root, depth: int = 3, width: int = 3):
+    root.mkdir()
+    for i in range(width):
+        (root / f"file-{i}").write_bytes(b"x" * 10)
+        if depth:
+            _make_tree(root / f"dir-{i}", depth - 1, width)
+
+
+def test_move_to_trash_renames_next_to_original(tmp_path):
+    target = tmp_path / "temp"
+    _make_tree(target, depth=1)
+
+    trash_path = trash.move_to_trash(str(target))
+
+    assert trash_path is not None
+    assert not target.exists()
+    assert os.path.dirname(trash_path) == str(tmp_path)
+    assert os.path.basename(trash_path).startswith(".trash-")
+    assert os.path.basename(trash_path).endswith("-temp")
+    assert trash.find_trash([str(tmp_path)]) == [trash_path]
+
+
+def test_move_to_trash_ignores_missing_path(tmp_path):
+    assert trash.move_to_trash(str(tmp_path / "missing")) is None
+
+
+def test_reap_all_deletes_trees_and_files_but_keeps_other_entries(tmp_path):
+    _make_tree(tmp_path / "photon_data.backup")
+    (tmp_path / "archive.tar.bz2").write_bytes(b"data")
+    (tmp_path / "photon_data").mkdir()
+    trash.move_to_trash(str(tmp_path / "photon_data.backup"))
+    trash.move_to_trash(str(tmp_path / "archive.tar.bz2"))
+
+    assert trash.reap_all([str(tmp_path)], workers=4) == 2
+
+    assert sorted(os.listdir(tmp_path)) == ["photon_data"]
+    assert trash.find_trash([str(tmp_path)]) == []
+
+
+def test_reap_all_resumes_partially_deleted_trash(tmp_path):
+    leftover = tmp_path / ".trash-1-temp"
+    _make_tree(leftover, depth=2)
+    (leftover / "dir-0" / "file-0").unlink()
+
+    trash.reap_all([str(tmp_path)], workers=2)
+
+    assert not leftover.exists()
+
+
+def test_move_to_trash_collects_nested_paths_in_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(trash.config, "DATA_DIR", str(tmp_path))
+    nested = tmp_path / "cache" / "abc"
+    _make_tree(nested.parent)
+    _make_tree(nested, depth=1)
+
+    trash_path = trash.move_to_trash(str(nested))
+
+    assert trash_path is not None
+    assert os.path.dirname(trash_path) == str(tmp_path)
+    assert trash.find_trash([str(tmp_path)]) == [trash_path]
@@ -0,0 +1,44 @@
+import pytest
+
+from benchmarks.startup import probe
+from src import worker
+from src.utils import config
+
+FAKE_UPDATER = """
+import sys
+
+from src.utils import config
+
+
+def main():
+    with open(sys.argv[1], "w") as f:
+        f.write(config.DATA_DIR)
+    sys.exit(config.PHOTON_PORT - 2300)
+"""
+
+
+@pytest.fixture
+def fake_updater(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "fake_updater.py").write_text(FAKE_UPDATER)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return "fake_updater"
+
+
+def test_run_forked_uses_instance_environment(fake_updater, tmp_path):
+    output = tmp_path / "data-dir"
+    env = {"PHOTON_INSTANCE_DATA_DIR": "/data/regions/germany", "PHOTON_PORT": "2303"}
+
+    assert worker.run_forked(fake_updater, env, str(output)) == 3
+    assert output.read_text() == "/data/regions/germany"
+    # the parent keeps its own configuration
+    assert config.DATA_DIR != "/data/regions/germany"
+
+
+def test_run_module_forks_when_configured(fake_updater, tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "UPDATER_MODE", "FORK")
+    env = {"PHOTON_INSTANCE_DATA_DIR": str(tmp_path), "PHOTON_PORT": "2300"}
+    assert worker.run_module(fake_updater, env, str(tmp_path / "out")) == 0
+
+
+def test_manager_import_leaves_heavy_modules_unloaded():
+    assert probe("src.process_manager")["modules"] == []
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.dag import Step, critical_path, run_dag
+
+
+def test_run_dag_passes_results_along_dependencies():
+    steps = [
+        Step("a", lambda _results: 1),
+        Step("b", lambda results: results["a"] + 1, depends_on=("a",)),
+        Step("c", lambda results: results["a"] + results["b"], depends_on=("a", "b")),
+    ]
+
+    assert run_dag(steps) == {"a": 1, "b": 2, "c": 3}
+
+
+def test_run_dag_runs_independent_steps_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    steps = [Step("left", lambda _results: barrier.wait()), Step("right", lambda _results: barrier.wait())]
+
+    run_dag(steps)
+
+
+def test_run_dag_reraises_first_failure_and_cancels_remaining_steps():
+    cancel_event = threading.Event()
+    started = []
+
+    def slow(_results):
+        started.append("slow")
+        assert cancel_event.wait(timeout=5)
+
+    def fail(_results):
+        raise RuntimeError("md5 missing")
+
+    steps = [
+        Step("slow", slow),
+        Step("fail", fail),
+        Step("after", lambda _results: started.append("after"), depends_on=("slow", "fail")),
+    ]
+
+    with pytest.raises(RuntimeError, match="md5 missing"):
+        run_dag(steps, cancel_event=cancel_event)
+
+    assert cancel_event.is_set()
+    assert "after" not in started
+
+
+@pytest.mark.parametrize(
+    ("steps", "message"),
+    [
+        ([Step("a", lambda _results: None, depends_on=("missing",))], "unknown step 'missing'"),
+        (
+            [Step("a", lambda _results: None, depends_on=("b",)), Step("b", lambda _results: None, depends_on=("a",))],
+            "Dependency cycle",
+        ),
+        ([Step("a", lambda _results: None), Step("a", lambda _results: None)], "unique"),
+    ],
+)
+def test_run_dag_rejects_invalid_graphs(steps: list[Step], message: str):
+    with pytest.raises(ValueError, match=message):
+        run_dag(steps)
+
+
+def test_critical_path_follows_latest_finishing_dependency():
+    steps = [
+        Step("fast", lambda _results: None),
+        Step("slow", lambda _results: time.sleep(0.05)),
+        Step("join", lambda _results: None, depends_on=("fast", "slow")),
+    ]
+
+    run_dag(steps)
+
+    assert [step.name for step in critical_path(steps)] == ["slow", "join"]
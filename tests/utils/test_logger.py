@@ -0,0 +1,57 @@
+import json
+import logging
+import queue
+
+from src.utils.logger import LOG_FORMAT, JsonFormatter, RateLimitFilter, TracebackQueueHandler
+
+
+def _record(message: str, created: float, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("photon", logging.INFO, __file__, 1, message, None, None)
+    record.created = created
+    record.__dict__.update(extra)
+    return record
+
+
+def test_rate_limit_filter_suppresses_repeats_per_key():
+    rate_limit = RateLimitFilter(interval=10)
+
+    assert rate_limit.filter(_record("stalled", 100, rate_key="stall"))
+    assert not rate_limit.filter(_record("stalled", 105, rate_key="stall"))
+    assert not rate_limit.filter(_record("stalled", 109, rate_key="stall"))
+    assert rate_limit.filter(_record("other", 105, rate_key="other"))
+    assert rate_limit.filter(_record("untagged", 105))
+
+    record = _record("stalled", 111, rate_key="stall")
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "stalled (2 similar messages suppressed)"
+
+
+def test_rate_limit_filter_honours_record_interval():
+    rate_limit = RateLimitFilter(interval=60)
+    assert rate_limit.filter(_record("a", 0, rate_key="k", rate_interval=1))
+    assert rate_limit.filter(_record("a", 2, rate_key="k", rate_interval=1))
+
+
+def test_json_formatter():
+    entry = json.loads(JsonFormatter().format(_record("Download progress: 50%", 1792400000.1234)))
+    assert entry == {"time": 1792400000.123, "level": "INFO", "logger": "photon", "message": "Download progress: 50%"}
+
+
+def test_queued_records_keep_their_traceback_apart():
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("photon.test_queue")
+    logger.propagate = False
+    logger.addHandler(TracebackQueueHandler(log_queue))
+    try:
+        raise ValueError("broken archive")
+    except ValueError:
+        logger.exception("Update failed for %s", "germany")
+    record = log_queue.get_nowait()
+
+    assert record.exc_info is None
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Update failed for germany"
+    assert "ValueError: broken archive" in entry["exception"]
+    text = logging.Formatter(LOG_FORMAT).format(record)
+    assert text.endswith("ValueError: broken archive")
+    assert "Update failed for germany\nTraceback" in text
@@ -0,0 +1,39 @@
+import datetime
+
+import pytest
+
+from src.utils.maintenance import in_window, parse_window
+
+
+def _at(hour: int, minute: int = 0) -> datetime.datetime:
+    return datetime.datetime(2026, 10, 19, hour, minute)
+
+
+def test_parse_window():
+    assert parse_window("02:00-04:30") == (datetime.time(2, 0), datetime.time(4, 30))
+    assert parse_window("") is None
+
+
+@pytest.mark.parametrize("window", ["2-4", "02:00", "25:00-04:00", "02:00-04:60"])
+def test_parse_window_rejects_invalid(window):
+    with pytest.raises(ValueError, match="maintenance window"):
+        parse_window(window)
+
+
+@pytest.mark.parametrize(
+    ("window", "now", "expected"),
+    [
+        ("02:00-04:00", _at(3), True),
+        ("02:00-04:00", _at(4), False),
+        ("02:00-04:00", _at(1, 59), False),
+        ("23:00-02:00", _at(23, 30), True),
+        ("23:00-02:00", _at(1), True),
+        ("23:00-02:00", _at(12), False),
+    ],
+)
+def test_in_window(window, now, expected):
+    assert in_window(parse_window(window), now) == expected
+
+
+def test_without_window_every_moment_qualifies():
+    assert in_window(None, _at(12))
@@ -0,0 +1,39 @@
+from src.utils import metrics
+
+
+def test_render_groups_labelled_gauges_under_one_header():
+    metrics.clear_gauges("test_")
+    metrics.set_gauge("test_bytes", 1024, "Bytes processed", phase="download")
+    metrics.set_gauge("test_bytes", 2.5, phase="extract")
+
+    rendered = metrics.render()
+
+    assert rendered.count("# TYPE test_bytes gauge") == 1
+    assert "# HELP test_bytes Bytes processed" in rendered
+    assert 'test_bytes{phase="download"} 1024' in rendered
+    assert 'test_bytes{phase="extract"} 2.5' in rendered
+    metrics.clear_gauges("test_")
+
+
+def test_render_declares_counters():
+    metrics.clear_gauges("test_")
+    metrics.set_counter("test_events_total", 3, "Events seen", kind="a")
+    metrics.set_gauge("test_level", 1)
+
+    rendered = metrics.render("test_")
+
+    assert "# TYPE test_events_total counter" in rendered
+    assert 'test_events_total{kind="a"} 3' in rendered
+    assert "# TYPE test_level gauge" in rendered
+    metrics.clear_gauges("test_")
+
+
+def test_write_textfile_replaces_file_atomically(tmp_path):
+    path = tmp_path / "metrics" / "out.prom"
+    metrics.set_gauge("test_timestamp_seconds", 1792400000.123)
+
+    metrics.write_textfile(str(path))
+
+    assert "test_timestamp_seconds 1792400000.123" in path.read_text()
+    assert [p.name for p in path.parent.iterdir()] == ["out.prom"]
+    metrics.clear_gauges("test_")
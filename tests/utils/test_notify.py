@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from src.utils import config, notify
+
+
+@pytest.fixture
+def delivered(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str]]:
+    sent = []
+    monkeypatch.setattr(config, "APPRISE_URLS", "json://localhost")
+    monkeypatch.setattr(config, "NOTIFY_COALESCE_SECONDS", 0.2)
+    monkeypatch.setattr(notify, "_deliver", lambda title, message: sent.append((title, message)))
+    return sent
+
+
+def test_coalesce_counts_repeats_per_title():
+    batch = [("A", "retrying"), ("A", "retrying"), ("B", "done"), ("A", "failed"), ("A", "retrying")]
+    assert notify.coalesce(batch) == [("A", "retrying (x3)\nfailed"), ("B", "done")]
+
+
+def test_burst_is_sent_as_one_message(delivered):
+    for _ in range(3):
+        notify.send_notification("Download failed, retrying")
+    notify.send_notification("Update failed", title="Photon Update")
+
+    assert notify.flush(timeout=5)
+    assert delivered == [("Photon Status", "Download failed, retrying (x3)"), ("Photon Update", "Update failed")]
+
+
+def test_send_does_not_wait_for_slow_targets(delivered, monkeypatch: pytest.MonkeyPatch):
+    release = threading.Event()
+    monkeypatch.setattr(notify, "_deliver", lambda title, message: release.wait(5) and delivered.append(message))
+
+    notify.send_notification("slow")
+    assert not notify.flush(timeout=0.3)
+
+    release.set()
+    assert notify.flush(timeout=5)
+    assert delivered == ["slow"]
+
+
+def test_nothing_is_queued_without_apprise_urls(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "APPRISE_URLS", None)
+    notify.send_notification("ignored")
+    assert notify.flush(timeout=0)
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("mailto://u:p@example.com", "mailto://u:p@example.com?cto=10&rto=10"),
+        ("json://host/path?format=text", "json://host/path?format=text&cto=10&rto=10"),
+        ("json://host?rto=60", "json://host?rto=60"),
+    ],
+)
+def test_with_timeouts(url, expected):
+    assert notify.with_timeouts(url) == expected
@@ -1,6 +1,13 @@
 import pytest
 
-from src.utils.regions import get_index_url_path, get_region_info, is_valid_region, normalize_region
+from src.utils.regions import (
+    REGION_MAPPING,
+    get_index_url_path,
+    get_region_bboxes,
+    get_region_info,
+    is_valid_region,
+    normalize_region,
+)
 
 
 @pytest.mark.parametrize(
@@ -48,3 +55,16 @@ def test_get_index_url_path(region: str | None, expected: str):
 def test_get_index_url_path_raises_for_unknown_region():
     with pytest.raises(ValueError, match="Unknown region: atlantis"):
         get_index_url_path("atlantis", "1.0", "tar.bz2")
+
+
+def test_every_region_has_a_bounding_box():
+    for region in REGION_MAPPING:
+        assert get_region_bboxes(region), region
+
+
+@pytest.mark.parametrize(
+    ("region", "expected"),
+    [(None, [(-180.0, -90.0, 180.0, 90.0)]), ("de", [(5.8, 47.2, 15.1, 55.1)]), ("atlantis", [])],
+)
+def test_get_region_bboxes(region: str | None, expected: list):
+    assert get_region_bboxes(region) == expected
@@ -0,0 +1,33 @@
+import time
+
+import pytest
+
+from src.utils import config, metrics
+from src.utils.startup import StartupTimer
+
+
+def test_timer_includes_entrypoint_phases(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "METRICS_FILE", str(tmp_path / "metrics.prom"))
+    now = time.time()
+    monkeypatch.setenv("PHOTON_CONTAINER_START", str(now - 10))
+    monkeypatch.setenv("PHOTON_OWNERSHIP_START", str(now - 8))
+    monkeypatch.setenv("PHOTON_OWNERSHIP_DONE", str(now - 5))
+
+    timer = StartupTimer()
+    with timer.phase("photon start"):
+        pass
+    timer.log()
+
+    names = [name for name, _ in timer.phases]
+    assert names == ["entrypoint", "ownership", "manager startup", "photon start"]
+    assert timer.phases[0][1] == pytest.approx(2, abs=0.01)
+    assert timer.phases[1][1] == pytest.approx(3, abs=0.01)
+    assert metrics.get_gauge("photon_startup_phase_seconds", phase="ownership") == pytest.approx(3, abs=0.01)
+    total = metrics.get_gauge("photon_startup_seconds")
+    assert total is not None
+    assert total >= 10
+
+
+def test_timer_without_entrypoint_timestamps(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("PHOTON_CONTAINER_START", raising=False)
+    assert StartupTimer().phases == []
@@ -0,0 +1,57 @@
+import io
+import tarfile
+
+import pytest
+
+from src.utils.tarstream import TarStreamScanner
+
+
+def _build_tar(members: dict[str, bytes], tar_format: int = tarfile.GNU_FORMAT) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tar_format) as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("tar_format", [tarfile.USTAR_FORMAT, tarfile.GNU_FORMAT, tarfile.PAX_FORMAT])
+@pytest.mark.parametrize("chunk_size", [1, 100, 512, 4096, 1 << 20])
+def test_scanner_reports_members_across_chunk_boundaries(tar_format: int, chunk_size: int):
+    members = {"photon_data/node_1/a.bin": b"a" * 1500, "photon_data/node_1/empty": b"", "photon_data/b": b"b" * 512}
+    data = _build_tar(members, tar_format)
+    seen = []
+    scanner = TarStreamScanner(on_member=lambda member: seen.append((member.name, member.size)))
+
+    for pos in range(0, len(data), chunk_size):
+        scanner.feed(data[pos : pos + chunk_size])
+
+    assert seen == [(name, len(content)) for name, content in members.items()]
+    assert scanner.files == 3
+    assert scanner.payload_bytes == 2012
+    assert scanner.finished
+
+
+@pytest.mark.parametrize("tar_format", [tarfile.GNU_FORMAT, tarfile.PAX_FORMAT])
+def test_scanner_resolves_long_names(tar_format: int):
+    long_name = "photon_data/" + "x" * 200 + "/segment.cfs"
+    scanner = TarStreamScanner()
+
+    scanner.feed(_build_tar({long_name: b"data"}, tar_format))
+
+    assert scanner.members == 1
+    assert scanner.current is None
+    assert scanner.finished
+
+
+def test_scanner_tracks_current_member_while_streaming():
+    data = _build_tar({"big.bin": b"z" * 10_000})
+    scanner = TarStreamScanner()
+
+    scanner.feed(data[:2048])
+
+    assert scanner.current is not None
+    assert scanner.current.name == "big.bin"
+    assert scanner.offset == 2048
+    assert not scanner.finished
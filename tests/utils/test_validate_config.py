@@ -57,3 +57,25 @@ def test_validate_config_reports_multiple_errors(monkeypatch: pytest.MonkeyPatch
     assert "Invalid UPDATE_STRATEGY: 'WRONG'" in message
     assert "Invalid UPDATE_INTERVAL format: 'hourly'" in message
     assert "Invalid REGION: 'atlantis'" in message
+
+
+def test_validate_config_reports_unparseable_numbers(monkeypatch: pytest.MonkeyPatch):
+    _set_base_config(monkeypatch)
+    monkeypatch.setattr(config, "INVALID_NUMBERS", {"PHOTON_PORT": "23x22", "ARCHIVE_CACHE_MAX_GB": "ten"})
+
+    with pytest.raises(ValueError) as exc_info:
+        validate_config()
+
+    message = str(exc_info.value)
+    assert "Invalid PHOTON_PORT: '23x22'. Must be a number." in message
+    assert "Invalid ARCHIVE_CACHE_MAX_GB: 'ten'. Must be a number." in message
+
+
+def test_unparseable_number_falls_back_to_default(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "INVALID_NUMBERS", {})
+    monkeypatch.setenv("PEER_PORT", "80 80")
+    monkeypatch.setenv("THROTTLE_MAX_LOAD", "2.5")
+
+    assert config._number("PEER_PORT", "2380") == 2380
+    assert config._number("THROTTLE_MAX_LOAD", "1.5", float) == 2.5
+    assert config.INVALID_NUMBERS == {"PEER_PORT": "80 80"}